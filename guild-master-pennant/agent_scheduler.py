@@ -0,0 +1,189 @@
+"""
+Agent Scheduler - asyncio によるエージェントのイベント駆動スケジューラー
+
+スレッドごとにエージェントを回してポーリングする代わりに、エージェントを1つの
+イベントループ上のコルーチンとして動かす。各エージェントは自分宛て（と "all" 宛て）の
+メッセージが投稿されたときだけ起きて run_once() を1回実行する。
+
+- 待機中のエージェントはコルーチン1つ分のコストしかかからないため、数百のエージェントを
+  1プロセスで扱える
+- 同時に実行する run_once() の数は max_concurrency で制限する（同期の run_once は
+  スレッドプールで、コルーチンの run_once はそのまま await で実行する）
+- idle_interval を指定すると、メッセージがなくてもその間隔で起こす（盤面の状態だけを
+  見て動くエージェント用）
+
+使い方:
+    scheduler = AgentScheduler(blackboard, agents, max_concurrency=8)
+    scheduler.run(duration=10.0)
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from blackboard import Blackboard
+
+logger = logging.getLogger("AgentScheduler")
+
+
+class AgentScheduler:
+    """
+    エージェントをイベントループ上のコルーチンとして実行するスケジューラー
+    """
+
+    def __init__(self, blackboard: Blackboard, agents: List[Any],
+                 max_concurrency: int = 8,
+                 idle_interval: Optional[float] = None,
+                 wake_on_broadcast: bool = True):
+        """
+        Args:
+            blackboard: メッセージを購読する Blackboard
+            agents: エージェント（name, start(), run_once(), stop() を持つ）
+            max_concurrency: 同時に実行する run_once() の最大数
+            idle_interval: メッセージがなくても起こす間隔（秒。None=メッセージでのみ起こす）
+            wake_on_broadcast: "all" 宛てのメッセージでも起こすか
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        if idle_interval is not None and idle_interval <= 0:
+            raise ValueError("idle_interval must be > 0")
+        self.blackboard = blackboard
+        self.agents = list(agents)
+        self.max_concurrency = max_concurrency
+        self.idle_interval = idle_interval
+        self.wake_on_broadcast = wake_on_broadcast
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._stop_requested = threading.Event()
+        self._wake_events: Dict[int, asyncio.Event] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def run(self, duration: Optional[float] = None) -> None:
+        """
+        イベントループを作成してエージェントを実行（stop() または duration 経過まで戻らない）
+
+        Args:
+            duration: 実行時間（秒。None=stop() まで）
+        """
+        asyncio.run(self.run_async(duration))
+
+    async def run_async(self, duration: Optional[float] = None) -> None:
+        """
+        実行中のイベントループ上でエージェントを実行
+
+        Args:
+            duration: 実行時間（秒。None=stop() まで）
+        """
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        if self._stop_requested.is_set():
+            self._stop_event.set()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                      thread_name_prefix="agent-scheduler")
+
+        subscriptions = []
+        for agent in self.agents:
+            wake = self._wake_events[id(agent)] = asyncio.Event()
+            # 最初の1回はメッセージを待たずに実行する
+            wake.set()
+            self._stats[agent.name] = {"wakeups": 0, "runs": 0, "errors": 0, "busy_seconds": 0.0}
+            # 起こすだけなので、未配信のメッセージは1件にまとめる
+            subscriptions.append(self.blackboard.subscribe(
+                agent.name, self._waker(wake), queue_size=1, backpressure="coalesce"))
+            if self.wake_on_broadcast:
+                subscriptions.append(self.blackboard.subscribe(
+                    "all", self._waker(wake), queue_size=1, backpressure="coalesce"))
+
+        tasks = [asyncio.create_task(self._agent_loop(agent, semaphore, executor),
+                                     name=f"agent:{agent.name}")
+                 for agent in self.agents]
+        try:
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), duration)
+            except asyncio.TimeoutError:
+                pass
+        finally:
+            self._stop_event.set()
+            for wake in self._wake_events.values():
+                wake.set()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for subscription in subscriptions:
+                self.blackboard.unsubscribe(subscription)
+            executor.shutdown(wait=True)
+            for agent in self.agents:
+                agent.stop()
+            self._wake_events.clear()
+            self._loop = None
+            self._stop_requested.clear()
+
+    def _waker(self, wake: asyncio.Event):
+        """配信スレッドからイベントループ上の wake をセットするコールバック"""
+        def callback(message: Dict) -> None:
+            loop = self._loop
+            if loop is not None and not loop.is_closed():
+                try:
+                    loop.call_soon_threadsafe(wake.set)
+                except RuntimeError:
+                    # ループの終了と競合した場合
+                    pass
+        return callback
+
+    async def _agent_loop(self, agent: Any, semaphore: asyncio.Semaphore,
+                          executor: ThreadPoolExecutor) -> None:
+        """1エージェントのコルーチン: 起こされるたびに run_once() を1回実行"""
+        loop = asyncio.get_running_loop()
+        wake = self._wake_events[id(agent)]
+        stats = self._stats[agent.name]
+        is_coroutine = asyncio.iscoroutinefunction(agent.run_once)
+        agent.start()
+
+        while not self._stop_event.is_set():
+            if self.idle_interval is None:
+                await wake.wait()
+            else:
+                try:
+                    await asyncio.wait_for(wake.wait(), self.idle_interval)
+                except asyncio.TimeoutError:
+                    pass
+            if self._stop_event.is_set():
+                break
+            # 実行中に届いたメッセージは次の1回で処理する
+            wake.clear()
+            stats["wakeups"] += 1
+
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    if is_coroutine:
+                        await agent.run_once()
+                    else:
+                        await loop.run_in_executor(executor, agent.run_once)
+                except Exception:
+                    stats["errors"] += 1
+                    logger.exception("Agent %s failed", agent.name)
+                stats["runs"] += 1
+                stats["busy_seconds"] += time.perf_counter() - start
+
+    def stop(self) -> None:
+        """実行を止める（他のスレッドからも呼べる）"""
+        self._stop_requested.set()
+        loop, stop_event = self._loop, self._stop_event
+        if loop is not None and stop_event is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(stop_event.set)
+            except RuntimeError:
+                pass
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        エージェントごとの起床回数・実行回数・エラー数・実行時間
+
+        Returns:
+            {agent_name: {wakeups, runs, errors, busy_seconds}}
+        """
+        return {name: dict(stats) for name, stats in self._stats.items()}
@@ -0,0 +1,344 @@
+"""
+Benchmark - シミュレーションとBlackboardのホットパスの計測
+
+戦闘シミュレーション（simulate_turn / simulate_combat / simulate_dungeon）と
+Blackboard のメッセージ操作を計測し、ops/sec・1回あたりのレイテンシのパーセンタイル・
+ピークメモリを JSON のベースラインとして保存する。compare で2つの結果を比較し、
+しきい値を超えて遅くなったベンチマークを検出する。
+
+使い方:
+    python benchmark.py run --output baseline.json
+    python benchmark.py run --output current.json
+    python benchmark.py compare baseline.json current.json --threshold 0.2
+"""
+
+import argparse
+import fnmatch
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from blackboard import Blackboard
+from simulation import (
+    LOG_FULL,
+    LOG_NONE,
+    CombatSimulator,
+    create_enemies,
+    create_party,
+    make_rng,
+    simulate_dungeon
+)
+
+BENCHMARK_VERSION = 1
+
+# ベンチマーク用の固定パーティとシード
+PARTY = ["Warrior", "Mage", "Priest", "Archer"]
+SEED = 12345
+
+# (準備済みの計測対象, 計測回数) を返すファクトリ
+BenchmarkFactory = Callable[[], Tuple[Callable[[], object], int]]
+
+
+def _combat_units(floor: int):
+    """計測用のパーティと敵（呼び出しごとに reset して再利用）"""
+    party = create_party(PARTY)
+    enemies = create_enemies(floor)
+
+    def reset():
+        for unit in party:
+            unit.reset()
+        for enemy in enemies:
+            enemy.reset()
+
+    return party, enemies, reset
+
+
+def bench_simulate_turn(floor: int) -> BenchmarkFactory:
+    """CombatSimulator.simulate_turn（決着したら初期化して続ける）"""
+    def factory():
+        party, enemies, reset = _combat_units(floor)
+        rng = make_rng(SEED)
+
+        def run():
+            if not any(p.is_alive for p in party) or not any(e.is_alive for e in enemies):
+                reset()
+            CombatSimulator.simulate_turn(party, enemies, LOG_NONE, rng)
+
+        return run, 20000
+    return factory
+
+
+def bench_simulate_combat(floor: int, log_level: str = LOG_NONE) -> BenchmarkFactory:
+    """CombatSimulator.simulate_combat（1戦闘）"""
+    def factory():
+        party, enemies, reset = _combat_units(floor)
+        rng = make_rng(SEED)
+
+        def run():
+            reset()
+            CombatSimulator.simulate_combat(party, enemies, log_level=log_level, rng=rng)
+
+        return run, 2000
+    return factory
+
+
+def bench_simulate_dungeon(max_floors: int) -> BenchmarkFactory:
+    """simulate_dungeon（1回の踏破）"""
+    def factory():
+        rng = make_rng(SEED)
+
+        def run():
+            simulate_dungeon(PARTY, max_floors=max_floors, rng=rng)
+
+        return run, 300
+    return factory
+
+
+def _filled_blackboard(message_count: int) -> Blackboard:
+    """message_count 件のメッセージを投稿済みの Blackboard"""
+    blackboard = Blackboard()
+    recipients = ["all", "SystemArchitect", "CombatDesigner", "SkillDesigner", "DungeonDesigner"]
+    for i in range(message_count):
+        blackboard.post_message(f"Agent{i % 5}", recipients[i % len(recipients)],
+                                f"message {i}", "info", {"index": i})
+    return blackboard
+
+
+def bench_post_message(message_count: int) -> BenchmarkFactory:
+    """Blackboard.post_message（既存メッセージ message_count 件）"""
+    def factory():
+        blackboard = _filled_blackboard(message_count)
+
+        def run():
+            blackboard.post_message("Benchmark", "CombatDesigner", "payload", "info")
+
+        return run, 20000
+    return factory
+
+
+def bench_get_messages(message_count: int, recipient: Optional[str] = None,
+                       tail: Optional[int] = None) -> BenchmarkFactory:
+    """Blackboard.get_messages（受信者フィルタ / 末尾 tail 件の since_id 取得）"""
+    def factory():
+        blackboard = _filled_blackboard(message_count)
+        since_id = message_count - tail - 1 if tail is not None else None
+
+        def run():
+            blackboard.get_messages(recipient, since_id)
+
+        return run, 200
+    return factory
+
+
+BENCHMARKS: Dict[str, BenchmarkFactory] = {
+    "combat.simulate_turn.floor1": bench_simulate_turn(1),
+    "combat.simulate_turn.floor10": bench_simulate_turn(10),
+    "combat.simulate_turn.floor20": bench_simulate_turn(20),
+    "combat.simulate_combat.floor1": bench_simulate_combat(1),
+    "combat.simulate_combat.floor1.full_log": bench_simulate_combat(1, LOG_FULL),
+    "combat.simulate_combat.floor5": bench_simulate_combat(5),
+    "combat.simulate_combat.floor10": bench_simulate_combat(10),
+    "dungeon.simulate_dungeon.floors5": bench_simulate_dungeon(5),
+    "dungeon.simulate_dungeon.floors10": bench_simulate_dungeon(10),
+    "dungeon.simulate_dungeon.floors30": bench_simulate_dungeon(30),
+    "blackboard.post_message.10k": bench_post_message(10000),
+    "blackboard.post_message.100k": bench_post_message(100000),
+    "blackboard.get_messages.recipient.10k": bench_get_messages(10000, "CombatDesigner"),
+    "blackboard.get_messages.recipient.100k": bench_get_messages(100000, "CombatDesigner"),
+    "blackboard.get_messages.since_id.100k": bench_get_messages(100000, "CombatDesigner", tail=100),
+}
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    """ソート済みの値のパーセンタイル（最近傍）"""
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def measure(factory: BenchmarkFactory, scale: float = 1.0, warmup: int = 10) -> Dict:
+    """
+    1つのベンチマークを計測
+
+    レイテンシは GC を止めて1回ずつ計測し、ピークメモリは別の実行で tracemalloc により計測する
+    （tracemalloc のオーバーヘッドをレイテンシに含めないため）。
+
+    Args:
+        factory: ベンチマークのファクトリ
+        scale: 計測回数の倍率（--quick などで縮小）
+        warmup: 計測前の空実行回数
+
+    Returns:
+        {iterations, ops_per_sec, mean_us, p50_us, p90_us, p99_us, max_us, peak_memory_kb}
+    """
+    run, iterations = factory()
+    iterations = max(1, int(iterations * scale))
+    for _ in range(warmup):
+        run()
+
+    timings = []
+    clock = time.perf_counter_ns
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(iterations):
+            start = clock()
+            run()
+            timings.append(clock() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    # ピークメモリ（準備処理を除いた計測対象の実行分）
+    run, _ = factory()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        for _ in range(min(iterations, 100)):
+            run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    total_ns = sum(timings)
+    timings.sort()
+    return {
+        "iterations": iterations,
+        "ops_per_sec": iterations / (total_ns / 1e9) if total_ns else 0.0,
+        "mean_us": total_ns / iterations / 1000,
+        "p50_us": _percentile(timings, 0.50) / 1000,
+        "p90_us": _percentile(timings, 0.90) / 1000,
+        "p99_us": _percentile(timings, 0.99) / 1000,
+        "max_us": timings[-1] / 1000,
+        "peak_memory_kb": (peak - baseline) / 1024
+    }
+
+
+def run_benchmarks(pattern: str = "*", scale: float = 1.0, verbose: bool = True) -> Dict:
+    """
+    ベンチマークを実行
+
+    Args:
+        pattern: 実行するベンチマーク名の glob パターン
+        scale: 計測回数の倍率
+        verbose: 進捗を表示するか
+
+    Returns:
+        ベースラインとして保存できる結果
+    """
+    results = {}
+    for name, factory in BENCHMARKS.items():
+        if not fnmatch.fnmatch(name, pattern):
+            continue
+        result = measure(factory, scale)
+        results[name] = result
+        if verbose:
+            print(f"  {name:45s} {result['ops_per_sec']:12.1f} ops/s  "
+                  f"p50={result['p50_us']:9.1f}us  p99={result['p99_us']:9.1f}us  "
+                  f"peak={result['peak_memory_kb']:8.1f}KB")
+
+    return {
+        "version": BENCHMARK_VERSION,
+        "created_at": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "scale": scale,
+        "benchmarks": results
+    }
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = 0.2,
+                    metric: str = "p50_us") -> List[Dict]:
+    """
+    2つの結果を比較
+
+    Args:
+        baseline: 基準の結果
+        current: 比較する結果
+        threshold: 回帰とみなす悪化率（0.2 = 20%遅い）
+        metric: 比較するレイテンシ指標 (mean_us, p50_us, p90_us, p99_us)
+
+    Returns:
+        両方にあるベンチマークごとの {name, baseline, current, change, regression}
+    """
+    rows = []
+    for name, before in baseline["benchmarks"].items():
+        after = current["benchmarks"].get(name)
+        if after is None:
+            continue
+        change = (after[metric] - before[metric]) / before[metric] if before[metric] else 0.0
+        rows.append({
+            "name": name,
+            "baseline": before[metric],
+            "current": after[metric],
+            "change": change,
+            "regression": change > threshold
+        })
+    return rows
+
+
+def _load(path: str) -> Dict:
+    """結果ファイルを読み込む"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    """
+    メイン関数
+    """
+    parser = argparse.ArgumentParser(description="Simulation / Blackboard benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run benchmarks")
+    run_parser.add_argument("--filter", default="*", help="glob pattern for benchmark names")
+    run_parser.add_argument("--quick", action="store_true", help="run 10%% of the iterations")
+    run_parser.add_argument("--output", default=None, help="write results as JSON")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.2,
+                                help="slowdown ratio reported as a regression (default: 0.2)")
+    compare_parser.add_argument("--metric", default="p50_us",
+                                choices=["mean_us", "p50_us", "p90_us", "p99_us"])
+
+    commands.add_parser("list", help="list benchmark names")
+
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for name in BENCHMARKS:
+            print(name)
+        return
+
+    if args.command == "run":
+        print("\n🏁 Running benchmarks...\n")
+        results = run_benchmarks(args.filter, 0.1 if args.quick else 1.0)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+            print(f"\n📝 Saved results to {args.output}")
+        return
+
+    rows = compare_results(_load(args.baseline), _load(args.current), args.threshold, args.metric)
+    print(f"\n{'benchmark':45s} {'baseline':>12s} {'current':>12s} {'change':>8s}")
+    for row in rows:
+        marker = "  ❌ REGRESSION" if row["regression"] else ""
+        print(f"{row['name']:45s} {row['baseline']:10.1f}us {row['current']:10.1f}us "
+              f"{row['change']:+7.1%}{marker}")
+
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) over {args.threshold:.0%} ({args.metric})")
+        sys.exit(1)
+    print(f"\n✅ No regressions over {args.threshold:.0%} ({args.metric})")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,201 @@ Blackboard - 共有情報ストア
 各エージェントはBlackboardから情報を読み取り、新しい情報を書き込む。
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager
 from datetime import datetime
+from functools import wraps
+import hashlib
 import json
+import os
+import time
 from threading import Lock
 
+from dispatch import MessageDispatcher, Subscription
+from metrics import Metrics
+
+# アーカイブの何件ごとにファイル位置を記録するか（since_id 読み出し時のシーク用）
+ARCHIVE_INDEX_STRIDE = 256
+
+# 先行書き込みログ (WAL) のファイル名
+WAL_SNAPSHOT_FILE = "snapshot.json"
+WAL_SEGMENT_FORMAT = "wal.{:08d}.jsonl"
+WAL_FORMAT_VERSION = 1
+
+
+def _timed(name: str):
+    """Blackboard の公開操作の所要時間を metrics に記録するデコレーター（metrics=None なら素通し）"""
+    metric = f"blackboard.{name}"
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            metrics = self.metrics
+            if metrics is None:
+                return fn(self, *args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(self, *args, **kwargs)
+            finally:
+                metrics.observe(metric, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class InstrumentedLock:
+    """
+    待ち時間を計測する Lock
+
+    まずブロックせずに取得を試み、取得できなかった（競合した）場合だけ待ち時間を計測する。
+    """
+
+    def __init__(self, name: str, metrics: Optional[Metrics] = None):
+        """
+        Args:
+            name: ロック名
+            metrics: 競合時の待ち時間を lock.<name>.wait として記録する先（None=記録しない）
+        """
+        self.name = name
+        self.metrics = metrics
+        self._lock = Lock()
+        self.acquisitions = 0
+        self.contended = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def acquire(self) -> None:
+        """ロックを取得"""
+        if not self._lock.acquire(blocking=False):
+            start = time.perf_counter()
+            self._lock.acquire()
+            wait = time.perf_counter() - start
+            self.contended += 1
+            self.total_wait += wait
+            if wait > self.max_wait:
+                self.max_wait = wait
+            if self.metrics is not None:
+                self.metrics.observe(f"lock.{self.name}.wait", wait)
+        self.acquisitions += 1
+
+    def release(self) -> None:
+        """ロックを解放"""
+        self._lock.release()
+
+    def __enter__(self) -> "InstrumentedLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._lock.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """取得回数・競合回数・待ち時間"""
+        acquisitions = self.acquisitions
+        return {
+            "acquisitions": acquisitions,
+            "contended": self.contended,
+            "contention_rate": self.contended / acquisitions if acquisitions else 0.0,
+            "total_wait_ms": self.total_wait * 1000,
+            "max_wait_ms": self.max_wait * 1000
+        }
+
+    def reset_stats(self) -> None:
+        """統計をリセット"""
+        self.acquisitions = 0
+        self.contended = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+
+class EntryBuffer:
+    """
+    IDが連番のエントリを古い順に保持するバッファ
+
+    末尾に追加し、先頭（最も古いもの）から取り出す。取り出した領域はまとめて詰め直すため、
+    追加・取り出し・IDによる参照はすべて償却 O(1)。
+    """
+
+    def __init__(self, first_id: int = 0):
+        self._items: List[Any] = []
+        self._start = 0
+        self.first_id = first_id
+
+    def __len__(self) -> int:
+        return len(self._items) - self._start
+
+    def __iter__(self) -> Iterator[Any]:
+        for i in range(self._start, len(self._items)):
+            yield self._items[i]
+
+    @property
+    def next_id(self) -> int:
+        """次に追加されるエントリのID"""
+        return self.first_id + len(self)
+
+    def append(self, item: Any) -> None:
+        """末尾に追加"""
+        self._items.append(item)
+
+    def oldest(self) -> Any:
+        """最も古いエントリ"""
+        return self._items[self._start]
+
+    def pop_oldest(self) -> Any:
+        """最も古いエントリを取り出す"""
+        item = self._items[self._start]
+        self._items[self._start] = None
+        self._start += 1
+        self.first_id += 1
+        if self._start >= 1024 and self._start * 2 >= len(self._items):
+            del self._items[:self._start]
+            self._start = 0
+        return item
+
+    def get(self, entry_id: int) -> Any:
+        """IDでエントリを取得（保持範囲内であること）"""
+        return self._items[self._start + entry_id - self.first_id]
+
+    def since(self, entry_id: int) -> List[Any]:
+        """entry_id 以降（保持範囲内）のエントリ"""
+        return self._items[self._start + max(0, entry_id - self.first_id):]
+
+    def to_list(self) -> List[Any]:
+        """保持しているエントリのリスト"""
+        return self._items[self._start:]
+
+
+def _write_json_stream(f, data: Dict[str, Any]) -> None:
+    """
+    json.dump(data, f, ensure_ascii=False, indent=2) と同じ出力を、
+    トップレベルのカテゴリ内のエントリ単位で逐次書き出す（全体を1つの文字列にしない）
+    """
+    def dumps(value: Any, level: int) -> str:
+        text = json.dumps(value, ensure_ascii=False, indent=2)
+        return text.replace("\n", "\n" + "  " * level)
+
+    if not data:
+        f.write("{}")
+        return
+
+    f.write("{")
+    for i, (category, value) in enumerate(data.items()):
+        f.write(("," if i else "") + "\n  " + json.dumps(category, ensure_ascii=False) + ": ")
+        if isinstance(value, list) and value:
+            f.write("[")
+            for j, item in enumerate(value):
+                f.write(("," if j else "") + "\n    " + dumps(item, 2))
+            f.write("\n  ]")
+        elif isinstance(value, dict) and value:
+            f.write("{")
+            for j, (key, item) in enumerate(value.items()):
+                f.write(("," if j else "") + "\n    " + json.dumps(key, ensure_ascii=False)
+                        + ": " + dumps(item, 2))
+            f.write("\n  }")
+        else:
+            f.write(dumps(value, 1))
+    f.write("\n}")
+
 
 class Blackboard:
     """
@@ -20,23 +210,362 @@ class Blackboard:
     - システム状態の共有
     - 生成されたコードの保存
     - 設計決定の記録
+
+    保持ポリシー（max_messages / max_message_age / max_decisions）を指定すると、
+    古いメッセージと設計決定はメモリから取り除かれ、archive_dir 指定時は追記専用の
+    セグメントファイル (messages.jsonl / decisions.jsonl) に書き出される。
+    アーカイブ済みのメッセージも get_messages(since_id=...) で透過的に読み出せる。
+
+    wal_dir を指定すると、すべての変更を追記専用の先行書き込みログ (WAL) に記録し、
+    snapshot_interval 件ごとに圧縮したスナップショットを書き出す。
+    再起動後は Blackboard.load(wal_dir) でスナップショットとそれ以降のログから復元できる。
+
+    ロックはカテゴリごと（メッセージ・設計決定・キー値のカテゴリ別）に分かれており、
+    別カテゴリへの書き込みは互いに待たない。ログの追記とバージョン番号の採番だけは
+    短い共通のコミットロックで直列化する。get_value / get_task_status / get_generated_files /
+    get_all_tasks / get_summary はロックを取らずに読む（エントリは書き換えずに置き換えるため、
+    辞書の単一操作で一貫した値が得られる）。各ロックの競合は get_lock_stats() で確認できる。
+
+    subscribe したコールバックへの通知は非同期で、投稿側はキューに積むだけで戻る
+    （配信の仕組みとバックプレッシャーは dispatch.py を参照）。
     """
 
-    def __init__(self):
+    def __init__(self, max_messages: Optional[int] = None,
+                 max_message_age: Optional[float] = None,
+                 max_decisions: Optional[int] = None,
+                 archive_dir: Optional[str] = None,
+                 wal_dir: Optional[str] = None,
+                 snapshot_interval: int = 10000,
+                 wal_fsync: bool = False,
+                 max_file_versions: Optional[int] = None,
+                 dispatch_workers: int = 2,
+                 subscriber_queue_size: int = 1000,
+                 backpressure: str = "block",
+                 metrics: Optional[Metrics] = None):
+        """
+        Args:
+            max_messages: メモリに保持するメッセージ数の上限（None=無制限）
+            max_message_age: メモリに保持するメッセージの最大経過秒数（None=無制限）
+            max_decisions: メモリに保持する設計決定数の上限（None=無制限）
+            archive_dir: 取り除いたエントリの書き出し先ディレクトリ（None=破棄）
+            wal_dir: 先行書き込みログのディレクトリ（None=記録しない）。既存のログは破棄される
+                （引き継ぐ場合は Blackboard.load を使う）
+            snapshot_interval: スナップショットを書き出すログ件数の間隔
+            wal_fsync: ログを1件ごとに fsync するか（電源断にも耐えるが遅い）
+            max_file_versions: 生成ファイルのパスごとに残す履歴の件数（None=無制限）
+            dispatch_workers: サブスクライバーのコールバックを呼び出すワーカースレッド数
+            subscriber_queue_size: サブスクライバーごとの未配信キューの上限
+            backpressure: キューがあふれたときの動作 (block, drop, coalesce)。"block" は
+                post_message を空きができるまで待たせる。dispatch.py を参照
+            metrics: 操作のレイテンシ・ロックの待ち時間・メッセージ数・キューの深さの記録先
+                （None=計測しない）
+        """
+        for name, value in (("max_messages", max_messages), ("max_decisions", max_decisions),
+                            ("max_file_versions", max_file_versions)):
+            if value is not None and value < 1:
+                raise ValueError(f"{name} must be >= 1")
+        if max_message_age is not None and max_message_age <= 0:
+            raise ValueError("max_message_age must be > 0")
+        if snapshot_interval < 1:
+            raise ValueError("snapshot_interval must be >= 1")
+
+        self.max_messages = max_messages
+        self.max_message_age = max_message_age
+        self.max_decisions = max_decisions
+        self.archive_dir = archive_dir
+        self.wal_dir = wal_dir
+        self.snapshot_interval = snapshot_interval
+        self.wal_fsync = wal_fsync
+        self.max_file_versions = max_file_versions
+        self.metrics = metrics
+
+        # ロック順序: _guard → messages → decisions → カテゴリ（名前順）→ commit
+        self._guard = InstrumentedLock("guard", metrics)
+        self._message_lock = InstrumentedLock("messages", metrics)
+        self._decision_lock = InstrumentedLock("decisions", metrics)
+        self._category_locks: Dict[str, InstrumentedLock] = {}
+        self._commit_lock = InstrumentedLock("commit", metrics)
+        self._snapshot_lock = Lock()
+        self._dispatcher = MessageDispatcher(dispatch_workers, subscriber_queue_size, backpressure,
+                                             metrics)
+        if metrics is not None:
+            metrics.register_gauge("blackboard.retained_messages", lambda: len(self._data["messages"]))
+            metrics.register_gauge("dispatch.pending", self._dispatcher.pending_count)
+        self._archives: Dict[str, Any] = {}
+        self._wal = None
+        self._wal_seq = 0
+        self._wal_records = 0
+        self._reset()
+        self._open_archives(truncate=True)
+        if wal_dir:
+            self._start_wal(fresh=True)
+
+    def _reset(self) -> None:
+        """データと索引を初期化（すべてのロック取得済みで呼ぶ）"""
         self._data: Dict[str, Any] = {
-            "messages": [],           # エージェント間メッセージ
-            "generated_files": {},    # 生成されたファイル
-            "system_state": {},       # システムの状態
-            "decisions": [],          # 設計決定の履歴
-            "tasks": {},              # タスクとステータス
+            "messages": EntryBuffer(),      # エージェント間メッセージ
+            "generated_files": {},          # 生成されたファイル（最新版のメタデータ）
+            "file_blobs": {},               # ファイル内容（ハッシュ → 内容。同じ内容は1つだけ）
+            "file_history": {},             # ファイルのパスごとの版のメタデータ（古い順）
+            "system_state": {},             # システムの状態
+            "decisions": EntryBuffer(),     # 設計決定の履歴
+            "tasks": {},                    # タスクとステータス
             "metadata": {
                 "created_at": datetime.now().isoformat(),
                 "version": "1.0.0"
             }
         }
-        self._lock = Lock()
-        self._subscribers: Dict[str, List[callable]] = {}
+        # 受信者ごとのメッセージID（昇順）。"all" はブロードキャスト
+        self._recipient_index: Dict[str, List[int]] = {}
+        self._evicted_since_compaction = 0
+
+        # 変更のバージョン（差分エクスポート用）。キー単位のカテゴリはキーごとの最終変更バージョン
+        self._version = 0
+        self._key_versions: Dict[str, Dict[str, int]] = {}
+        # カテゴリごと・メッセージの受信者ごとの最終変更バージョン（エージェントの入力の変更検出用）
+        self._category_versions: Dict[str, int] = {}
+        self._recipient_versions: Dict[str, int] = {}
+        self._export_cursor: Optional[Dict[str, int]] = None
+        # 保持期限の判定用（メッセージと同じ順の投稿時刻）
+        self._message_times = EntryBuffer()
+        # ファイル内容を参照している版の数（履歴から取り除かれて0になった内容は破棄する）
+        self._blob_refs: Dict[str, int] = {}
+        # get_summary 用の集計（変更ごとに増減する。メッセージはアーカイブ済みも含めた累計）
+        self._counters: Dict[str, Dict[str, int]] = {
+            "tasks_by_status": {},
+            "messages_by_type": {},
+            "messages_by_sender": {},
+            "files_by_agent": {}
+        }
+
+    def _count(self, counter: str, key: Any, delta: int) -> None:
+        """集計を増減（0 になったキーは取り除く）"""
+        counts = self._counters[counter]
+        value = counts.get(key, 0) + delta
+        if value:
+            counts[key] = value
+        else:
+            counts.pop(key, None)
 
+    def _category_lock(self, category: str) -> InstrumentedLock:
+        """キー値カテゴリのロック（カテゴリがなければ作成）"""
+        lock = self._category_locks.get(category)
+        if lock is None:
+            with self._guard:
+                lock = self._category_locks.get(category)
+                if lock is None:
+                    self._data.setdefault(category, {})
+                    lock = self._category_locks[category] = InstrumentedLock(category, self.metrics)
+        return lock
+
+    @contextmanager
+    def _all_locks(self):
+        """すべてのロックを決められた順序で取得（スナップショット・クリア用）"""
+        with ExitStack() as stack:
+            stack.enter_context(self._guard)
+            stack.enter_context(self._message_lock)
+            stack.enter_context(self._decision_lock)
+            for category in sorted(self._category_locks):
+                stack.enter_context(self._category_locks[category])
+            stack.enter_context(self._commit_lock)
+            yield
+
+    def _commit(self, record: Optional[Dict]) -> int:
+        """
+        変更をログに追記してバージョン番号を採番（対象カテゴリのロック取得済みで呼ぶ）
+
+        Args:
+            record: ログに書く内容（None=ログなし。WAL の再生時）
+
+        Returns:
+            この変更のバージョン
+        """
+        with self._commit_lock:
+            if record is not None:
+                self._log(record)
+            self._version += 1
+            return self._version
+
+    def get_lock_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        ロックごとの取得回数・競合回数・待ち時間
+
+        Returns:
+            {ロック名: {acquisitions, contended, contention_rate, total_wait_ms, max_wait_ms}}
+        """
+        locks = [self._guard, self._message_lock, self._decision_lock, self._commit_lock]
+        locks += list(self._category_locks.values())
+        return {lock.name: lock.get_stats() for lock in locks}
+
+    def reset_lock_stats(self) -> None:
+        """ロックの統計をリセット"""
+        for lock in [self._guard, self._message_lock, self._decision_lock, self._commit_lock,
+                     *self._category_locks.values()]:
+            lock.reset_stats()
+
+    def _open_archives(self, truncate: bool) -> None:
+        """
+        アーカイブのセグメントファイルを開く
+
+        Args:
+            truncate: True なら新規作成、False なら既存の内容に追記（load 時）
+        """
+        self._archive_offsets: List[int] = []
+        # アーカイブ済みの最後のメッセージIDと決定数（WAL 再生時に二重に書き出さないため）
+        self._archived_message_id = -1
+        self._archived_decisions = 0
+        if not self.archive_dir:
+            return
+
+        os.makedirs(self.archive_dir, exist_ok=True)
+        for name in ("messages", "decisions"):
+            self._archives[name] = open(os.path.join(self.archive_dir, f"{name}.jsonl"),
+                                        "wb+" if truncate else "ab+")
+        if truncate:
+            return
+
+        # 既存のアーカイブの索引を作り直す
+        archive = self._archives["messages"]
+        archive.seek(0)
+        offset = 0
+        for line in archive:
+            message = json.loads(line)
+            if message["id"] % ARCHIVE_INDEX_STRIDE == 0:
+                self._archive_offsets.append(offset)
+            self._archived_message_id = message["id"]
+            offset += len(line)
+        archive = self._archives["decisions"]
+        archive.seek(0)
+        self._archived_decisions = sum(1 for _ in archive)
+
+    def _close_archives(self) -> None:
+        """アーカイブファイルを閉じる"""
+        for archive in self._archives.values():
+            archive.close()
+        self._archives = {}
+
+    def close(self) -> None:
+        """未配信のメッセージを配信し、アーカイブとログのファイルを閉じる"""
+        self._dispatcher.close()
+        with self._all_locks():
+            self._close_archives()
+            if self._wal is not None:
+                self._wal.close()
+                self._wal = None
+
+    def _archive(self, name: str, entry: Dict) -> None:
+        """取り除いたエントリをアーカイブに追記"""
+        archive = self._archives.get(name)
+        if archive is None:
+            return
+        if name == "messages":
+            if entry["id"] <= self._archived_message_id:
+                return
+            self._archived_message_id = entry["id"]
+            if entry["id"] % ARCHIVE_INDEX_STRIDE == 0:
+                archive.seek(0, os.SEEK_END)
+                self._archive_offsets.append(archive.tell())
+        archive.write((json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8"))
+
+    def _enforce_message_retention(self) -> None:
+        """保持ポリシーを超えたメッセージを取り除く（メッセージのロック取得済みで呼ぶ）"""
+        messages = self._data["messages"]
+        evicted = 0
+
+        if self.max_messages is not None:
+            while len(messages) > self.max_messages:
+                self._archive("messages", messages.pop_oldest())
+                self._message_times.pop_oldest()
+                evicted += 1
+
+        if self.max_message_age is not None:
+            cutoff = time.time() - self.max_message_age
+            while len(messages) and self._message_times.oldest() < cutoff:
+                self._archive("messages", messages.pop_oldest())
+                self._message_times.pop_oldest()
+                evicted += 1
+
+        if not evicted:
+            return
+
+        if "messages" in self._archives:
+            self._archives["messages"].flush()
+
+        # 索引から取り除いたIDを定期的に削除
+        self._evicted_since_compaction += evicted
+        if self._evicted_since_compaction > max(1024, len(messages)):
+            first_id = messages.first_id
+            for ids in self._recipient_index.values():
+                del ids[:bisect_left(ids, first_id)]
+            self._evicted_since_compaction = 0
+
+    def _read_archived_messages(self, start: int, end: int,
+                                recipient: Optional[str]) -> List[Dict]:
+        """アーカイブから start <= id < end のメッセージを読み出す"""
+        archive = self._archives.get("messages")
+        if archive is None or start >= end:
+            return []
+
+        block = start // ARCHIVE_INDEX_STRIDE
+        if block >= len(self._archive_offsets):
+            return []
+
+        archive.flush()
+        archive.seek(self._archive_offsets[block])
+        messages = []
+        for line in archive:
+            message = json.loads(line)
+            if message["id"] >= end:
+                break
+            if message["id"] < start:
+                continue
+            if recipient is None or message["recipient"] in (recipient, "all"):
+                messages.append(message)
+        archive.seek(0, os.SEEK_END)
+        return messages
+
+    def _archive_extent(self, name: str, start_id: int,
+                        end_id: int) -> Optional[Tuple[str, int, int]]:
+        """
+        ロックの外で読み出すためのアーカイブの範囲（対象のロック取得済みで呼ぶ）
+
+        アーカイブは追記専用なので、ここで確定した範囲の内容はあとから書き換わらない。
+
+        Args:
+            name: "messages" または "decisions"
+            start_id: 読み出す最初のID
+            end_id: 読み出す最後のIDの次（このIDより前がアーカイブ済み）
+
+        Returns:
+            (ファイルパス, 読み始めるバイト位置, 読み終えるバイト位置)。読むものがなければ None
+        """
+        archive = self._archives.get(name)
+        if archive is None or start_id >= end_id:
+            return None
+
+        offset = 0
+        if name == "messages":
+            block = start_id // ARCHIVE_INDEX_STRIDE
+            if block >= len(self._archive_offsets):
+                return None
+            offset = self._archive_offsets[block]
+
+        archive.flush()
+        archive.seek(0, os.SEEK_END)
+        return archive.name, offset, archive.tell()
+
+    @staticmethod
+    def _read_archive_extent(extent: Optional[Tuple[str, int, int]]) -> List[Dict]:
+        """_archive_extent の範囲をアーカイブとは別に開いて読み出す（ロック不要）"""
+        if extent is None:
+            return []
+        path, start, end = extent
+        with open(path, "rb") as f:
+            f.seek(start)
+            data = f.read(end - start)
+        return [json.loads(line) for line in data.splitlines()]
+
+    @_timed("post_message")
     def post_message(self, sender: str, recipient: str, content: str,
                     message_type: str = "info", metadata: Optional[Dict] = None) -> None:
         """
@@ -49,9 +578,9 @@ class Blackboard:
             message_type: メッセージタイプ (info, request, response, error)
             metadata: 追加のメタデータ
         """
-        with self._lock:
+        with self._message_lock:
             message = {
-                "id": len(self._data["messages"]),
+                "id": self._data["messages"].next_id,
                 "timestamp": datetime.now().isoformat(),
                 "sender": sender,
                 "recipient": recipient,
@@ -59,16 +588,33 @@ class Blackboard:
                 "content": content,
                 "metadata": metadata or {}
             }
-            self._data["messages"].append(message)
+            version = self._commit({"op": "message", "entry": message})
+            self._apply_message(message, time.time(), version)
+
+            # サブスクライバーへの配信はキューに積むだけ（コールバックは別スレッドで呼ばれる）
+            full = self._dispatcher.publish(message)
+
+        # "block" の購読があふれていれば、ロックを離してから空きができるまで待つ
+        if full:
+            self._dispatcher.wait_for_capacity(full)
+
+        if self.metrics is not None:
+            self.metrics.increment("blackboard.messages")
+
+        self._maybe_snapshot()
 
-            # サブスクライバーに通知
-            if recipient in self._subscribers:
-                for callback in self._subscribers[recipient]:
-                    callback(message)
-            if "all" in self._subscribers and recipient == "all":
-                for callback in self._subscribers["all"]:
-                    callback(message)
+    def _apply_message(self, message: Dict, posted_at: float, version: int) -> None:
+        """メッセージを追加（メッセージのロック取得済みで呼ぶ）"""
+        self._data["messages"].append(message)
+        self._category_versions["messages"] = version
+        self._recipient_versions[message["recipient"]] = version
+        self._count("messages_by_type", message["type"], 1)
+        self._count("messages_by_sender", message["sender"], 1)
+        self._message_times.append(posted_at)
+        self._recipient_index.setdefault(message["recipient"], []).append(message["id"])
+        self._enforce_message_retention()
 
+    @_timed("get_messages")
     def get_messages(self, recipient: Optional[str] = None,
                     since_id: Optional[int] = None) -> List[Dict]:
         """
@@ -76,36 +622,92 @@ class Blackboard:
 
         Args:
             recipient: 受信者でフィルタ (None=全メッセージ)
-            since_id: 指定したID以降のメッセージのみ取得
+            since_id: 指定したID以降のメッセージのみ取得（保持範囲より古い場合はアーカイブも読む）
 
         Returns:
-            メッセージのリスト
+            メッセージのリスト（since_id 省略時はメモリに保持しているメッセージのみ）
         """
-        with self._lock:
+        with self._message_lock:
             messages = self._data["messages"]
+            first_id = messages.first_id
+            # IDは連番なので since_id 以降はスライスで取得できる
+            start = 0 if since_id is None else max(0, since_id + 1)
 
-            if since_id is not None:
-                messages = [m for m in messages if m["id"] > since_id]
+            archived = []
+            if since_id is not None and start < first_id:
+                archived = self._read_archived_messages(start, first_id, recipient)
+            start = max(start, first_id)
 
-            if recipient is not None:
-                messages = [m for m in messages
-                          if m["recipient"] == recipient or m["recipient"] == "all"]
+            if recipient is None:
+                return archived + messages.since(start)
 
-            return messages
+            broadcast = self._ids_from(self._recipient_index.get("all"), start)
+            if recipient == "all":
+                return archived + [messages.get(i) for i in broadcast]
 
-    def subscribe(self, agent_name: str, callback: callable) -> None:
+            direct = self._ids_from(self._recipient_index.get(recipient), start)
+            # 昇順の2つの列の結合は sorted (timsort) が線形時間でマージする
+            ids = sorted(direct + broadcast) if direct and broadcast else direct or broadcast
+            return archived + [messages.get(i) for i in ids]
+
+    @staticmethod
+    def _ids_from(ids: Optional[List[int]], start: int) -> List[int]:
+        """昇順のIDリストから start 以上のIDを取得"""
+        if not ids:
+            return []
+        return ids[bisect_left(ids, start):]
+
+    def subscribe(self, agent_name: str, callback: callable,
+                  queue_size: Optional[int] = None,
+                  backpressure: Optional[str] = None) -> Subscription:
         """
         メッセージの通知を受け取るために購読
 
+        コールバックは投稿したスレッドではなく配信用のワーカースレッドから、
+        購読ごとに投稿順で呼ばれる。コールバックから post_message してもよい。
+
         Args:
-            agent_name: エージェント名
+            agent_name: エージェント名（"all" でブロードキャストを受け取る）
             callback: メッセージ受信時に呼ばれる関数
+            queue_size: 未配信キューの上限（None=Blackboard の既定値）
+            backpressure: キューがあふれたときの動作（None=Blackboard の既定値）
+
+        Returns:
+            購読（unsubscribe に渡す）
+        """
+        return self._dispatcher.subscribe(agent_name, callback, queue_size, backpressure)
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        購読を解除
+
+        Args:
+            subscription: subscribe の戻り値
+        """
+        self._dispatcher.unsubscribe(subscription)
+
+    def flush_subscribers(self, timeout: Optional[float] = None) -> bool:
+        """
+        それまでに投稿したメッセージがサブスクライバーに配信されるまで待つ
+
+        Args:
+            timeout: 最大待ち時間（秒。None=無制限）
+
+        Returns:
+            時間内に配信し終えたか
+        """
+        return self._dispatcher.flush(timeout)
+
+    def get_subscriber_stats(self) -> List[Dict[str, Any]]:
+        """
+        購読ごとの配信統計（未配信数・取りこぼし数・配信レイテンシなど）
+
+        Returns:
+            購読ごとの統計のリスト
         """
-        with self._lock:
-            if agent_name not in self._subscribers:
-                self._subscribers[agent_name] = []
-            self._subscribers[agent_name].append(callback)
+        return self._dispatcher.get_stats()
 
+    @_timed("set_value")
     def set_value(self, key: str, value: Any, category: str = "system_state") -> None:
         """
         値を設定
@@ -115,11 +717,71 @@ class Blackboard:
             value: 値
             category: カテゴリ (system_state, generated_files, tasks など)
         """
-        with self._lock:
-            if category not in self._data:
-                self._data[category] = {}
-            self._data[category][key] = value
+        self._set_entry(category, key, value)
+
+    def _set_entry(self, category: str, key: str, value: Any) -> None:
+        """キー値カテゴリのエントリを記録して設定"""
+        with self._category_lock(category):
+            version = self._commit({"op": "value", "category": category, "key": key, "value": value})
+            self._apply_value(category, key, value, version)
+        self._maybe_snapshot()
+
+    def _apply_value(self, category: str, key: str, value: Any, version: int) -> None:
+        """値を設定（カテゴリのロック取得済みで呼ぶ）"""
+        # clear() 後はロックだけ残ってカテゴリの辞書がないことがある
+        entries = self._data.setdefault(category, {})
+        if category == "tasks":
+            self._count_task(entries.get(key), -1)
+            self._count_task(value, 1)
+        elif category == "generated_files":
+            self._count_file(entries.get(key), -1)
+            self._count_file(value, 1)
+        entries[key] = value
+        self._key_versions.setdefault(category, {})[key] = version
+        self._category_versions[category] = version
 
+    def _count_task(self, task: Optional[Dict], delta: int) -> None:
+        """タスクのステータス別の集計を増減"""
+        if isinstance(task, dict):
+            self._count("tasks_by_status", task.get("status"), delta)
+
+    def _count_file(self, entry: Optional[Dict], delta: int) -> None:
+        """生成ファイルのエージェント別の集計を増減"""
+        if isinstance(entry, dict):
+            self._count("files_by_agent", entry.get("agent"), delta)
+
+    def get_input_version(self, reads: List[Any]) -> int:
+        """
+        読み取る入力の最終変更バージョン
+
+        バージョンは全体で単調増加する（clear() でも巻き戻らない）ため、入力のどれかが変われば戻り値も変わる。
+        エージェントは前回の実行時の値と比べて、入力が変わっていなければ再実行を省ける。
+
+        Args:
+            reads: 入力のリスト。要素はカテゴリ名 ("tasks" など) か (カテゴリ, キー) のタプル。
+                ("messages", 受信者名) はその受信者宛てのメッセージを表し、get_messages(recipient=受信者名)
+                と同じく "all" 宛て（全体向け）のメッセージも含む
+
+        Returns:
+            入力の中で最も新しい変更のバージョン（変更がなければ 0）
+        """
+        latest = 0
+        for item in reads:
+            if isinstance(item, str):
+                version = self._category_versions.get(item, 0)
+            else:
+                category, key = item
+                if category == "messages":
+                    version = self._recipient_versions.get(key, 0)
+                    if key != "all":
+                        version = max(version, self._recipient_versions.get("all", 0))
+                else:
+                    version = self._key_versions.get(category, {}).get(key, 0)
+            if version > latest:
+                latest = version
+        return latest
+
+    @_timed("get_value")
     def get_value(self, key: str, category: str = "system_state",
                  default: Any = None) -> Any:
         """
@@ -133,40 +795,176 @@ class Blackboard:
         Returns:
             値
         """
-        with self._lock:
-            if category not in self._data:
-                return default
-            return self._data[category].get(key, default)
+        entries = self._data.get(category)
+        if entries is None:
+            return default
+        return entries.get(key, default)
 
+    @_timed("add_generated_file")
     def add_generated_file(self, filepath: str, content: str,
-                          agent: str, description: str = "") -> None:
+                          agent: str, description: str = "") -> bool:
         """
         生成されたファイルを記録
 
+        内容は SHA-256 をキーに1回だけ保存し（再生成で同じ内容なら共有）、
+        パスごとに版の履歴を残す。行数・バイト数はここで計算してメタデータに持つ。
+
         Args:
             filepath: ファイルパス
             content: ファイル内容
             agent: 生成したエージェント名
             description: ファイルの説明
+
+        Returns:
+            記録したか（最新版と内容・エージェント・説明が同じなら記録せず False）
         """
-        with self._lock:
-            self._data["generated_files"][filepath] = {
-                "content": content,
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        with self._category_lock("generated_files"):
+            current = self._data["generated_files"].get(filepath)
+            if (current is not None and current["hash"] == digest
+                    and current["agent"] == agent and current["description"] == description):
+                # 内容もメタデータも同じ再生成は記録しない（版もバージョンも進めない）
+                return False
+            entry = {
+                "hash": digest,
                 "agent": agent,
                 "description": description,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now().isoformat(),
+                "version": current["version"] + 1 if current else 1,
+                "lines": len(content.splitlines()),
+                "bytes": len(content.encode("utf-8"))
             }
+            record = {"op": "file", "path": filepath, "entry": entry}
+            # ログにも内容は初出のときだけ書く
+            if digest not in self._data["file_blobs"]:
+                record["content"] = content
+            version = self._commit(record)
+            self._apply_file(filepath, entry, content, version)
+        self._maybe_snapshot()
+        return True
 
+    def _apply_file(self, filepath: str, entry: Dict, content: Optional[str], version: int) -> None:
+        """
+        生成ファイルの版を追加（generated_files のロック取得済みで呼ぶ）
+
+        Args:
+            filepath: ファイルパス
+            entry: 版のメタデータ
+            content: ファイル内容（None=保存済みの内容を使う）
+            version: 変更のバージョン
+        """
+        digest = entry["hash"]
+        blobs = self._data["file_blobs"]
+        if digest not in blobs:
+            blobs[digest] = content
+            self._key_versions.setdefault("file_blobs", {})[digest] = version
+        self._blob_refs[digest] = self._blob_refs.get(digest, 0) + 1
+
+        # 履歴はスナップショットと共有しないよう、追加時は新しいリストに置き換える
+        history = self._data["file_history"]
+        versions = history.get(filepath, []) + [entry]
+        if self.max_file_versions is not None and len(versions) > self.max_file_versions:
+            for removed in versions[:-self.max_file_versions]:
+                self._release_blob(removed["hash"])
+            versions = versions[-self.max_file_versions:]
+        history[filepath] = versions
+        # 差分エクスポートで履歴も書き出せるよう、履歴の変更もパスごとに記録する
+        self._key_versions.setdefault("file_history", {})[filepath] = version
+        self._category_versions["file_history"] = version
+        self._apply_value("generated_files", filepath, entry, version)
+
+    def _release_blob(self, digest: str) -> None:
+        """ファイル内容の参照を1つ減らし、参照がなくなれば破棄"""
+        refs = self._blob_refs.get(digest, 0) - 1
+        if refs > 0:
+            self._blob_refs[digest] = refs
+            return
+        self._blob_refs.pop(digest, None)
+        self._data["file_blobs"].pop(digest, None)
+        self._key_versions.get("file_blobs", {}).pop(digest, None)
+
+    def _migrate_file_entry(self, filepath: str, entry: Dict, version: int) -> None:
+        """内容を直接持つ旧形式のファイルエントリを版として取り込む"""
+        content = entry["content"]
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        current = self._data["generated_files"].get(filepath)
+        self._apply_file(filepath, {
+            "hash": digest,
+            "agent": entry.get("agent"),
+            "description": entry.get("description", ""),
+            "timestamp": entry.get("timestamp"),
+            "version": current["version"] + 1 if current else 1,
+            "lines": len(content.splitlines()),
+            "bytes": len(content.encode("utf-8"))
+        }, content, version)
+
+    @_timed("get_generated_files")
     def get_generated_files(self) -> Dict[str, Dict]:
         """
-        生成されたすべてのファイルを取得
+        生成されたすべてのファイルを内容つきで取得
+
+        内容が不要な一覧には list_generated_files を使う。
 
         Returns:
             {filepath: {content, agent, description, timestamp}}
         """
-        with self._lock:
-            return dict(self._data["generated_files"])
+        with self._category_lock("generated_files"):
+            blobs = self._data["file_blobs"]
+            return {
+                filepath: {
+                    "content": blobs[entry["hash"]],
+                    "agent": entry["agent"],
+                    "description": entry["description"],
+                    "timestamp": entry["timestamp"]
+                }
+                for filepath, entry in self._data["generated_files"].items()
+            }
+
+    @_timed("list_generated_files")
+    def list_generated_files(self) -> Dict[str, Dict]:
+        """
+        生成されたファイルのメタデータ一覧（内容には触れない）
 
+        Returns:
+            {filepath: {hash, agent, description, timestamp, version, lines, bytes}}
+        """
+        return dict(self._data["generated_files"])
+
+    @_timed("get_file_content")
+    def get_file_content(self, filepath: str, version: Optional[int] = None) -> Optional[str]:
+        """
+        生成ファイルの内容を取得
+
+        Args:
+            filepath: ファイルパス
+            version: 版番号（None=最新版）
+
+        Returns:
+            内容（ファイルまたは版が残っていなければ None）
+        """
+        with self._category_lock("generated_files"):
+            if version is None:
+                entry = self._data["generated_files"].get(filepath)
+            else:
+                entry = next((e for e in self._data["file_history"].get(filepath, [])
+                              if e["version"] == version), None)
+            if entry is None:
+                return None
+            return self._data["file_blobs"].get(entry["hash"])
+
+    def get_file_history(self, filepath: str) -> List[Dict]:
+        """
+        生成ファイルの版の履歴（古い順。max_file_versions 指定時は残っている分）
+
+        Args:
+            filepath: ファイルパス
+
+        Returns:
+            版のメタデータのリスト
+        """
+        return list(self._data["file_history"].get(filepath, []))
+
+    @_timed("add_decision")
     def add_decision(self, agent: str, decision: str, rationale: str) -> None:
         """
         設計決定を記録
@@ -176,14 +974,34 @@ class Blackboard:
             decision: 決定内容
             rationale: 決定理由
         """
-        with self._lock:
-            self._data["decisions"].append({
+        with self._decision_lock:
+            entry = {
                 "timestamp": datetime.now().isoformat(),
                 "agent": agent,
                 "decision": decision,
                 "rationale": rationale
-            })
+            }
+            version = self._commit({"op": "decision", "entry": entry})
+            self._apply_decision(entry, version)
+        self._maybe_snapshot()
+
+    def _apply_decision(self, entry: Dict, version: int) -> None:
+        """設計決定を追加（設計決定のロック取得済みで呼ぶ）"""
+        decisions = self._data["decisions"]
+        decisions.append(entry)
+        self._category_versions["decisions"] = version
 
+        if self.max_decisions is not None and len(decisions) > self.max_decisions:
+            while len(decisions) > self.max_decisions:
+                archived = decisions.first_id < self._archived_decisions
+                oldest = decisions.pop_oldest()
+                if not archived:
+                    self._archive("decisions", oldest)
+                    self._archived_decisions = decisions.first_id
+            if "decisions" in self._archives:
+                self._archives["decisions"].flush()
+
+    @_timed("get_decisions")
     def get_decisions(self, agent: Optional[str] = None) -> List[Dict]:
         """
         設計決定を取得
@@ -192,14 +1010,15 @@ class Blackboard:
             agent: エージェント名でフィルタ (None=全決定)
 
         Returns:
-            決定のリスト
+            決定のリスト（メモリに保持しているもの）
         """
-        with self._lock:
-            decisions = self._data["decisions"]
+        with self._decision_lock:
+            decisions = self._data["decisions"].to_list()
             if agent is not None:
                 decisions = [d for d in decisions if d["agent"] == agent]
             return decisions
 
+    @_timed("set_task_status")
     def set_task_status(self, task_name: str, status: str,
                        agent: Optional[str] = None, details: str = "") -> None:
         """
@@ -211,19 +1030,22 @@ class Blackboard:
             agent: 担当エージェント
             details: 詳細情報
         """
-        with self._lock:
-            if task_name not in self._data["tasks"]:
-                self._data["tasks"][task_name] = {
-                    "created_at": datetime.now().isoformat()
-                }
-
-            self._data["tasks"][task_name].update({
+        with self._category_lock("tasks"):
+            # ロックなしの読み出しやスナップショットと共有しないよう、更新時は新しい辞書に置き換える
+            task = dict(self._data["tasks"].get(task_name) or {
+                "created_at": datetime.now().isoformat()
+            })
+            task.update({
                 "status": status,
                 "agent": agent,
                 "details": details,
                 "updated_at": datetime.now().isoformat()
             })
+            version = self._commit({"op": "value", "category": "tasks", "key": task_name, "value": task})
+            self._apply_value("tasks", task_name, task, version)
+        self._maybe_snapshot()
 
+    @_timed("get_task_status")
     def get_task_status(self, task_name: str) -> Optional[Dict]:
         """
         タスクのステータスを取得
@@ -234,9 +1056,9 @@ class Blackboard:
         Returns:
             タスク情報
         """
-        with self._lock:
-            return self._data["tasks"].get(task_name)
+        return self._data["tasks"].get(task_name)
 
+    @_timed("get_all_tasks")
     def get_all_tasks(self) -> Dict[str, Dict]:
         """
         すべてのタスクを取得
@@ -244,52 +1066,410 @@ class Blackboard:
         Returns:
             {task_name: task_info}
         """
-        with self._lock:
-            return dict(self._data["tasks"])
+        return dict(self._data["tasks"])
+
+    def _snapshot(self) -> Dict[str, Any]:
+        """
+        現在の内容のスナップショット（すべてのロック取得済みで呼ぶ）
+
+        メッセージ・決定・ファイル・タスクのエントリは書き換えずに置き換えるため、
+        コンテナの浅いコピーだけで一貫したスナップショットになる。
+        """
+        data = {}
+        for category, value in self._data.items():
+            if isinstance(value, EntryBuffer):
+                data[category] = value.to_list()
+            elif isinstance(value, dict):
+                data[category] = dict(value)
+            else:
+                data[category] = value
+        return data
 
+    @_timed("export_to_json")
     def export_to_json(self, filepath: str) -> None:
         """
         Blackboardの内容をJSONファイルにエクスポート
 
+        ロック中はスナップショットの取得だけを行い、シリアライズと書き込みはロックの外で
+        エントリ単位に逐次行う（出力は json.dump(indent=2) と同じ形式）。
+
+        Args:
+            filepath: 出力ファイルパス
+        """
+        with self._all_locks():
+            data = self._snapshot()
+
+        with open(filepath, 'w', encoding='utf-8') as f:
+            _write_json_stream(f, data)
+
+    @_timed("export_delta")
+    def export_delta(self, filepath: str, cursor: Optional[Dict[str, int]] = None,
+                     append: bool = True) -> Dict[str, int]:
+        """
+        前回のエクスポート以降の変更だけを行区切りJSONで書き出す
+
+        1行目はヘッダー {"type": "header", "since": ..., "version": ...}、以降は1行1エントリ
+        ({"type": "message" / "decision", "entry": ...} または
+         {"type": "entry", "category": ..., "key": ..., "value": ..., "version": ...})。
+
+        メッセージと設計決定は、カーソル以降にアーカイブへ移ったものも含む（アーカイブの
+        ファイルはロックを離してから読む）。生成ファイルは generated_files（最新版のメタデータ）、
+        file_history（パスごとの残っている版の一覧）、file_blobs（ハッシュごとの内容）の
+        エントリとして書き出す。変更後に削除されたキー（clear() や履歴から外れた内容）は含まない。
+
         Args:
             filepath: 出力ファイルパス
+            cursor: 前回の戻り値（None の場合はこのBlackboardで前回 export_delta した位置。
+                初回はすべて）
+            append: True なら追記、False なら上書き
+
+        Returns:
+            次回の差分エクスポートに渡すカーソル
         """
-        with self._lock:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(self._data, f, ensure_ascii=False, indent=2)
+        with self._all_locks():
+            if cursor is None:
+                cursor = self._export_cursor or {"version": 0, "message_id": 0, "decision_id": 0}
 
+            messages = self._data["messages"]
+            decisions = self._data["decisions"]
+            # アーカイブ済みの分は範囲だけ確定し、ファイルはロックを離してから読む
+            message_extent = self._archive_extent("messages", cursor["message_id"], messages.first_id)
+            decision_extent = self._archive_extent("decisions", cursor["decision_id"],
+                                                   decisions.first_id)
+            archived_messages_end = messages.first_id
+            archived_decisions_end = decisions.first_id
+            retained_messages = messages.since(cursor["message_id"])
+            retained_decisions = decisions.since(cursor["decision_id"])
+
+            changed = []
+            for category, versions in self._key_versions.items():
+                entries = self._data.get(category, {})
+                for key, version in versions.items():
+                    if version > cursor["version"] and key in entries:
+                        changed.append((category, key, entries[key], version))
+
+            next_cursor = {
+                "version": self._version,
+                "message_id": messages.next_id,
+                "decision_id": decisions.next_id
+            }
+            self._export_cursor = next_cursor
+
+        new_messages = [m for m in self._read_archive_extent(message_extent)
+                        if cursor["message_id"] <= m["id"] < archived_messages_end]
+        new_messages += retained_messages
+        # decisions.jsonl の n 行目は ID n の設計決定
+        new_decisions = self._read_archive_extent(decision_extent)[
+            cursor["decision_id"]:archived_decisions_end]
+        new_decisions += retained_decisions
+
+        changed.sort(key=lambda entry: entry[3])
+        with open(filepath, 'a' if append else 'w', encoding='utf-8') as f:
+            f.write(json.dumps({
+                "type": "header",
+                "since": cursor["version"],
+                "version": next_cursor["version"],
+                "timestamp": datetime.now().isoformat()
+            }, ensure_ascii=False) + "\n")
+            for message in new_messages:
+                f.write(json.dumps({"type": "message", "entry": message}, ensure_ascii=False) + "\n")
+            for decision in new_decisions:
+                f.write(json.dumps({"type": "decision", "entry": decision}, ensure_ascii=False) + "\n")
+            for category, key, value, version in changed:
+                f.write(json.dumps({
+                    "type": "entry",
+                    "category": category,
+                    "key": key,
+                    "value": value,
+                    "version": version
+                }, ensure_ascii=False) + "\n")
+
+        return next_cursor
+
+    @_timed("get_summary")
     def get_summary(self) -> Dict[str, Any]:
         """
         Blackboardの要約を取得
 
         Returns:
-            要約情報
+            要約情報（件数に加え、ステータス別のタスク数・タイプ別/送信者別のメッセージ数・
+            エージェント別の生成ファイル数）
         """
-        with self._lock:
-            return {
-                "total_messages": len(self._data["messages"]),
-                "total_files": len(self._data["generated_files"]),
-                "total_decisions": len(self._data["decisions"]),
-                "total_tasks": len(self._data["tasks"]),
-                "completed_tasks": sum(1 for t in self._data["tasks"].values()
-                                      if t.get("status") == "completed"),
-                "failed_tasks": sum(1 for t in self._data["tasks"].values()
-                                   if t.get("status") == "failed")
-            }
+        # 集計は変更ごとに更新済みなので、件数に比例するコストはかからない
+        counters = self._counters
+        tasks_by_status = dict(counters["tasks_by_status"])
+        messages = self._data["messages"]
+        return {
+            "total_messages": messages.next_id,
+            "retained_messages": len(messages),
+            "total_files": len(self._data["generated_files"]),
+            "unique_file_blobs": len(self._data["file_blobs"]),
+            "total_decisions": self._data["decisions"].next_id,
+            "total_tasks": len(self._data["tasks"]),
+            "completed_tasks": tasks_by_status.get("completed", 0),
+            "failed_tasks": tasks_by_status.get("failed", 0),
+            "tasks_by_status": tasks_by_status,
+            "messages_by_type": dict(counters["messages_by_type"]),
+            "messages_by_sender": dict(counters["messages_by_sender"]),
+            "files_by_agent": dict(counters["files_by_agent"])
+        }
 
     def clear(self) -> None:
         """
         Blackboardをクリア（テスト用）
         """
-        with self._lock:
-            self._data = {
-                "messages": [],
-                "generated_files": {},
-                "system_state": {},
-                "decisions": [],
-                "tasks": {},
-                "metadata": {
-                    "created_at": datetime.now().isoformat(),
-                    "version": "1.0.0"
-                }
+        with self._all_locks():
+            self._log({"op": "clear"})
+            self._clear_data()
+        self._maybe_snapshot()
+
+    def _clear_data(self) -> None:
+        """
+        データを初期化（すべてのロック取得済みで呼ぶ。clear と WAL の再生で共通）
+
+        バージョンは巻き戻さずにクリア自体を1つの変更として採番し、それまでに変更のあった
+        カテゴリと受信者のバージョンをすべて進める（get_input_version の単調増加を保つ）。
+        """
+        version = self._version + 1
+        categories = set(self._category_versions) | set(self._data)
+        recipients = set(self._recipient_versions)
+
+        self._close_archives()
+        self._reset()
+        self._open_archives(truncate=True)
+
+        self._version = version
+        self._category_versions = dict.fromkeys(categories, version)
+        self._recipient_versions = dict.fromkeys(recipients, version)
+
+    # ------------------------------------------------------------------
+    # 先行書き込みログ (WAL) とスナップショット
+    # ------------------------------------------------------------------
+
+    def _segment_path(self, seq: int) -> str:
+        """ログのセグメントファイルのパス"""
+        return os.path.join(self.wal_dir, WAL_SEGMENT_FORMAT.format(seq))
+
+    @staticmethod
+    def _list_segments(wal_dir: str) -> List[int]:
+        """ディレクトリ内のログのセグメント番号（昇順）"""
+        prefix, suffix = WAL_SEGMENT_FORMAT.split("{")[0], ".jsonl"
+        seqs = []
+        for name in os.listdir(wal_dir):
+            if name.startswith(prefix) and name.endswith(suffix):
+                try:
+                    seqs.append(int(name[len(prefix):-len(suffix)]))
+                except ValueError:
+                    continue
+        return sorted(seqs)
+
+    def _start_wal(self, fresh: bool, seq: int = 0) -> None:
+        """
+        ログの書き込みを開始
+
+        Args:
+            fresh: True なら既存のスナップショットとログを削除して新規に開始
+            seq: 書き込むセグメント番号
+        """
+        os.makedirs(self.wal_dir, exist_ok=True)
+        if fresh:
+            for old in self._list_segments(self.wal_dir):
+                os.remove(self._segment_path(old))
+            snapshot_path = os.path.join(self.wal_dir, WAL_SNAPSHOT_FILE)
+            if os.path.exists(snapshot_path):
+                os.remove(snapshot_path)
+        self._wal_seq = seq
+        self._wal_records = 0
+        self._wal = open(self._segment_path(seq), "ab")
+
+    def _log(self, record: Dict) -> None:
+        """変更をログに追記（ロック取得済みで、変更を適用する前に呼ぶ）"""
+        if self._wal is None:
+            return
+        self._wal.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+        self._wal.flush()
+        if self.wal_fsync:
+            os.fsync(self._wal.fileno())
+        self._wal_records += 1
+
+    def _maybe_snapshot(self) -> None:
+        """ログが snapshot_interval 件を超えたらスナップショットを書き出す"""
+        if self._wal is not None and self._wal_records >= self.snapshot_interval:
+            self.snapshot()
+
+    @_timed("snapshot")
+    def snapshot(self) -> None:
+        """
+        現在の状態をスナップショットとして書き出し、それ以前のログを削除する
+
+        ロック中は状態のコピーと新しいセグメントへの切り替えだけを行い、書き出しはロックの外で行う。
+        書き出し中に落ちても、古いスナップショット + 残っているログから復元できる。
+        """
+        with self._snapshot_lock:
+            self._write_snapshot()
+
+    def _write_snapshot(self) -> None:
+        """スナップショットの書き出し（_snapshot_lock 取得済みで呼ぶ）"""
+        with self._all_locks():
+            if self._wal is None:
+                return
+            state = {
+                "format": WAL_FORMAT_VERSION,
+                "wal_seq": self._wal_seq + 1,
+                "version": self._version,
+                "key_versions": {category: dict(versions)
+                                 for category, versions in self._key_versions.items()},
+                "category_versions": dict(self._category_versions),
+                "recipient_versions": dict(self._recipient_versions),
+                "messages_first_id": self._data["messages"].first_id,
+                "decisions_first_id": self._data["decisions"].first_id,
+                "counters": {name: dict(counts) for name, counts in self._counters.items()},
+                "data": self._snapshot()
             }
+            self._wal.close()
+            self._start_wal(fresh=False, seq=self._wal_seq + 1)
+            wal_dir = self.wal_dir
+
+        snapshot_path = os.path.join(wal_dir, WAL_SNAPSHOT_FILE)
+        temp_path = snapshot_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, snapshot_path)
+
+        for seq in self._list_segments(wal_dir):
+            if seq < state["wal_seq"]:
+                os.remove(os.path.join(wal_dir, WAL_SEGMENT_FORMAT.format(seq)))
+
+    def _restore_snapshot(self, state: Dict) -> None:
+        """スナップショットから状態を復元（すべてのロック取得済みで呼ぶ）"""
+        data = state["data"]
+        for category, value in data.items():
+            if category in ("messages", "decisions"):
+                continue
+            self._data[category] = value
+            if isinstance(value, dict) and category != "metadata":
+                self._category_locks.setdefault(category, InstrumentedLock(category, self.metrics))
+
+        messages = self._data["messages"] = EntryBuffer(state["messages_first_id"])
+        self._message_times = EntryBuffer(state["messages_first_id"])
+        for message in data.get("messages", []):
+            messages.append(message)
+            self._message_times.append(datetime.fromisoformat(message["timestamp"]).timestamp())
+            self._recipient_index.setdefault(message["recipient"], []).append(message["id"])
+
+        decisions = self._data["decisions"] = EntryBuffer(state["decisions_first_id"])
+        for decision in data.get("decisions", []):
+            decisions.append(decision)
+
+        self._version = state["version"]
+        self._key_versions = {category: dict(versions)
+                              for category, versions in state["key_versions"].items()}
+        if "category_versions" in state:
+            self._category_versions = dict(state["category_versions"])
+            self._recipient_versions = dict(state["recipient_versions"])
+        else:
+            # 古いスナップショットには無いため、スナップショット時点のバージョンで変更ありとみなす
+            for category in self._data:
+                self._category_versions[category] = self._version
+            for recipient in self._recipient_index:
+                self._recipient_versions[recipient] = self._version
+
+        # 参照数はスナップショットに持たず、履歴から数え直す
+        for versions in self._data["file_history"].values():
+            for entry in versions:
+                self._blob_refs[entry["hash"]] = self._blob_refs.get(entry["hash"], 0) + 1
+
+        if "counters" in state:
+            self._counters = {name: dict(counts) for name, counts in state["counters"].items()}
+        else:
+            # 集計のない古いスナップショット（メッセージは保持分だけから数える）
+            for task in self._data["tasks"].values():
+                self._count_task(task, 1)
+            for entry in self._data["generated_files"].values():
+                self._count_file(entry, 1)
+            for message in messages.to_list():
+                self._count("messages_by_type", message["type"], 1)
+                self._count("messages_by_sender", message["sender"], 1)
+
+        # 内容を直接持つ旧形式のファイルエントリは、内容の保存先と履歴に移す
+        files = self._data["generated_files"]
+        for filepath, entry in [(path, e) for path, e in files.items() if "content" in e]:
+            del files[filepath]
+            self._count_file(entry, -1)
+            version = self._key_versions.get("generated_files", {}).get(filepath, self._version)
+            self._migrate_file_entry(filepath, entry, version)
+
+    def _replay(self, record: Dict) -> None:
+        """ログの1件を再生（読み込み中の単一スレッドで呼ぶ）"""
+        op = record["op"]
+        if op == "message":
+            message = record["entry"]
+            version = self._commit(None)
+            self._apply_message(message, datetime.fromisoformat(message["timestamp"]).timestamp(), version)
+        elif op == "value":
+            self._category_lock(record["category"])
+            version = self._commit(None)
+            value = record["value"]
+            if record["category"] == "generated_files" and "content" in value:
+                self._migrate_file_entry(record["key"], value, version)
+            else:
+                self._apply_value(record["category"], record["key"], value, version)
+        elif op == "file":
+            version = self._commit(None)
+            self._apply_file(record["path"], record["entry"], record.get("content"), version)
+        elif op == "decision":
+            version = self._commit(None)
+            self._apply_decision(record["entry"], version)
+        elif op == "clear":
+            self._clear_data()
+        else:
+            raise ValueError(f"Unknown WAL record: {op}")
+
+    @classmethod
+    def load(cls, wal_dir: str, **options) -> "Blackboard":
+        """
+        スナップショットとログから Blackboard を復元し、同じディレクトリへの記録を再開する
+
+        最後の行が書き込み途中で壊れている場合はその行を無視する。
+
+        Args:
+            wal_dir: 先行書き込みログのディレクトリ
+            **options: コンストラクタの引数（max_messages, archive_dir など。wal_dir 以外）
+
+        Returns:
+            復元した Blackboard
+        """
+        options.pop("wal_dir", None)
+        archive_dir = options.pop("archive_dir", None)
+        board = cls(**options)
+        board.archive_dir = archive_dir
+        board.wal_dir = wal_dir
+
+        with board._snapshot_lock:
+            board._open_archives(truncate=False)
+            seq = 0
+            if os.path.isdir(wal_dir):
+                snapshot_path = os.path.join(wal_dir, WAL_SNAPSHOT_FILE)
+                if os.path.exists(snapshot_path):
+                    with open(snapshot_path, "r", encoding="utf-8") as f:
+                        state = json.load(f)
+                    board._restore_snapshot(state)
+                    seq = state["wal_seq"]
+
+                segments = [s for s in cls._list_segments(wal_dir) if s >= seq]
+                for segment in segments:
+                    with open(board._segment_path(segment), "rb") as f:
+                        for line in f:
+                            try:
+                                record = json.loads(line)
+                            except json.JSONDecodeError:
+                                break
+                            board._replay(record)
+                if segments:
+                    seq = segments[-1] + 1
+
+            # 復元後は新しいセグメントに追記する（古いセグメントは次のスナップショットで削除）
+            board._start_wal(fresh=False, seq=seq)
+        return board
@@ -0,0 +1,734 @@
+"""
+Blackboard Server - プロセス・マシンをまたいで共有する Blackboard
+
+BlackboardServer は1つの Blackboard をソケット（TCP または Unix ドメインソケット）で公開し、
+RemoteBlackboard は同じ API（post_message, get_messages, set_value, add_generated_file, ...）を
+持つクライアント側のプロキシとして動く。エージェントは Blackboard と RemoteBlackboard の
+どちらを渡されても同じように動く。
+
+プロトコル:
+    フレーム = ヘッダー (ペイロード長 uint32, 種別 uint8, リクエストID uint32) + ペイロード
+    ペイロードは JSON 相当の値（None, bool, int, float, str, bytes, list, dict）の
+    タグつきバイナリ表現（pickle と違い任意のオブジェクトは復元しない）
+
+    REQUEST     [method, args, kwargs]           → RESPONSE [ok, 結果 or エラー]
+    BATCH       [[method, args, kwargs], ...]    → RESPONSE [ok, [[ok, 結果], ...]]
+    SUBSCRIBE   [name, queue_size, backpressure] → RESPONSE [ok, 購読ID]
+    UNSUBSCRIBE 購読ID                            → RESPONSE [ok, None]
+    EVENT       メッセージ（サーバーからの通知。リクエストIDの位置に購読ID）
+
+クライアントは応答を待たずに次のリクエストを送れる（パイプライン化。応答はリクエストIDで
+対応づける）。batch() の中の呼び出しは1フレームにまとめて送る。
+
+使い方:
+    python blackboard_server.py --port 7070
+    board = RemoteBlackboard(("127.0.0.1", 7070))
+"""
+
+import argparse
+import logging
+import os
+import socket
+import socketserver
+import struct
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from queue import SimpleQueue
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from blackboard import Blackboard
+
+logger = logging.getLogger("BlackboardServer")
+
+# フレームの種別
+REQUEST = 1
+RESPONSE = 2
+BATCH = 3
+SUBSCRIBE = 4
+UNSUBSCRIBE = 5
+EVENT = 6
+
+FRAME_HEADER = struct.Struct("!IBI")
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+# 値の入れ子の最大の深さ（深い入れ子で RecursionError にならないように）
+MAX_DEPTH = 64
+
+# リモートから呼び出せる Blackboard のメソッド（サーバーのファイルを書くメソッドは含めない）
+REMOTE_METHODS = (
+    "post_message", "get_messages",
+    "set_value", "get_value", "get_input_version",
+    "add_generated_file", "get_generated_files", "list_generated_files",
+    "get_file_content", "get_file_history",
+    "add_decision", "get_decisions",
+    "set_task_status", "get_task_status", "get_all_tasks",
+    "get_summary", "get_lock_stats", "get_subscriber_stats", "flush_subscribers",
+)
+
+# サーバーに export_dir を指定した場合だけ呼び出せるメソッド
+# （出力先はファイル名だけを受け付け、export_dir の直下に書く）
+EXPORT_METHODS = ("export_to_json", "export_delta")
+
+Address = Union[Tuple[str, int], str]
+
+
+# ----------------------------------------------------------------------
+# 値のバイナリ表現
+# ----------------------------------------------------------------------
+
+_INT = struct.Struct("!q")
+_FLOAT = struct.Struct("!d")
+_LEN = struct.Struct("!I")
+
+
+def encode_value(value: Any) -> bytes:
+    """
+    JSON 相当の値をタグつきバイナリに変換
+
+    Args:
+        value: None, bool, int, float, str, bytes, list/tuple, dict の組み合わせ
+
+    Returns:
+        バイト列
+    """
+    out = bytearray()
+    _encode(value, out)
+    return bytes(out)
+
+
+def _encode(value: Any, out: bytearray) -> None:
+    """値を out に追記"""
+    if value is None:
+        out += b"N"
+    elif value is True:
+        out += b"T"
+    elif value is False:
+        out += b"F"
+    elif isinstance(value, int):
+        if -2**63 <= value < 2**63:
+            out += b"i"
+            out += _INT.pack(value)
+        else:
+            # 64ビットに収まらない整数は10進文字列で送る
+            data = str(value).encode("ascii")
+            out += b"I"
+            out += _LEN.pack(len(data))
+            out += data
+    elif isinstance(value, float):
+        out += b"d"
+        out += _FLOAT.pack(value)
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        out += b"s"
+        out += _LEN.pack(len(data))
+        out += data
+    elif isinstance(value, (bytes, bytearray)):
+        out += b"b"
+        out += _LEN.pack(len(value))
+        out += value
+    elif isinstance(value, (list, tuple)):
+        out += b"l"
+        out += _LEN.pack(len(value))
+        for item in value:
+            _encode(item, out)
+    elif isinstance(value, dict):
+        out += b"m"
+        out += _LEN.pack(len(value))
+        for key, item in value.items():
+            _encode(key, out)
+            _encode(item, out)
+    else:
+        raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+def decode_value(data: bytes) -> Any:
+    """
+    encode_value の逆変換
+
+    Args:
+        data: バイト列
+
+    Returns:
+        値（tuple は list になる）
+    """
+    try:
+        value, offset = _decode(memoryview(data), 0, 0)
+    except (IndexError, struct.error):
+        raise ValueError("Truncated value") from None
+    if offset != len(data):
+        raise ValueError("Trailing bytes after value")
+    return value
+
+
+def _decode(view: memoryview, offset: int, depth: int) -> Tuple[Any, int]:
+    """offset から値を1つ読み、(値, 次の位置) を返す"""
+    if depth > MAX_DEPTH:
+        raise ValueError(f"Value nested deeper than {MAX_DEPTH} levels")
+    tag = view[offset]
+    offset += 1
+    if tag == 0x4E:     # N
+        return None, offset
+    if tag == 0x54:     # T
+        return True, offset
+    if tag == 0x46:     # F
+        return False, offset
+    if tag == 0x69:     # i
+        return _INT.unpack_from(view, offset)[0], offset + 8
+    if tag == 0x64:     # d
+        return _FLOAT.unpack_from(view, offset)[0], offset + 8
+    if tag in (0x73, 0x62, 0x49):   # s, b, I
+        length = _LEN.unpack_from(view, offset)[0]
+        offset += 4
+        if length > len(view) - offset:
+            raise ValueError(f"Length prefix {length} exceeds the frame")
+        raw = bytes(view[offset:offset + length])
+        offset += length
+        if tag == 0x73:
+            return raw.decode("utf-8"), offset
+        if tag == 0x62:
+            return raw, offset
+        return int(raw.decode("ascii")), offset
+    if tag == 0x6C:     # l
+        count = _LEN.unpack_from(view, offset)[0]
+        offset += 4
+        # 要素は最低1バイトなので、残りのバイト数より多い件数は不正
+        if count > len(view) - offset:
+            raise ValueError(f"Item count {count} exceeds the frame")
+        items = []
+        for _ in range(count):
+            item, offset = _decode(view, offset, depth + 1)
+            items.append(item)
+        return items, offset
+    if tag == 0x6D:     # m
+        count = _LEN.unpack_from(view, offset)[0]
+        offset += 4
+        if count * 2 > len(view) - offset:
+            raise ValueError(f"Item count {count} exceeds the frame")
+        result = {}
+        for _ in range(count):
+            key, offset = _decode(view, offset, depth + 1)
+            if isinstance(key, list):
+                key = tuple(key)
+            result[key], offset = _decode(view, offset, depth + 1)
+        return result, offset
+    raise ValueError(f"Unknown value tag: {tag:#x}")
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    """size バイトを読む（接続が閉じられたら None）"""
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_frame(sock: socket.socket,
+               max_size: int = MAX_FRAME_SIZE) -> Optional[Tuple[int, int, Any]]:
+    """
+    フレームを1つ読む
+
+    Args:
+        sock: ソケット
+        max_size: ペイロードの最大長（超える長さのヘッダーはペイロードを読む前に拒否する）
+
+    Returns:
+        (種別, リクエストID, ペイロードの値)（接続が閉じられたら None）
+    """
+    header = _recv_exact(sock, FRAME_HEADER.size)
+    if header is None:
+        return None
+    length, kind, request_id = FRAME_HEADER.unpack(header)
+    if length > max_size:
+        raise ValueError(f"Frame too large: {length} bytes")
+    payload = _recv_exact(sock, length) if length else b""
+    if payload is None:
+        return None
+    return kind, request_id, decode_value(payload)
+
+
+def pack_frame(kind: int, request_id: int, value: Any) -> bytes:
+    """フレームのバイト列"""
+    payload = encode_value(value)
+    return FRAME_HEADER.pack(len(payload), kind, request_id) + payload
+
+
+# ----------------------------------------------------------------------
+# サーバー
+# ----------------------------------------------------------------------
+
+def _error(exc: BaseException) -> List[Any]:
+    """例外の応答ペイロード"""
+    return [False, [type(exc).__name__, str(exc)]]
+
+
+class _ConnectionHandler(socketserver.BaseRequestHandler):
+    """1接続のリクエストを順に処理する（応答と通知の送信は send_lock で直列化）"""
+
+    def setup(self) -> None:
+        self.board: Blackboard = self.server.blackboard
+        self.send_lock = threading.Lock()
+        self.subscriptions: Dict[int, Any] = {}
+        self.next_subscription_id = 1
+        if self.server.address_family != getattr(socket, "AF_UNIX", None):
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def send(self, kind: int, request_id: int, value: Any) -> None:
+        """フレームを送る（切断済みなら無視）"""
+        frame = pack_frame(kind, request_id, value)
+        with self.send_lock:
+            try:
+                self.request.sendall(frame)
+            except OSError:
+                pass
+
+    def call(self, request: List[Any]) -> List[Any]:
+        """[method, args, kwargs] を実行して [ok, 結果] を返す"""
+        try:
+            method, args, kwargs = request
+            if method in EXPORT_METHODS:
+                args, kwargs = _confine_export(self.server.export_dir, list(args), dict(kwargs))
+            elif method not in REMOTE_METHODS:
+                raise AttributeError(f"Method not allowed: {method}")
+            return [True, getattr(self.board, method)(*args, **kwargs)]
+        except Exception as e:
+            return _error(e)
+
+    def handle(self) -> None:
+        try:
+            while True:
+                frame = read_frame(self.request, self.server.max_frame_size)
+                if frame is None:
+                    return
+                kind, request_id, payload = frame
+                if kind == REQUEST:
+                    self.send(RESPONSE, request_id, self.call(payload))
+                elif kind == BATCH:
+                    self.send(RESPONSE, request_id, [True, [self.call(r) for r in payload]])
+                elif kind == SUBSCRIBE:
+                    self.send(RESPONSE, request_id, self.subscribe(*payload))
+                elif kind == UNSUBSCRIBE:
+                    subscription = self.subscriptions.pop(payload, None)
+                    if subscription is not None:
+                        self.board.unsubscribe(subscription)
+                    self.send(RESPONSE, request_id, [True, None])
+                else:
+                    self.send(RESPONSE, request_id, _error(ValueError(f"Unknown frame kind: {kind}")))
+        except (OSError, ValueError) as e:
+            logger.warning("Connection closed: %s", e)
+
+    def subscribe(self, name: str, queue_size: Optional[int], backpressure: Optional[str]) -> List[Any]:
+        """購読を作り、メッセージを EVENT として送る"""
+        subscription_id = self.next_subscription_id
+        self.next_subscription_id += 1
+
+        def push(message: Dict) -> None:
+            self.send(EVENT, subscription_id, message)
+
+        try:
+            self.subscriptions[subscription_id] = self.board.subscribe(
+                name, push, queue_size, backpressure)
+        except Exception as e:
+            return _error(e)
+        return [True, subscription_id]
+
+    def finish(self) -> None:
+        for subscription in self.subscriptions.values():
+            self.board.unsubscribe(subscription)
+        self.subscriptions.clear()
+
+
+def _confine_export(export_dir: Optional[str], args: List[Any],
+                    kwargs: Dict[str, Any]) -> Tuple[List[Any], Dict[str, Any]]:
+    """エクスポートの出力先（filepath）を export_dir 直下のファイルに置き換える"""
+    if export_dir is None:
+        raise PermissionError("Exports are disabled on this server (no export_dir)")
+    if args:
+        filename = args[0]
+    elif "filepath" in kwargs:
+        filename = kwargs["filepath"]
+    else:
+        raise TypeError("filepath is required")
+    if (not isinstance(filename, str) or not filename or filename in (".", "..")
+            or os.path.basename(filename) != filename
+            or (os.altsep and os.altsep in filename)):
+        raise PermissionError(f"Export filepath must be a plain file name: {filename!r}")
+    path = os.path.join(export_dir, filename)
+    if args:
+        args[0] = path
+    else:
+        kwargs["filepath"] = path
+    return args, kwargs
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+else:
+    _UnixServer = None
+
+
+class BlackboardServer:
+    """
+    Blackboard をソケットで公開するサーバー
+    """
+
+    def __init__(self, blackboard: Optional[Blackboard] = None,
+                 address: Address = ("127.0.0.1", 0),
+                 export_dir: Optional[str] = None,
+                 max_frame_size: int = MAX_FRAME_SIZE):
+        """
+        Args:
+            blackboard: 公開する Blackboard（None=新規作成）
+            address: (host, port) なら TCP（port=0 で空きポート）、文字列なら Unix ドメインソケットのパス
+            export_dir: export_to_json / export_delta をリモートから呼べるようにする場合の
+                出力ディレクトリ（クライアントはファイル名だけを指定できる。None=呼べない）
+            max_frame_size: 受け付けるフレームのペイロードの最大長
+
+        認証はないため、信頼できないネットワークに公開しないこと。
+        """
+        self.blackboard = blackboard if blackboard is not None else Blackboard()
+        if isinstance(address, str):
+            if _UnixServer is None:
+                raise ValueError("Unix domain sockets are not supported on this platform")
+            if os.path.exists(address):
+                os.remove(address)
+            self._server = _UnixServer(address, _ConnectionHandler)
+        else:
+            self._server = _TCPServer(tuple(address), _ConnectionHandler)
+        self._server.blackboard = self.blackboard
+        self._server.export_dir = os.path.abspath(export_dir) if export_dir else None
+        self._server.max_frame_size = max_frame_size
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Address:
+        """接続先のアドレス（port=0 で起動した場合は割り当てられたポート）"""
+        return self._server.server_address
+
+    def start(self) -> "BlackboardServer":
+        """バックグラウンドのスレッドで受け付けを開始"""
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name="blackboard-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """現在のスレッドで受け付け続ける"""
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        """受け付けを止める（Blackboard は閉じない）"""
+        self._server.shutdown()
+        self._server.server_close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "BlackboardServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+# ----------------------------------------------------------------------
+# クライアント
+# ----------------------------------------------------------------------
+
+class RemoteError(Exception):
+    """サーバー側で発生した例外"""
+
+    def __init__(self, remote_type: str, message: str):
+        super().__init__(f"{remote_type}: {message}")
+        self.remote_type = remote_type
+
+
+class RemoteSubscription:
+    """RemoteBlackboard.subscribe の戻り値"""
+
+    def __init__(self, subscription_id: int, name: str, callback: Callable[[Dict], Any]):
+        self.id = subscription_id
+        self.name = name
+        self.callback = callback
+
+
+class RemoteBlackboard:
+    """
+    BlackboardServer に接続する Blackboard のプロキシ
+
+    Blackboard と同じメソッドを持ち、呼び出しはサーバー上で実行される。
+    call_async() は応答を待たずに Future を返し、batch() の中の呼び出しは
+    まとめて1回で送られる。購読のコールバックはこのプロセスの通知用スレッドで呼ばれる。
+    """
+
+    # Orchestrator などが参照する（計測はサーバー側の Blackboard で行う）
+    metrics = None
+
+    def __init__(self, address: Address, timeout: Optional[float] = 30.0):
+        """
+        Args:
+            address: サーバーのアドレス ((host, port) または Unix ドメインソケットのパス)
+            timeout: 応答を待つ最大時間（秒。None=無制限）
+        """
+        self.address = address
+        self.timeout = timeout
+        if isinstance(address, str):
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.connect(address)
+        else:
+            self._sock = socket.create_connection(tuple(address))
+            self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        self._send_lock = threading.Lock()
+        self._pending: Dict[int, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._next_id = 1
+        self._subscriptions: Dict[int, RemoteSubscription] = {}
+        self._batch: Optional[List[Tuple[List[Any], Future]]] = None
+        self._batch_owner: Optional[int] = None
+        self._events: SimpleQueue = SimpleQueue()
+        self._closed = False
+
+        self._reader = threading.Thread(target=self._read_loop, name="remote-blackboard-reader",
+                                        daemon=True)
+        self._notifier = threading.Thread(target=self._notify_loop,
+                                          name="remote-blackboard-notifier", daemon=True)
+        self._reader.start()
+        self._notifier.start()
+
+    def _send(self, kind: int, value: Any) -> Future:
+        """フレームを送り、応答の Future を返す"""
+        future = Future()
+        with self._pending_lock:
+            if self._closed:
+                raise ConnectionError("RemoteBlackboard is closed")
+            request_id = self._next_id
+            self._next_id = (self._next_id + 1) & 0xFFFFFFFF or 1
+            self._pending[request_id] = future
+        frame = pack_frame(kind, request_id, value)
+        with self._send_lock:
+            self._sock.sendall(frame)
+        return future
+
+    def _result(self, future: Future) -> Any:
+        """応答を待って結果を返す（エラーなら RemoteError）"""
+        ok, value = future.result(self.timeout)
+        if not ok:
+            raise RemoteError(*value)
+        return value
+
+    def call_async(self, method: str, *args, **kwargs) -> Future:
+        """
+        応答を待たずにメソッドを呼び出す（パイプライン化）
+
+        Args:
+            method: Blackboard のメソッド名
+
+        Returns:
+            結果の Future（サーバー側の例外は RemoteError として送出される）
+        """
+        request = [method, list(args), kwargs]
+        result = Future()
+        if self._batch is not None and self._batch_owner == threading.get_ident():
+            self._batch.append((request, result))
+            return result
+        self._send(REQUEST, request).add_done_callback(
+            lambda future: self._resolve(result, future))
+        return result
+
+    def call(self, method: str, *args, **kwargs) -> Any:
+        """
+        メソッドを呼び出して結果を待つ
+
+        Args:
+            method: Blackboard のメソッド名
+
+        Returns:
+            結果
+        """
+        if self._batch is not None and self._batch_owner == threading.get_ident():
+            return self.call_async(method, *args, **kwargs)
+        return self._result(self._send(REQUEST, [method, list(args), kwargs]))
+
+    @staticmethod
+    def _resolve(result: Future, future: Future) -> None:
+        """[ok, 値] の応答を result に反映"""
+        exc = future.exception()
+        if exc is not None:
+            result.set_exception(exc)
+            return
+        ok, value = future.result()
+        if ok:
+            result.set_result(value)
+        else:
+            result.set_exception(RemoteError(*value))
+
+    @contextmanager
+    def batch(self):
+        """
+        ブロック内の呼び出しを1フレームにまとめて送る
+
+        ブロック内の呼び出しは結果の代わりに Future を返し、ブロックを抜けた時点で確定する。
+
+            with board.batch():
+                futures = [board.post_message(...) for ...]
+        """
+        if self._batch is not None:
+            raise RuntimeError("batch() cannot be nested")
+        self._batch = []
+        self._batch_owner = threading.get_ident()
+        try:
+            yield self
+        finally:
+            calls, self._batch, self._batch_owner = self._batch, None, None
+        if not calls:
+            return
+        ok, results = self._send(BATCH, [request for request, _ in calls]).result(self.timeout)
+        for (_, future), (call_ok, value) in zip(calls, results):
+            if call_ok:
+                future.set_result(value)
+            else:
+                future.set_exception(RemoteError(*value))
+
+    def subscribe(self, agent_name: str, callback: Callable[[Dict], Any],
+                  queue_size: Optional[int] = None,
+                  backpressure: Optional[str] = None) -> RemoteSubscription:
+        """
+        サーバー上で購読し、メッセージをこのプロセスのコールバックで受け取る
+
+        Args:
+            agent_name: エージェント名（"all" でブロードキャストを受け取る）
+            callback: メッセージ受信時に呼ばれる関数
+            queue_size: サーバー側の未配信キューの上限（None=サーバーの既定値）
+            backpressure: キューがあふれたときの動作（None=サーバーの既定値）
+
+        Returns:
+            購読（unsubscribe に渡す）
+        """
+        subscription_id = self._result(self._send(SUBSCRIBE, [agent_name, queue_size, backpressure]))
+        subscription = RemoteSubscription(subscription_id, agent_name, callback)
+        self._subscriptions[subscription_id] = subscription
+        return subscription
+
+    def unsubscribe(self, subscription: RemoteSubscription) -> None:
+        """
+        購読を解除
+
+        Args:
+            subscription: subscribe の戻り値
+        """
+        self._subscriptions.pop(subscription.id, None)
+        self._result(self._send(UNSUBSCRIBE, subscription.id))
+
+    def _read_loop(self) -> None:
+        """応答と通知を受信"""
+        error: BaseException = ConnectionError("Connection closed by server")
+        try:
+            while True:
+                frame = read_frame(self._sock)
+                if frame is None:
+                    break
+                kind, request_id, payload = frame
+                if kind == EVENT:
+                    self._events.put((request_id, payload))
+                    continue
+                with self._pending_lock:
+                    future = self._pending.pop(request_id, None)
+                if future is not None:
+                    future.set_result(payload)
+        except (OSError, ValueError) as e:
+            error = ConnectionError(str(e))
+        finally:
+            with self._pending_lock:
+                self._closed = True
+                pending, self._pending = self._pending, {}
+            for future in pending.values():
+                future.set_exception(error)
+            self._events.put(None)
+
+    def _notify_loop(self) -> None:
+        """購読のコールバックを呼ぶ（受信スレッドを止めないよう別スレッドで）"""
+        while True:
+            item = self._events.get()
+            if item is None:
+                return
+            subscription_id, message = item
+            subscription = self._subscriptions.get(subscription_id)
+            if subscription is None:
+                continue
+            try:
+                subscription.callback(message)
+            except Exception:
+                logger.exception("Subscriber %s failed on message %s",
+                                 subscription.name, message.get("id"))
+
+    def close(self) -> None:
+        """接続を閉じる（サーバー上の購読は自動で解除される）"""
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+        self._reader.join(5.0)
+
+    def __enter__(self) -> "RemoteBlackboard":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _remote_method(name: str):
+    """Blackboard.<name> を呼び出すプロキシメソッド"""
+    def method(self, *args, **kwargs):
+        return self.call(name, *args, **kwargs)
+    method.__name__ = name
+    method.__doc__ = getattr(Blackboard, name).__doc__
+    return method
+
+
+for _name in REMOTE_METHODS + EXPORT_METHODS:
+    setattr(RemoteBlackboard, _name, _remote_method(_name))
+
+
+def main():
+    """
+    メイン関数（サーバーを起動）
+    """
+    parser = argparse.ArgumentParser(description="Blackboard server")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="interface to listen on (there is no authentication; keep it on trusted networks)")
+    parser.add_argument("--port", type=int, default=7070)
+    parser.add_argument("--unix", default=None, help="serve on a Unix domain socket path instead of TCP")
+    parser.add_argument("--wal-dir", default=None, help="restore from and log to this WAL directory")
+    parser.add_argument("--export-dir", default=None,
+                        help="allow remote export_to_json/export_delta into this directory (file names only)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    board = Blackboard.load(args.wal_dir) if args.wal_dir else Blackboard()
+    server = BlackboardServer(board, args.unix or (args.host, args.port), export_dir=args.export_dir)
+    logger.info(f"Serving blackboard on {server.address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        board.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Cycle Executor - 依存関係を考慮したエージェントの1サイクル並列実行
+
+エージェント間の依存関係（例: 戦闘システムは冒険者システムの出力を使う）から
+有向非巡回グラフを作り、依存先が終わったエージェントから順にスレッドプールで
+run_once() を実行する。独立したエージェントは並行に動くため、1サイクルの時間は
+全エージェントの合計ではなくクリティカルパスの長さになる。
+
+依存関係はエージェントのクラス名で指定し、指定のないエージェントは依存なしとして扱う。
+"""
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger("CycleExecutor")
+
+# エージェントのクラス名 → 先に実行するエージェントのクラス名
+DEFAULT_AGENT_DEPENDENCIES: Dict[str, List[str]] = {
+    "AdventurerAgent": [],
+    "CombatAgent": ["AdventurerAgent"],
+    "TacticsAgent": ["CombatAgent"],
+    "PartyAgent": ["AdventurerAgent"],
+    "SkillAgent": ["CombatAgent"],
+    "DungeonAgent": ["CombatAgent", "PartyAgent"],
+}
+
+
+def build_dependency_graph(agents: List[Any],
+                           dependencies: Optional[Dict[str, List[str]]] = None) -> List[List[int]]:
+    """
+    エージェントの依存グラフを作成
+
+    Args:
+        agents: エージェントのリスト
+        dependencies: クラス名 → 依存先のクラス名（None=DEFAULT_AGENT_DEPENDENCIES）。
+            リストにないクラスへの依存は無視する
+
+    Returns:
+        エージェントのインデックスごとの依存先インデックスのリスト
+
+    Raises:
+        ValueError: 依存関係が循環している場合
+    """
+    if dependencies is None:
+        dependencies = DEFAULT_AGENT_DEPENDENCIES
+    by_class: Dict[str, List[int]] = {}
+    for index, agent in enumerate(agents):
+        by_class.setdefault(type(agent).__name__, []).append(index)
+
+    graph = []
+    for index, agent in enumerate(agents):
+        requires = []
+        for name in dependencies.get(type(agent).__name__, []):
+            requires.extend(i for i in by_class.get(name, []) if i != index)
+        graph.append(requires)
+
+    # 循環の検出（トポロジカルソートで全ノードを取り出せるか）
+    remaining = [len(requires) for requires in graph]
+    dependents: List[List[int]] = [[] for _ in agents]
+    for index, requires in enumerate(graph):
+        for dep in requires:
+            dependents[dep].append(index)
+    ready = [i for i, count in enumerate(remaining) if count == 0]
+    visited = 0
+    while ready:
+        index = ready.pop()
+        visited += 1
+        for dependent in dependents[index]:
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                ready.append(dependent)
+    if visited != len(agents):
+        cyclic = sorted(type(agents[i]).__name__ for i, count in enumerate(remaining) if count)
+        raise ValueError(f"Cyclic agent dependencies: {cyclic}")
+    return graph
+
+
+def run_cycle(agents: List[Any], dependencies: Optional[Dict[str, List[str]]] = None,
+              max_workers: Optional[int] = None,
+              should_run: Optional[Callable[[Any], bool]] = None) -> Dict[str, Dict[str, float]]:
+    """
+    全エージェントの start() と run_once() を依存関係の順に1回ずつ並列実行
+
+    依存先がすべて終わったエージェントから実行し、グラフが空になった時点で戻る。
+    あるエージェントが例外を送出した場合は新しい実行を止め、実行中のものを待ってから
+    その例外を送出する。
+
+    Args:
+        agents: エージェントのリスト
+        dependencies: クラス名 → 依存先のクラス名（None=DEFAULT_AGENT_DEPENDENCIES）
+        max_workers: 並列数（None=エージェント数）
+        should_run: 依存先が終わった時点で呼ばれ、False を返したエージェントは実行せず
+            終わったものとして扱う（None=すべて実行）
+
+    Returns:
+        {agent_name: {start, end}}（サイクル開始からの経過秒。実行したエージェントのみ）
+    """
+    graph = build_dependency_graph(agents, dependencies)
+    if not agents:
+        return {}
+
+    remaining = [len(requires) for requires in graph]
+    dependents: List[List[int]] = [[] for _ in agents]
+    for index, requires in enumerate(graph):
+        for dep in requires:
+            dependents[dep].append(index)
+
+    origin = time.perf_counter()
+    timings: Dict[str, Dict[str, float]] = {}
+
+    def run(index: int) -> int:
+        agent = agents[index]
+        if should_run is not None and not should_run(agent):
+            return index
+        start = time.perf_counter() - origin
+        agent.start()
+        agent.run_once()
+        timings[agent.name] = {"start": start, "end": time.perf_counter() - origin}
+        return index
+
+    error: Optional[BaseException] = None
+    with ThreadPoolExecutor(max_workers=max_workers or len(agents),
+                            thread_name_prefix="agent-cycle") as executor:
+        running: Dict[Future, int] = {
+            executor.submit(run, i): i for i, count in enumerate(remaining) if count == 0
+        }
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = running.pop(future)
+                exc = future.exception()
+                if exc is not None:
+                    logger.error("Agent %s failed: %s", agents[index].name, exc)
+                    if error is None:
+                        error = exc
+                    continue
+                if error is not None:
+                    continue
+                for dependent in dependents[index]:
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        running[executor.submit(run, dependent)] = dependent
+
+    if error is not None:
+        raise error
+    return timings
+
+
+def critical_path(agents: List[Any], timings: Dict[str, Dict[str, float]]) -> float:
+    """
+    実行結果のサイクル全体の所要時間（最後に終わったエージェントの終了時刻）
+
+    Args:
+        agents: エージェントのリスト
+        timings: run_cycle の戻り値
+
+    Returns:
+        所要時間（秒）
+    """
+    return max((timings[agent.name]["end"] for agent in agents if agent.name in timings),
+               default=0.0)
@@ -0,0 +1,420 @@
+"""
+Dispatch - Blackboard のサブスクライバーへの非同期配信
+
+投稿側は宛先のサブスクライバーごとの有限キューにメッセージを積むだけで戻り
+（待たずに積むので宛先の購読数に比例するだけ）、ワーカースレッドのプールがコールバックを呼び出す。
+
+- 同じサブスクライバーのコールバックは投稿順に1件ずつ呼ばれる（並行に呼ばれない）
+- コールバックはロックの外で呼ばれるため、コールバックから post_message してもデッドロックしない
+- キューがあふれたときの動作（バックプレッシャー）はサブスクライバーごとに選べる
+    - "block": 投稿側を空きができるまで待たせる（取りこぼしなし）。待つのはそのサブスクライバーが
+      購読している宛先への投稿だけで、他のサブスクライバーへの配信は止まらない。
+      コールバックの中からの投稿は自分自身の配信を待つデッドロックになるため待たせない
+      （そのぶんキューの上限をこえることがある）
+    - "drop": 新しいメッセージを捨てる
+    - "coalesce": 同じ送信者・タイプの未配信メッセージを最新のものに置き換え、
+      それでもあふれる場合は最も古い未配信メッセージを捨てる
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from queue import SimpleQueue
+from typing import Any, Callable, Dict, List, Optional
+
+from metrics import Metrics
+
+BACKPRESSURE_BLOCK = "block"
+BACKPRESSURE_DROP = "drop"
+BACKPRESSURE_COALESCE = "coalesce"
+BACKPRESSURE_POLICIES = (BACKPRESSURE_BLOCK, BACKPRESSURE_DROP, BACKPRESSURE_COALESCE)
+
+# ワーカーが1回に続けて配信する最大件数（他のサブスクライバーを待たせすぎないため）
+DELIVERY_BATCH = 64
+
+_STOP = object()
+
+logger = logging.getLogger("Dispatch")
+
+
+class Subscription:
+    """
+    1つのコールバックの配信キューと統計
+    """
+
+    def __init__(self, name: str, callback: Callable[[Dict], Any], queue_size: int, backpressure: str,
+                 metrics: Optional[Metrics] = None,
+                 idle_cond: Optional[threading.Condition] = None):
+        if queue_size < 1:
+            raise ValueError("queue_size must be >= 1")
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"backpressure must be one of {BACKPRESSURE_POLICIES}")
+        self.name = name
+        self.callback = callback
+        self.queue_size = queue_size
+        self.backpressure = backpressure
+        self.metrics = metrics
+        # アイドルになったときに通知する条件変数（MessageDispatcher.flush 用）
+        self._idle_cond = idle_cond
+        self._cond = threading.Condition()
+        # 未配信の (メッセージ, 投稿時刻)。coalesce では (送信者, タイプ) をキーにする
+        self._pending = OrderedDict() if backpressure == BACKPRESSURE_COALESCE else deque()
+        self._scheduled = False
+        self._active = True
+
+        self.enqueued = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.throttled = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def offer(self, message: Dict, posted_at: float) -> bool:
+        """
+        メッセージをキューに入れる（投稿側から呼ぶ。待たない）
+
+        "block" ではあふれていても積み、投稿側が wait_for_capacity() で待つ。
+
+        Args:
+            message: メッセージ
+            posted_at: 投稿時刻 (time.perf_counter)
+
+        Returns:
+            ワーカーへの割り当てが必要になったか（アイドルからの遷移）
+        """
+        with self._cond:
+            if not self._active:
+                return False
+            pending = self._pending
+            if self.backpressure == BACKPRESSURE_COALESCE:
+                key = (message.get("sender"), message.get("type"))
+                if key in pending:
+                    # 位置はそのままで最新の内容に置き換える（投稿時刻は古い方を残す）
+                    pending[key] = (message, pending[key][1])
+                    self.coalesced += 1
+                    return False
+                if len(pending) >= self.queue_size:
+                    pending.popitem(last=False)
+                    self.dropped += 1
+                pending[key] = (message, posted_at)
+            else:
+                if len(pending) >= self.queue_size and self.backpressure == BACKPRESSURE_DROP:
+                    self.dropped += 1
+                    return False
+                pending.append((message, posted_at))
+            self.enqueued += 1
+            if self._scheduled:
+                return False
+            self._scheduled = True
+            return True
+
+    def wait_for_capacity(self, timeout: Optional[float] = None) -> bool:
+        """
+        キューに空きができるまで待つ（"block" の投稿側から呼ぶ）
+
+        Args:
+            timeout: 最大待ち時間（秒。None=無制限）
+
+        Returns:
+            空きができた（または購読が解除された）か
+        """
+        with self._cond:
+            if len(self._pending) < self.queue_size or not self._active:
+                return True
+            self.throttled += 1
+            return self._cond.wait_for(
+                lambda: len(self._pending) < self.queue_size or not self._active, timeout)
+
+    def _notify_idle(self) -> None:
+        """アイドルになったことを flush に知らせる（self._cond の外で呼ぶ）"""
+        if self._idle_cond is not None:
+            with self._idle_cond:
+                self._idle_cond.notify_all()
+
+    def drain(self) -> bool:
+        """
+        未配信のメッセージを最大 DELIVERY_BATCH 件配信（ワーカーから呼ぶ）
+
+        Returns:
+            まだ未配信のメッセージが残っているか（残っていれば再度割り当てる）
+        """
+        for _ in range(DELIVERY_BATCH):
+            with self._cond:
+                if not self._pending or not self._active:
+                    self._scheduled = False
+                    self._cond.notify_all()
+                    idle = True
+                else:
+                    idle = False
+                    if self.backpressure == BACKPRESSURE_COALESCE:
+                        _, (message, posted_at) = self._pending.popitem(last=False)
+                    else:
+                        message, posted_at = self._pending.popleft()
+                    self._cond.notify_all()
+            if idle:
+                self._notify_idle()
+                return False
+
+            latency = time.perf_counter() - posted_at
+            try:
+                self.callback(message)
+            except Exception:
+                self.errors += 1
+                logger.exception("Subscriber %s failed on message %s", self.name, message.get("id"))
+            self.delivered += 1
+            self.total_latency += latency
+            if latency > self.max_latency:
+                self.max_latency = latency
+            if self.metrics is not None:
+                self.metrics.observe("dispatch.delivery_latency", latency)
+
+        with self._cond:
+            if self._pending and self._active:
+                return True
+            self._scheduled = False
+            self._cond.notify_all()
+        self._notify_idle()
+        return False
+
+    def pending_count(self) -> int:
+        """未配信の件数"""
+        with self._cond:
+            return len(self._pending)
+
+    def is_idle(self) -> bool:
+        """未配信がなく配信中でもないか"""
+        with self._cond:
+            return not self._pending and not self._scheduled
+
+    def deactivate(self) -> None:
+        """配信を止め、待っている投稿側と flush を起こす"""
+        with self._cond:
+            self._active = False
+            self._pending.clear()
+            self._cond.notify_all()
+        self._notify_idle()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """配信の統計（レイテンシは投稿からコールバック呼び出しまで）"""
+        delivered = self.delivered
+        return {
+            "subscriber": self.name,
+            "backpressure": self.backpressure,
+            "queue_size": self.queue_size,
+            "pending": self.pending_count(),
+            "enqueued": self.enqueued,
+            "delivered": delivered,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "throttled": self.throttled,
+            "errors": self.errors,
+            "mean_latency_ms": self.total_latency / delivered * 1000 if delivered else 0.0,
+            "max_latency_ms": self.max_latency * 1000
+        }
+
+
+class MessageDispatcher:
+    """
+    サブスクライバーへの配信を行うワーカープール
+
+    スレッドは最初の subscribe で起動する（購読がなければ publish は何もしない）。
+    """
+
+    def __init__(self, workers: int = 2, queue_size: int = 1000,
+                 backpressure: str = BACKPRESSURE_BLOCK,
+                 metrics: Optional[Metrics] = None):
+        """
+        Args:
+            workers: コールバックを呼び出すワーカースレッド数
+            queue_size: サブスクライバーごとのキューの既定の上限
+            backpressure: キューがあふれたときの既定の動作 (block, drop, coalesce)
+            metrics: 配信レイテンシの記録先（None=記録しない）
+        """
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"backpressure must be one of {BACKPRESSURE_POLICIES}")
+        self.workers = workers
+        self.queue_size = queue_size
+        self.backpressure = backpressure
+        self.metrics = metrics
+
+        # 受信者名 → 購読。publish は辞書ごと置き換えた版を読む（コピーオンライト）
+        self._routes: Dict[str, List[Subscription]] = {}
+        self._lock = threading.Lock()
+        self._ready: SimpleQueue = SimpleQueue()
+        self._threads: List[threading.Thread] = []
+        # 購読がアイドルになるたびに通知される（flush 用）
+        self._idle_cond = threading.Condition()
+        # ワーカースレッドの目印（コールバック内の投稿は待たせない）
+        self._local = threading.local()
+        self._closed = False
+
+    def subscribe(self, name: str, callback: Callable[[Dict], Any],
+                  queue_size: Optional[int] = None,
+                  backpressure: Optional[str] = None) -> Subscription:
+        """
+        購読を追加
+
+        Args:
+            name: 受信者名（"all" はブロードキャスト）
+            callback: メッセージ受信時に呼ばれる関数
+            queue_size: キューの上限（None=既定値）
+            backpressure: キューがあふれたときの動作（None=既定値）
+
+        Returns:
+            追加した購読
+        """
+        subscription = Subscription(
+            name, callback,
+            queue_size if queue_size is not None else self.queue_size,
+            backpressure if backpressure is not None else self.backpressure,
+            self.metrics, self._idle_cond
+        )
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("dispatcher is closed")
+            routes = dict(self._routes)
+            routes[name] = routes.get(name, []) + [subscription]
+            self._routes = routes
+            if not self._threads:
+                self._start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """購読を解除（未配信のメッセージは破棄）"""
+        with self._lock:
+            routes = dict(self._routes)
+            remaining = [s for s in routes.get(subscription.name, []) if s is not subscription]
+            if remaining:
+                routes[subscription.name] = remaining
+            else:
+                routes.pop(subscription.name, None)
+            self._routes = routes
+        subscription.deactivate()
+
+    def _start(self) -> None:
+        """ワーカーを起動（_lock 取得済みで呼ぶ）"""
+        for i in range(self.workers):
+            self._threads.append(threading.Thread(
+                target=self._worker_loop, name=f"blackboard-dispatch-{i}", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def publish(self, message: Dict) -> List[Subscription]:
+        """
+        メッセージを宛先の購読のキューに積む（待たない。購読がなければ何もしない）
+
+        投稿順に配信されるよう、Blackboard はメッセージのロックを持ったまま呼ぶ。
+        "block" の購読があふれた場合は、ロックを離してから wait_for_capacity() で待つ。
+
+        Args:
+            message: メッセージ
+
+        Returns:
+            上限に達した "block" の購読（wait_for_capacity に渡す）
+        """
+        subscriptions = self._routes.get(message.get("recipient"))
+        if not subscriptions:
+            return []
+        posted_at = time.perf_counter()
+        full = []
+        for subscription in subscriptions:
+            if subscription.offer(message, posted_at):
+                self._ready.put(subscription)
+            if (subscription.backpressure == BACKPRESSURE_BLOCK
+                    and subscription.pending_count() >= subscription.queue_size):
+                full.append(subscription)
+        return full
+
+    def wait_for_capacity(self, subscriptions: List[Subscription],
+                          timeout: Optional[float] = None) -> bool:
+        """
+        publish が返した購読に空きができるまで投稿側を待たせる
+
+        ワーカースレッド（コールバックの中）から呼んだ場合は待たない
+        （自分の配信の完了を待つデッドロックになるため）。
+
+        Args:
+            subscriptions: publish の戻り値
+            timeout: 購読ごとの最大待ち時間（秒。None=無制限）
+
+        Returns:
+            すべての購読に空きができたか
+        """
+        if getattr(self._local, "worker", False):
+            return True
+        return all([subscription.wait_for_capacity(timeout) for subscription in subscriptions])
+
+    def _worker_loop(self) -> None:
+        """配信待ちの購読のコールバックを呼び出す"""
+        self._local.worker = True
+        while True:
+            subscription = self._ready.get()
+            if subscription is _STOP:
+                return
+            if subscription.drain():
+                self._ready.put(subscription)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        それまでに publish したメッセージがすべて配信（または破棄）されるまで待つ
+
+        コールバックの中から呼ぶと、そのコールバックの完了を待つことになるため呼ばないこと。
+
+        Args:
+            timeout: 最大待ち時間（秒。None=無制限）
+
+        Returns:
+            時間内に配信し終えたか
+        """
+        def idle() -> bool:
+            return all(subscription.is_idle()
+                       for subscriptions in list(self._routes.values())
+                       for subscription in subscriptions)
+
+        with self._idle_cond:
+            return self._idle_cond.wait_for(idle, timeout)
+
+    def close(self, timeout: Optional[float] = 2.0) -> None:
+        """
+        未配信のメッセージを配信してからスレッドを止める
+
+        Args:
+            timeout: 配信を待つ最大時間（秒）
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        if not self._threads:
+            return
+        self.flush(timeout)
+        for subscriptions in list(self._routes.values()):
+            for subscription in subscriptions:
+                subscription.deactivate()
+        for _ in range(self.workers):
+            self._ready.put(_STOP)
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def pending_count(self) -> int:
+        """全購読の未配信メッセージ数の合計"""
+        return sum(subscription.pending_count()
+                   for subscriptions in list(self._routes.values())
+                   for subscription in subscriptions)
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """
+        購読ごとの配信統計
+
+        Returns:
+            [{subscriber, backpressure, queue_size, pending, enqueued, delivered,
+              dropped, coalesced, throttled, errors, mean_latency_ms, max_latency_ms}]
+        """
+        return [subscription.get_stats()
+                for subscriptions in self._routes.values()
+                for subscription in subscriptions]
@@ -0,0 +1,180 @@
+"""
+Floor Cache - 階層結果のメモ化
+
+(構成, 階層, 量子化したパーティHP/生存状態) ごとに戦闘結果のサンプルを保存し、
+十分なサンプルが集まった状態では戦闘を再シミュレートせずに保存済みの結果を抽選する。
+序盤の階層のようにほぼ同じ状態から始まる戦闘の繰り返しを省略するためのもの。
+"""
+
+import random
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from simulation import simulate_dungeon_batch
+
+
+class FloorOutcome(NamedTuple):
+    """1回分の階層の結果"""
+    victory: bool
+    hp_loss: Tuple[int, ...]     # 冒険者ごとのHP減少量（回復で負になりうる）
+    died: Tuple[bool, ...]       # 冒険者ごとにこの階層で倒れたか
+
+
+class FloorOutcomeCache:
+    """
+    LRU付きの階層結果キャッシュ
+
+    hp_quantum は HP 割合の量子化幅（0.1 なら10%刻み）、samples_per_key はキーごとに
+    実際にシミュレートして集めるサンプル数。どちらも小さいほどフルシミュレーションに近くなる。
+    """
+
+    def __init__(self, max_entries: int = 100000, samples_per_key: int = 32,
+                 hp_quantum: float = 0.1, max_floor: Optional[int] = None):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        if samples_per_key < 1:
+            raise ValueError("samples_per_key must be >= 1")
+        if not 0 < hp_quantum <= 1:
+            raise ValueError("hp_quantum must be in (0, 1]")
+
+        self.max_entries = max_entries
+        self.samples_per_key = samples_per_key
+        self.hp_quantum = hp_quantum
+        self.max_floor = max_floor
+
+        self._entries: "OrderedDict[Tuple, List[FloorOutcome]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def applies_to(self, floor: int) -> bool:
+        """この階層をキャッシュ対象にするか"""
+        return self.max_floor is None or floor <= self.max_floor
+
+    def key(self, context: Tuple, floor: int, party: Sequence) -> Tuple:
+        """
+        キャッシュキーを作成
+
+        Args:
+            context: 構成を識別する値（隊列順の職業と戦術の有無など）
+            floor: 階層
+            party: 冒険者リスト
+        """
+        quantum = self.hp_quantum
+        state = tuple(
+            round(p.current_hp / p.max_hp / quantum) if p.is_alive else -1
+            for p in party
+        )
+        return (context, floor, state)
+
+    def sample(self, key: Tuple, rng=None) -> Optional[FloorOutcome]:
+        """
+        保存済みの結果を抽選
+
+        Returns:
+            サンプルが samples_per_key 個そろっていれば抽選した結果、そうでなければ None
+        """
+        outcomes = self._entries.get(key)
+        if outcomes is None or len(outcomes) < self.samples_per_key:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return outcomes[int((rng or random).random() * len(outcomes))]
+
+    def record(self, key: Tuple, outcome: FloorOutcome) -> None:
+        """シミュレートした結果を保存"""
+        outcomes = self._entries.get(key)
+        if outcomes is None:
+            outcomes = self._entries[key] = []
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._entries.move_to_end(key)
+
+        if len(outcomes) < self.samples_per_key:
+            outcomes.append(outcome)
+
+    @staticmethod
+    def capture(party: Sequence) -> Tuple[Tuple[int, ...], Tuple[bool, ...]]:
+        """戦闘前のHPと生存状態を記録"""
+        return tuple(p.current_hp for p in party), tuple(p.is_alive for p in party)
+
+    @staticmethod
+    def outcome_from(victory: bool, before: Tuple[Tuple[int, ...], Tuple[bool, ...]],
+                     party: Sequence) -> FloorOutcome:
+        """戦闘前後の状態から結果を作成"""
+        hp_before, alive_before = before
+        return FloorOutcome(
+            bool(victory),
+            tuple(h - p.current_hp for h, p in zip(hp_before, party)),
+            tuple(a and not p.is_alive for a, p in zip(alive_before, party))
+        )
+
+    @staticmethod
+    def apply(outcome: FloorOutcome, party: Sequence) -> None:
+        """抽選した結果をパーティに反映"""
+        for p, loss, died in zip(party, outcome.hp_loss, outcome.died):
+            if not p.is_alive:
+                continue
+            if died:
+                p.current_hp = 0
+                p.is_alive = False
+            else:
+                p.current_hp = min(p.max_hp, max(1, p.current_hp - loss))
+
+    def clear(self) -> None:
+        """キャッシュと統計をクリア"""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_stats(self) -> Dict:
+        """ヒット率などの統計を取得"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+def check_cache_equivalence(party_composition: List[str], runs: int = 2000,
+                            seed: int = 0, max_floors: int = 30,
+                            cache: Optional[FloorOutcomeCache] = None,
+                            tolerance: float = 0.1,
+                            survival_tolerance: float = 0.1) -> Dict:
+    """
+    キャッシュ有無で到達階層の分布を比較
+
+    平均到達階層の差と、階層ごとの生存率の差の最大値の両方が許容範囲内なら within_tolerance。
+
+    Args:
+        tolerance: 許容する平均到達階層の差（階層数）
+        survival_tolerance: 許容する階層ごとの生存率の差（0.0〜1.0）
+
+    Returns:
+        {full, cached, mean_diff, max_survival_diff, within_tolerance, cache_stats}
+    """
+    cache = cache if cache is not None else FloorOutcomeCache()
+    # キャッシュの影響だけを比べるため、どちらも scalar エンジンで同じシードの試行を回す
+    full = simulate_dungeon_batch(party_composition, runs=runs, seed=seed, max_floors=max_floors,
+                                  engine="scalar")
+    cached = simulate_dungeon_batch(party_composition, runs=runs, seed=seed, max_floors=max_floors,
+                                    floor_cache=cache)
+
+    mean_diff = abs(full["mean"] - cached["mean"])
+    survival_diff = max(abs(a - b) for a, b in zip(full["survival"], cached["survival"]))
+    return {
+        "full": full,
+        "cached": cached,
+        "mean_diff": mean_diff,
+        "max_survival_diff": survival_diff,
+        "within_tolerance": mean_diff <= tolerance and survival_diff <= survival_tolerance,
+        "cache_stats": cache.get_stats()
+    }
@@ -4,50 +4,13 @@
 extends Node
 class_name EnemyGenerator
 
-# 敵のベーステンプレート
-const ENEMY_TEMPLATES: Dictionary = {
-    "Goblin": {
-        "hp": 50,
-        "attack": 10,
-        "defense": 5,
-        "magic": 0,
-        "speed": 12
-    },
-    "Orc": {
-        "hp": 80,
-        "attack": 15,
-        "defense": 10,
-        "magic": 0,
-        "speed": 6
-    },
-    "Dark Mage": {
-        "hp": 40,
-        "attack": 5,
-        "defense": 3,
-        "magic": 18,
-        "speed": 10
-    },
-    "Skeleton": {
-        "hp": 60,
-        "attack": 12,
-        "defense": 8,
-        "magic": 0,
-        "speed": 8
-    },
-    "Dragon": {
-        "hp": 200,
-        "attack": 25,
-        "defense": 20,
-        "magic": 15,
-        "speed": 14
-    }
-}
+# 敵のベーステンプレート・階層ごとの編成は res://data/balance.json（GameData）で定義
 
 
 func generate_enemies_for_floor(floor: int) -> Array:
     """階層に応じて敵を生成"""
     var enemies = []
-    var scaling = pow(1.1, floor - 1)  # 階層ごとに1.1倍
+    var scaling = pow(GameData.get_floor_scaling(), floor - 1)  # 階層ごとに1.1倍
 
     # 階層に応じた敵の数と種類を決定
     var enemy_count = _get_enemy_count_for_floor(floor)
@@ -63,31 +26,18 @@ func generate_enemies_for_floor(floor: int) -> Array:
 
 func _get_enemy_count_for_floor(floor: int) -> int:
     """階層に応じた敵の数を決定"""
-    if floor <= 5:
-        return 2
-    elif floor <= 10:
-        return 3
-    else:
-        return 4
+    return GameData.get_enemy_count_for_floor(floor)
 
 
 func _select_enemy_types_for_floor(floor: int) -> Array:
     """階層に応じた敵の種類を選択"""
-    if floor <= 3:
-        return ["Goblin", "Goblin"]
-    elif floor <= 7:
-        return ["Goblin", "Orc", "Skeleton"]
-    elif floor <= 15:
-        return ["Orc", "Dark Mage", "Skeleton"]
-    elif floor <= 25:
-        return ["Orc", "Dark Mage", "Skeleton", "Dragon"]
-    else:
-        return ["Dragon", "Dark Mage", "Orc", "Skeleton"]
+    return GameData.get_enemy_types_for_floor(floor)
 
 
 func _create_enemy(enemy_type: String, scaling: float) -> Node:
     """敵を作成"""
-    var template = ENEMY_TEMPLATES.get(enemy_type, ENEMY_TEMPLATES["Goblin"])
+    var templates = GameData.get_enemy_templates()
+    var template = templates.get(enemy_type, templates["Goblin"])
 
     var enemy = Node.new()
     enemy.name = enemy_type
@@ -131,9 +81,9 @@ func _add_enemy_methods(enemy: Node) -> void:
 
 func get_enemy_info(enemy_type: String) -> Dictionary:
     """敵の情報を取得"""
-    return ENEMY_TEMPLATES.get(enemy_type, {})
+    return GameData.get_enemy_templates().get(enemy_type, {})
 
 
 func get_all_enemy_types() -> Array:
     """すべての敵タイプを取得"""
-    return ENEMY_TEMPLATES.keys()
+    return GameData.get_enemy_templates().keys()
@@ -0,0 +1,75 @@
+# GameData.gd
+# バランスデータ - res://data/balance.json の読み込み（Python側の game_data.py と共有）
+
+extends RefCounted
+class_name GameData
+
+const DATA_PATH: String = "res://data/balance.json"
+
+static var _data: Dictionary = {}
+
+
+static func get_data() -> Dictionary:
+    """バランスデータを取得（初回のみファイルを読み込む）"""
+    if _data.is_empty():
+        var file = FileAccess.open(DATA_PATH, FileAccess.READ)
+        if file == null:
+            push_error("バランスデータを開けません: %s" % DATA_PATH)
+            return {}
+
+        var parsed = JSON.parse_string(file.get_as_text())
+        if parsed is Dictionary:
+            _data = parsed
+        else:
+            push_error("バランスデータの形式が不正です: %s" % DATA_PATH)
+
+    return _data
+
+
+static func get_job_stats(job_name: String) -> Dictionary:
+    """職業の基礎ステータスを取得"""
+    var data = get_data()
+    var stats = data.get("jobs", {}).get(job_name, data.get("default_job", {}))
+    return {
+        "max_hp": int(stats.get("max_hp", 50)),
+        "attack": int(stats.get("attack", 10)),
+        "defense": int(stats.get("defense", 10)),
+        "magic": int(stats.get("magic", 10)),
+        "speed": int(stats.get("speed", 10))
+    }
+
+
+static func get_enemy_templates() -> Dictionary:
+    """敵のベーステンプレートを取得"""
+    return get_data().get("enemies", {})
+
+
+static func get_skills() -> Dictionary:
+    """すべてのスキルデータを取得"""
+    return get_data().get("skills", {})
+
+
+static func get_floor_scaling() -> float:
+    """階層ごとの敵強化倍率"""
+    return float(get_data().get("floor_scaling", 1.1))
+
+
+static func get_enemy_count_for_floor(floor: int) -> int:
+    """階層に応じた敵の数"""
+    return int(_lookup_band(get_data().get("enemy_count_by_floor", []), floor, "count", 2))
+
+
+static func get_enemy_types_for_floor(floor: int) -> Array:
+    """階層に応じた敵の種類"""
+    return _lookup_band(get_data().get("enemy_types_by_floor", []), floor, "types", ["Goblin"])
+
+
+static func _lookup_band(bands: Array, floor: int, field: String, default_value):
+    """階層帯のテーブルから値を取得（max_floor が null の帯はそれ以降すべて）"""
+    for band in bands:
+        var max_floor = band.get("max_floor")
+        if max_floor == null or floor <= int(max_floor):
+            return band.get(field, default_value)
+    if bands.size() > 0:
+        return bands[-1].get(field, default_value)
+    return default_value
@@ -28,57 +28,9 @@ static func get_job_name(job_type: Type) -> String:
 		_:
 			return "Unknown"
 
-# 職業別基礎ステータス
+# 職業別基礎ステータス（res://data/balance.json の jobs）
 static func get_base_stats(job_type: Type) -> Dictionary:
-	match job_type:
-		Type.WARRIOR:
-			return {
-				"max_hp": 100,
-				"attack": 15,
-				"defense": 12,
-				"magic": 3,
-				"speed": 8
-			}
-		Type.MAGE:
-			return {
-				"max_hp": 60,
-				"attack": 5,
-				"defense": 5,
-				"magic": 20,
-				"speed": 10
-			}
-		Type.PRIEST:
-			return {
-				"max_hp": 70,
-				"attack": 7,
-				"defense": 8,
-				"magic": 15,
-				"speed": 9
-			}
-		Type.THIEF:
-			return {
-				"max_hp": 75,
-				"attack": 12,
-				"defense": 7,
-				"magic": 5,
-				"speed": 18
-			}
-		Type.ARCHER:
-			return {
-				"max_hp": 80,
-				"attack": 13,
-				"defense": 8,
-				"magic": 6,
-				"speed": 12
-			}
-		_:
-			return {
-				"max_hp": 50,
-				"attack": 10,
-				"defense": 10,
-				"magic": 10,
-				"speed": 10
-			}
+	return GameData.get_job_stats(get_job_name(job_type))
 
 # 職業の特徴説明
 static func get_description(job_type: Type) -> String:
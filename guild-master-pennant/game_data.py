@@ -0,0 +1,144 @@
+"""
+Game Data - バランスデータの読み込み
+
+game/data/balance.json（GDScript側と共有）をインポート時に1度だけ読み込み、
+変更不可の参照テーブルとして公開する。階層ごとの敵テンプレート（1.1 ** (floor - 1) 倍率適用済み）も
+事前計算しておく。
+"""
+
+import json
+import os
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Mapping, NamedTuple, Optional, Tuple
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "game", "data", "balance.json")
+
+# 事前計算する階層数（これより深い階層は初回参照時に計算してキャッシュ）
+PRECOMPUTED_FLOORS = 100
+
+
+class UnitStats(NamedTuple):
+    """ユニットの基礎ステータス（不変テンプレート）"""
+    max_hp: int
+    attack: int
+    defense: int
+    magic: int
+    speed: int
+
+
+def _freeze(value: Any) -> Any:
+    """JSONの値を変更不可の構造に変換"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def load_data(path: str = DATA_PATH) -> Mapping[str, Any]:
+    """
+    バランスデータを読み込む
+
+    Args:
+        path: JSONファイルのパス
+
+    Returns:
+        変更不可のデータ
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return _freeze(json.load(f))
+
+
+DATA: Mapping[str, Any] = load_data()
+
+FLOOR_SCALING: float = DATA["floor_scaling"]
+
+# 職業別の基礎ステータス
+JOB_STATS: Mapping[str, UnitStats] = MappingProxyType({
+    name: UnitStats(stats["max_hp"], stats["attack"], stats["defense"], stats["magic"], stats["speed"])
+    for name, stats in DATA["jobs"].items()
+})
+
+# 未知の職業の基礎ステータス（GameData.get_job_stats と同じく default_job を使う）
+DEFAULT_JOB_STATS: UnitStats = UnitStats(
+    DATA["default_job"]["max_hp"], DATA["default_job"]["attack"], DATA["default_job"]["defense"],
+    DATA["default_job"]["magic"], DATA["default_job"]["speed"]
+)
+
+# 職業ごとの所持スキル
+JOB_SKILLS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    name: stats.get("skills", ()) for name, stats in DATA["jobs"].items()
+})
+
+# 敵のベースステータス
+ENEMY_STATS: Mapping[str, UnitStats] = MappingProxyType({
+    name: UnitStats(stats["hp"], stats["attack"], stats["defense"], stats["magic"], stats["speed"])
+    for name, stats in DATA["enemies"].items()
+})
+
+# スキルデータ (Skill.gd SKILL_DATA)
+SKILL_DATA: Mapping[str, Mapping[str, Any]] = DATA["skills"]
+
+
+def _lookup_band(bands: Tuple[Mapping[str, Any], ...], floor: int, field: str) -> Any:
+    """階層帯のテーブルから値を取得（max_floor が null の帯はそれ以降すべて）"""
+    for band in bands:
+        max_floor: Optional[int] = band["max_floor"]
+        if max_floor is None or floor <= max_floor:
+            return band[field]
+    return bands[-1][field]
+
+
+def floor_scaling(floor: int) -> float:
+    """階層の敵強化倍率"""
+    return FLOOR_SCALING ** (floor - 1)
+
+
+def enemy_count_for_floor(floor: int) -> int:
+    """階層に応じた敵の数 (EnemyGenerator._get_enemy_count_for_floor)"""
+    return _lookup_band(DATA["enemy_count_by_floor"], floor, "count")
+
+
+def enemy_types_for_floor(floor: int) -> Tuple[str, ...]:
+    """階層に応じた敵の種類 (EnemyGenerator._select_enemy_types_for_floor)"""
+    return _lookup_band(DATA["enemy_types_by_floor"], floor, "types")
+
+
+def scale_stats(stats: UnitStats, scaling: float) -> UnitStats:
+    """ステータスに倍率を適用（各値を int で切り捨て）"""
+    return UnitStats(*(int(value * scaling) for value in stats))
+
+
+def _build_floor_templates(floor: int) -> Tuple[Tuple[str, UnitStats], ...]:
+    """階層の敵編成を (種類, 倍率適用済みステータス) のタプルで作成"""
+    scaling = floor_scaling(floor)
+    types = enemy_types_for_floor(floor)
+    lineup = []
+    for i in range(enemy_count_for_floor(floor)):
+        enemy_type = types[i % len(types)]
+        base = ENEMY_STATS.get(enemy_type, ENEMY_STATS["Goblin"])
+        lineup.append((enemy_type, scale_stats(base, scaling)))
+    return tuple(lineup)
+
+
+_FLOOR_TEMPLATES: Tuple[Tuple[Tuple[str, UnitStats], ...], ...] = tuple(
+    _build_floor_templates(floor) for floor in range(1, PRECOMPUTED_FLOORS + 1)
+)
+
+
+@lru_cache(maxsize=None)
+def _deep_floor_templates(floor: int) -> Tuple[Tuple[str, UnitStats], ...]:
+    return _build_floor_templates(floor)
+
+
+def floor_enemy_templates(floor: int) -> Tuple[Tuple[str, UnitStats], ...]:
+    """
+    階層の敵編成（EnemyGenerator.generate_enemies_for_floor と同じ数・種類・倍率）
+
+    Returns:
+        ((敵の種類, 倍率適用済みステータス), ...)
+    """
+    if 1 <= floor <= PRECOMPUTED_FLOORS:
+        return _FLOOR_TEMPLATES[floor - 1]
+    return _deep_floor_templates(floor)
@@ -0,0 +1,439 @@
+"""
+Markov Solver - 戦闘の厳密解（マルコフ連鎖）
+
+simulation.CombatSimulator と同じ戦闘ルール（戦術なし・全員が最初の敵を通常攻撃）について、
+全ユニットのHPの組を状態とした確率分布をターンごとに前進させ、勝率・期待ターン数を
+サンプリングなしで計算する。序盤の階層の単発の戦闘のように状態数が小さい場合にだけ有効。
+状態数の見積もりまたは実際の状態数が上限を超えた場合はモンテカルロ（simulate_combat）に切り替える。
+"""
+
+import math
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from simulation import (
+    DAMAGE_ROLL_LOW,
+    DAMAGE_ROLL_SPAN,
+    LOG_NONE,
+    CombatSimulator,
+    create_enemies,
+    create_party,
+    make_rng
+)
+
+# 厳密計算で保持する状態数の上限（超えたらモンテカルロ）
+DEFAULT_MAX_STATES = 100000
+
+State = Tuple[int, ...]
+Distribution = Dict[State, float]
+
+
+class StateLimitExceeded(Exception):
+    """状態数が上限を超えた"""
+    pass
+
+
+@lru_cache(maxsize=None)
+def damage_distribution(attack: float, attacker_vs_defense: float,
+                        target_defense: float) -> Tuple[Tuple[int, float], ...]:
+    """
+    calculate_damage + take_damage の実ダメージの確率分布
+
+    ダメージは int((attack - defense // 2) * (0.9 + 0.2 * u)) (u は [0, 1) の一様乱数) なので、
+    各整数値になる u の区間の長さがその確率になる。
+
+    Args:
+        attack: 攻撃側の実効攻撃力
+        attacker_vs_defense: calculate_damage で使う防御側の実効防御力
+        target_defense: take_damage で使う防御側の防御力
+
+    Returns:
+        ((実ダメージ, 確率), ...)
+    """
+    base = attack - attacker_vs_defense // 2
+    outcomes: Dict[int, float] = {}
+
+    if base <= 0:
+        # 負の値は int() で 0 方向に切り捨てられ、max(1, ...) で 1 になる
+        rolls = ((1, 1.0),)
+    else:
+        low = base * DAMAGE_ROLL_LOW
+        high = base * (DAMAGE_ROLL_LOW + DAMAGE_ROLL_SPAN)
+        rolls = []
+        for k in range(int(low), int(math.ceil(high))):
+            # base * r が [k, k+1) に入る u の区間
+            start = max(0.0, (k / base - DAMAGE_ROLL_LOW) / DAMAGE_ROLL_SPAN)
+            end = min(1.0, ((k + 1) / base - DAMAGE_ROLL_LOW) / DAMAGE_ROLL_SPAN)
+            if end > start:
+                rolls.append((max(1, k), end - start))
+
+    for damage, probability in rolls:
+        actual = max(1, damage - target_defense)
+        outcomes[actual] = outcomes.get(actual, 0.0) + probability
+    return tuple(sorted(outcomes.items()))
+
+
+class BattleModel:
+    """
+    1つの編成の戦闘のマルコフ連鎖
+
+    状態は [パーティ..., 敵...] の順のHPのタプル（0 = 戦闘不能）。
+    HPは減る一方なので同じ状態が別のターンに現れることはなく、状態分布をターンごとに前進させる。
+    ユニットの行動結果（ターゲットとダメージの分布）は生存状況ごとにメモ化する。
+    """
+
+    def __init__(self, party: Sequence, enemies: Sequence, max_states: int = DEFAULT_MAX_STATES):
+        self.party_size = len(party)
+        self.max_states = max_states
+
+        units = list(party) + list(enemies)
+        # 行動順（速度順、同速はパーティ→敵の並び順 = simulate_turn の安定ソート）
+        self.order = sorted(range(len(units)), key=lambda i: units[i].speed, reverse=True)
+        self.hit_weights = tuple(p.get_hit_rate() for p in party)
+        self.damage = {
+            (a, t): damage_distribution(units[a].get_effective_attack(),
+                                        units[t].get_effective_defense(),
+                                        units[t].get_effective_defense())
+            for a in range(len(units)) for t in range(len(units))
+            if (a < self.party_size) != (t < self.party_size)
+        }
+        self._outcome_cache: Dict[Tuple[int, Tuple[bool, ...]], Tuple[Tuple[int, int, float], ...]] = {}
+
+    def estimate_states(self, initial: Distribution) -> int:
+        """
+        列挙を始める前に、戦闘中に保持する状態数のおおよその上限を見積もる
+
+        味方は「最初に生存している敵」だけを攻撃するので、敵側のHPの組は
+        1 + Σ(各敵の到達しうるHPの数 - 1) 通りしかない。パーティ側は、敵を倒し切るまでの
+        平均ターン数から各メンバーが受ける被弾回数を見積もり、その回数で到達しうるHPの数の積を取る。
+        前の階層から引き継いだHPの分布が広いほど大きく見積もる（控えめに多めに出る）。
+
+        Args:
+            initial: 開始時の状態分布
+
+        Returns:
+            見積もった状態数
+        """
+        p = self.party_size
+        units = range(len(self.order))
+
+        def mean(distribution):
+            return sum(damage * probability for damage, probability in distribution)
+
+        def reachable(starts, damages):
+            # starts からダメージを何回か受けて到達しうるHP（0 を含む）
+            seen = set(starts)
+            stack = list(starts)
+            while stack:
+                hp = stack.pop()
+                if hp <= 0:
+                    continue
+                for damage in damages:
+                    following = max(0, hp - damage)
+                    if following not in seen:
+                        seen.add(following)
+                        stack.append(following)
+            return seen
+
+        starts = [{state[u] for state in initial} for u in units]
+
+        # 敵ごとの生存ターン数の累計 = 敵の攻撃回数の見積もり
+        elapsed = attacks = 0.0
+        enemy_count = 1
+        for target in units[p:]:
+            per_turn = sum(mean(self.damage[(a, target)]) for a in range(p))
+            elapsed += max(starts[target]) / per_turn
+            attacks += elapsed
+            damages = {d for a in range(p) for d, _ in self.damage[(a, target)]}
+            enemy_count += len(reachable(starts[target], damages)) - 1
+
+        total_weight = sum(self.hit_weights)
+        party_count = 1
+        for target in units[:p]:
+            damages = {d for a in units[p:] for d, _ in self.damage[(a, target)]}
+            hits = attacks * self.hit_weights[target] / total_weight + 1
+            lowest = min(starts[target]) - hits * max(damages)
+            party_count *= sum(1 for hp in reachable(starts[target], damages) if hp >= lowest)
+
+        return party_count * enemy_count
+
+    def initial_state(self, party: Sequence, enemies: Sequence) -> State:
+        """ユニットの現在HPから状態を作成"""
+        return tuple(u.current_hp for u in list(party) + list(enemies))
+
+    def party_wiped(self, state: State) -> bool:
+        """パーティ全滅"""
+        return not any(state[:self.party_size])
+
+    def enemies_wiped(self, state: State) -> bool:
+        """敵全滅"""
+        return not any(state[self.party_size:])
+
+    def _outcomes(self, unit: int, alive: Tuple[bool, ...]) -> Tuple[Tuple[int, int, float], ...]:
+        """
+        生存状況ごとの行動結果（メモ化）
+
+        Returns:
+            ((ターゲット, 実ダメージ, 確率), ...)。行動しない場合は空
+        """
+        key = (unit, alive)
+        cached = self._outcome_cache.get(key)
+        if cached is not None:
+            return cached
+
+        p = self.party_size
+        if unit < p:
+            # 味方: 最初に生存している敵を攻撃
+            alive_enemies = [i for i in range(p, len(alive)) if alive[i]]
+            targets = [(alive_enemies[0], 1.0)] if alive_enemies else []
+        else:
+            # 敵: 被弾率の比で味方を選ぶ
+            alive_party = [i for i in range(p) if alive[i]]
+            total = sum(self.hit_weights[i] for i in alive_party)
+            targets = [(i, self.hit_weights[i] / total) for i in alive_party]
+
+        result = tuple(
+            (target, damage, target_probability * probability)
+            for target, target_probability in targets
+            for damage, probability in self.damage[(unit, target)]
+        )
+        self._outcome_cache[key] = result
+        return result
+
+    def advance_turn(self, current: Distribution) -> Distribution:
+        """
+        状態分布を1ターン（全ユニットの行動）進める
+
+        行動ごとに同じ状態を合流させるため、開始状態ごとに遷移を展開するより状態数が増えにくい。
+        """
+        outcomes_for = self._outcomes
+        for unit in self.order:
+            following: Distribution = {}
+            get = following.get
+            for state, probability in current.items():
+                outcomes = outcomes_for(unit, tuple(map(bool, state))) if state[unit] else ()
+                if not outcomes:
+                    following[state] = get(state, 0.0) + probability
+                    continue
+                for target, damage, p in outcomes:
+                    hp = state[target] - damage
+                    next_state = state[:target] + ((hp if hp > 0 else 0),) + state[target + 1:]
+                    following[next_state] = get(next_state, 0.0) + probability * p
+            current = following
+            if len(current) > self.max_states:
+                raise StateLimitExceeded(f"more than {self.max_states} battle states")
+        return current
+
+    def solve(self, initial: Distribution, max_turns: int = 100) -> Dict:
+        """
+        戦闘を最後まで計算（simulate_combat と同じ勝敗判定・ターン数）
+
+        Args:
+            initial: 開始時の状態分布
+            max_turns: 最大ターン数
+
+        Returns:
+            {"victory", "defeat", "timeout": 確率, "expected_turns": 期待ターン数,
+             "turn_distribution": {ターン数: 確率}, "victory_states": 勝利時の状態分布}
+        """
+        victory = defeat = 0.0
+        expected_turns = 0.0
+        turn_distribution: Dict[int, float] = {}
+        victory_states: Distribution = {}
+
+        current = dict(initial)
+        turn = 0
+        while turn < max_turns and current:
+            turn += 1
+            active: Distribution = {}
+            for state, probability in current.items():
+                # 勝敗判定（ターン開始時）
+                if self.party_wiped(state):
+                    defeat += probability
+                elif self.enemies_wiped(state):
+                    victory += probability
+                    victory_states[state] = victory_states.get(state, 0.0) + probability
+                else:
+                    active[state] = probability
+                    continue
+                expected_turns += turn * probability
+                turn_distribution[turn] = turn_distribution.get(turn, 0.0) + probability
+
+            current = self.advance_turn(active) if active else {}
+
+        # 最大ターン数まで決着しなかった戦闘は時間切れ
+        timeout = float(sum(current.values()))
+        if timeout:
+            expected_turns += max_turns * timeout
+            turn_distribution[max_turns] = turn_distribution.get(max_turns, 0.0) + timeout
+
+        return {
+            "victory": victory,
+            "defeat": defeat,
+            "timeout": timeout,
+            "expected_turns": expected_turns,
+            "turn_distribution": turn_distribution,
+            "victory_states": victory_states
+        }
+
+
+def _monte_carlo_combat(party: Sequence, enemies: Sequence, runs: int,
+                        max_turns: int, seed: Optional[int]) -> Dict:
+    """simulate_combat による近似（厳密解のフォールバック）"""
+    rng = make_rng(seed)
+    counts = {True: 0, False: 0, None: 0}
+    total_turns = 0
+    for _ in range(runs):
+        result = CombatSimulator.simulate_combat(
+            [p.copy() for p in party], [e.copy() for e in enemies],
+            max_turns=max_turns, log_level=LOG_NONE, rng=rng
+        )
+        counts[result["victory"]] += 1
+        total_turns += result["turns"]
+    return {
+        "method": "monte_carlo",
+        "victory": counts[True] / runs,
+        "defeat": counts[False] / runs,
+        "timeout": counts[None] / runs,
+        "expected_turns": total_turns / runs
+    }
+
+
+def solve_combat(party: Sequence, enemies: Sequence, max_turns: int = 100,
+                 max_states: int = DEFAULT_MAX_STATES, fallback_runs: int = 10000,
+                 seed: Optional[int] = None) -> Dict:
+    """
+    1回の戦闘の勝率と期待ターン数を計算
+
+    Args:
+        party: 冒険者リスト（現在HPを初期状態として使用）
+        enemies: 敵リスト
+        max_turns: 最大ターン数
+        max_states: 厳密計算の状態数上限
+        fallback_runs: 上限を超えた場合のモンテカルロ試行回数
+        seed: モンテカルロ時の乱数シード
+
+    Returns:
+        {"method": "exact" / "monte_carlo", "victory", "defeat", "timeout", "expected_turns"}
+    """
+    model = BattleModel(party, enemies, max_states)
+    initial = {model.initial_state(party, enemies): 1.0}
+    if model.estimate_states(initial) > max_states:
+        # 列挙しても上限に達する見込みなら最初からモンテカルロ
+        return _monte_carlo_combat(party, enemies, fallback_runs, max_turns, seed)
+    try:
+        result = model.solve(initial, max_turns)
+    except StateLimitExceeded:
+        return _monte_carlo_combat(party, enemies, fallback_runs, max_turns, seed)
+
+    return {
+        "method": "exact",
+        "victory": result["victory"],
+        "defeat": result["defeat"],
+        "timeout": result["timeout"],
+        "expected_turns": result["expected_turns"]
+    }
+
+
+def _floor_probabilities(survival: List[float]) -> List[float]:
+    """階層別生存率から到達階層ごとの確率を計算"""
+    cleared = [1.0] + survival + [0.0]
+    return [max(0.0, cleared[f] - cleared[f + 1]) for f in range(len(survival) + 1)]
+
+
+def _monte_carlo_floors(party_composition: List[str], party_states: Distribution,
+                        start_floor: int, max_floors: int, runs: int,
+                        max_turns: int, seed: Optional[int]) -> List[float]:
+    """
+    start_floor 以降をモンテカルロで近似（開始時のパーティHPは厳密解の分布から抽選）
+
+    Returns:
+        start_floor 以降の各階層をクリアする条件付き確率（start_floor に到達した試行に対する割合）
+    """
+    rng = make_rng(seed)
+    party = create_party(party_composition)
+    states = list(party_states)
+    weights = [party_states[state] for state in states]
+    cleared = [0] * (max_floors - start_floor + 1)
+
+    for _ in range(runs):
+        for adventurer, hp in zip(party, rng.choices(states, weights)[0]):
+            adventurer.current_hp = hp
+            adventurer.is_alive = hp > 0
+        for floor in range(start_floor, max_floors + 1):
+            result = CombatSimulator.simulate_combat(party, create_enemies(floor), max_turns=max_turns,
+                                                     log_level=LOG_NONE, rng=rng)
+            if not result["victory"]:
+                break
+            cleared[floor - start_floor] += 1
+
+    return [count / runs for count in cleared]
+
+
+def solve_dungeon(party_composition: List[str], max_floors: int = 10,
+                  max_turns: int = 100, max_states: int = DEFAULT_MAX_STATES,
+                  fallback_runs: int = 10000, seed: Optional[int] = None) -> Dict:
+    """
+    ダンジョン踏破の階層別生存率を計算
+
+    勝利時のパーティHPの分布を次の階層の初期状態として引き継ぐ（時間切れは全滅扱い）。
+    状態数の見積もり（BattleModel.estimate_states）または実際の状態数が上限を超えた階層からは、
+    その時点のパーティHPの分布から抽選した初期状態でモンテカルロに切り替える
+    （それより前の階層は厳密値のまま）。標準的な4人パーティで厳密に解けるのは1階層目程度で、
+    2階層目以降は引き継いだHPの分布で状態数が100万を超えるため、ほぼモンテカルロになる。
+
+    Args:
+        party_composition: パーティ構成（職業名のリスト）
+        max_floors: 最大階層数
+        max_turns: 1戦闘の最大ターン数
+        max_states: 厳密計算の状態数上限
+        fallback_runs: モンテカルロに切り替えた場合の試行回数
+        seed: モンテカルロ時の乱数シード
+
+    Returns:
+        {"mean": 期待到達階層, "survival": [f階層をクリアする確率, ...],
+         "floor_probabilities": [到達階層が f になる確率 (f = 0..max_floors)],
+         "exact_floors": 厳密に計算した階層数, "method": "exact" / "hybrid", "party_composition"}
+    """
+    party = create_party(party_composition)
+    party_size = len(party)
+    party_states: Distribution = {tuple(p.max_hp for p in party): 1.0}
+    survival: List[float] = []
+    exact_floors = 0
+
+    for floor in range(1, max_floors + 1):
+        if not party_states:
+            survival.append(0.0)
+            continue
+
+        enemies = create_enemies(floor)
+        model = BattleModel(party, enemies, max_states)
+        enemy_hp = tuple(e.max_hp for e in enemies)
+        initial = {hp + enemy_hp: probability for hp, probability in party_states.items()}
+        try:
+            # 見積もりが上限を超える階層は列挙せずにモンテカルロへ（数十秒の無駄な列挙を避ける）
+            if model.estimate_states(initial) > max_states:
+                raise StateLimitExceeded(f"estimated more than {max_states} battle states")
+            result = model.solve(initial, max_turns)
+        except StateLimitExceeded:
+            reached = sum(party_states.values())
+            conditional = _monte_carlo_floors(party_composition, party_states, floor,
+                                              max_floors, fallback_runs, max_turns, seed)
+            survival.extend(reached * p for p in conditional)
+            break
+
+        exact_floors = floor
+        party_states = {}
+        for state, probability in result["victory_states"].items():
+            hp = state[:party_size]
+            party_states[hp] = party_states.get(hp, 0.0) + probability
+        survival.append(result["victory"])
+
+    return {
+        "method": "exact" if exact_floors == max_floors else "hybrid",
+        "mean": sum(survival),
+        "survival": survival,
+        "floor_probabilities": _floor_probabilities(survival),
+        "exact_floors": exact_floors,
+        "party_composition": list(party_composition)
+    }
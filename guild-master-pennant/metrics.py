@@ -0,0 +1,275 @@
+"""
+Metrics - エージェントと Blackboard の計測
+
+所要時間は直近 window 件の標本を持つローリングヒストグラム（パーセンタイルは
+直近の標本から、件数・合計・最大は累計）、件数は秒単位のバケットで直近の
+スループットを出すカウンター、キューの深さなどは snapshot() のときだけ評価する
+ゲージとして記録する。
+
+計測しない場合は Metrics を作らず None を渡す（Blackboard などは None のとき
+属性の確認1回だけで計測を飛ばす）。
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+DEFAULT_METRICS_PATH = "metrics.json"
+
+
+class RollingHistogram:
+    """
+    直近 window 件の値のヒストグラム
+    """
+
+    def __init__(self, window: int = 1024):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """値を記録"""
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def summary(self, scale: float = 1.0) -> Dict[str, float]:
+        """
+        要約
+
+        Args:
+            scale: 値に掛ける倍率（秒 → ミリ秒なら 1000）
+
+        Returns:
+            {count, mean, p50, p90, p99, max}（パーセンタイルは直近 window 件から）
+        """
+        values = sorted(self.samples)
+        if not values:
+            return {"count": 0, "mean": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+
+        def percentile(fraction: float) -> float:
+            return values[min(len(values) - 1, int(fraction * len(values)))] * scale
+
+        return {
+            "count": self.count,
+            "mean": self.total / self.count * scale,
+            "p50": percentile(0.50),
+            "p90": percentile(0.90),
+            "p99": percentile(0.99),
+            "max": self.max * scale
+        }
+
+
+class RateCounter:
+    """
+    累計と直近 window 秒のスループットを出すカウンター
+    """
+
+    def __init__(self, window: int = 60):
+        self.window = window
+        self.total = 0
+        self._buckets: Deque[List[int]] = deque()   # [秒, 件数]
+
+    def increment(self, amount: int = 1, now: Optional[float] = None) -> None:
+        """件数を加算"""
+        second = int(now if now is not None else time.monotonic())
+        self.total += amount
+        buckets = self._buckets
+        if buckets and buckets[-1][0] == second:
+            buckets[-1][1] += amount
+        else:
+            buckets.append([second, amount])
+            while buckets and buckets[0][0] <= second - self.window:
+                buckets.popleft()
+
+    def summary(self, now: Optional[float] = None) -> Dict[str, float]:
+        """
+        要約
+
+        Returns:
+            {total, per_second}（per_second は直近 window 秒の平均）
+        """
+        second = int(now if now is not None else time.monotonic())
+        recent = sum(count for start, count in list(self._buckets) if start > second - self.window)
+        return {"total": self.total, "per_second": recent / self.window}
+
+
+class Metrics:
+    """
+    名前つきのヒストグラム・カウンター・ゲージの集まり
+    """
+
+    def __init__(self, window: int = 1024, rate_window: int = 60):
+        """
+        Args:
+            window: ヒストグラムが保持する直近の標本数
+            rate_window: スループットを平均する秒数
+        """
+        self.window = window
+        self.rate_window = rate_window
+        self.started_at = time.time()
+        self._histograms: Dict[str, RollingHistogram] = {}
+        self._counters: Dict[str, RateCounter] = {}
+        self._gauges: Dict[str, Callable[[], Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float) -> None:
+        """
+        所要時間を記録
+
+        Args:
+            name: 計測名
+            seconds: 所要時間（秒）
+        """
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = RollingHistogram(self.window)
+            histogram.observe(seconds)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """
+        件数を加算
+
+        Args:
+            name: 計測名
+            amount: 加算する件数
+        """
+        with self._lock:
+            counter = self._counters.get(name)
+            if counter is None:
+                counter = self._counters[name] = RateCounter(self.rate_window)
+            counter.increment(amount)
+
+    def register_gauge(self, name: str, read: Callable[[], Any]) -> None:
+        """
+        snapshot() のときに評価するゲージを登録
+
+        Args:
+            name: 計測名
+            read: 現在値を返す関数
+        """
+        self._gauges[name] = read
+
+    def timed(self, name: str, fn: Callable) -> Callable:
+        """
+        呼び出しの所要時間を name で記録する関数を返す（コルーチン関数にも対応）
+
+        Args:
+            name: 計測名
+            fn: 計測する関数
+
+        Returns:
+            ラップした関数
+        """
+        if asyncio.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def timed_async(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - start)
+            return timed_async
+
+        @wraps(fn)
+        def timed_call(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.observe(name, time.perf_counter() - start)
+        return timed_call
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        すべての計測の要約
+
+        Returns:
+            {uptime_seconds, timings_ms: {name: {count, mean, p50, p90, p99, max}},
+             counters: {name: {total, per_second}}, gauges: {name: value}}
+        """
+        with self._lock:
+            timings = {name: h.summary(1000) for name, h in sorted(self._histograms.items())}
+            counters = {name: c.summary() for name, c in sorted(self._counters.items())}
+        gauges = {}
+        for name, read in sorted(self._gauges.items()):
+            try:
+                gauges[name] = read()
+            except Exception as e:
+                gauges[name] = f"error: {e}"
+        return {
+            "uptime_seconds": time.time() - self.started_at,
+            "timings_ms": timings,
+            "counters": counters,
+            "gauges": gauges
+        }
+
+    def reset(self) -> None:
+        """ヒストグラムとカウンターを空にする（ゲージは残す）"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self.started_at = time.time()
+
+
+def format_snapshot(snapshot: Dict[str, Any]) -> List[str]:
+    """
+    snapshot() の結果を表示用の行に整形
+
+    Args:
+        snapshot: Metrics.snapshot() の結果
+
+    Returns:
+        表示する行のリスト
+    """
+    lines = [f"uptime: {snapshot['uptime_seconds']:.1f}s"]
+    if snapshot["timings_ms"]:
+        lines.append(f"{'timing (ms)':40s} {'count':>8s} {'mean':>9s} {'p50':>9s} "
+                     f"{'p90':>9s} {'p99':>9s} {'max':>9s}")
+        for name, s in snapshot["timings_ms"].items():
+            lines.append(f"{name:40s} {s['count']:8d} {s['mean']:9.3f} {s['p50']:9.3f} "
+                         f"{s['p90']:9.3f} {s['p99']:9.3f} {s['max']:9.3f}")
+    for name, c in snapshot["counters"].items():
+        lines.append(f"{name:40s} total={c['total']}  {c['per_second']:.2f}/s")
+    for name, value in snapshot["gauges"].items():
+        lines.append(f"{name:40s} {value}")
+    return lines
+
+
+
+def pop_metrics_option(args: List[str]) -> Tuple[List[str], Optional[str]]:
+    """
+    コマンドライン引数から --metrics [PATH] を取り除く
+
+    Args:
+        args: コマンドライン引数
+
+    Returns:
+        (残りの引数, 書き出し先のパス（--metrics がなければ None、PATH 省略時は metrics.json）)
+    """
+    if "--metrics" not in args:
+        return list(args), None
+    index = args.index("--metrics")
+    has_path = index + 1 < len(args) and not args[index + 1].startswith("--")
+    path = args[index + 1] if has_path else DEFAULT_METRICS_PATH
+    return args[:index] + args[index + (2 if has_path else 1):], path
+
+
+def write_snapshot(snapshot: Dict[str, Any], path: str) -> None:
+    """
+    snapshot() の結果を JSON で書き出す
+
+    Args:
+        snapshot: Metrics.snapshot() の結果（ロックの統計などを加えたものでもよい）
+        path: 書き出し先
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False, indent=2)
@@ -5,12 +5,17 @@ Orchestrator - マルチエージェント統括システム
 """
 
 import logging
+import multiprocessing
 import sys
 import threading
 import time
 from typing import List, Optional
 
+from agent_scheduler import AgentScheduler
 from blackboard import Blackboard
+from blackboard_server import Address, BlackboardServer, RemoteBlackboard
+from cycle_executor import critical_path, run_cycle
+from metrics import Metrics, format_snapshot, pop_metrics_option, write_snapshot
 from agents import (
     AdventurerAgent,
     CombatAgent,
@@ -32,11 +37,20 @@ class Orchestrator:
     - 対話モードの提供
     """
 
-    def __init__(self):
-        self.blackboard = Blackboard()
+    def __init__(self, blackboard: Optional[Blackboard] = None, metrics: Optional[Metrics] = None):
+        """
+        Args:
+            blackboard: 使用するBlackboard（保持ポリシーを指定する場合など。None=無制限の新規作成）
+            metrics: エージェントの think() と Blackboard の操作の計測先
+                （None=blackboard の計測先。どちらもなければ計測しない）
+        """
+        self.blackboard = blackboard if blackboard is not None else Blackboard(metrics=metrics)
+        self.metrics = metrics if metrics is not None else self.blackboard.metrics
         self.agents = []
         self.agent_threads = []
         self.is_running = False
+        # エージェントごとの前回実行時の入力バージョン（reads を宣言したエージェントのみ）
+        self._input_versions = {}
 
         # ロギング設定
         logging.basicConfig(
@@ -63,8 +77,18 @@ class Orchestrator:
             DungeonAgent(self.blackboard)
         ]
 
+        if self.metrics is not None:
+            for agent in self.agents:
+                self._instrument_agent(agent)
+
         self.logger.info(f"Initialized {len(self.agents)} agents")
 
+    def _instrument_agent(self, agent) -> None:
+        """エージェントの think() の所要時間を agent.<name>.think として記録する"""
+        think = getattr(agent, "think", None)
+        if think is not None:
+            agent.think = self.metrics.timed(f"agent.{agent.name}.think", think)
+
     def start_agents(self, duration: Optional[float] = None) -> None:
         """
         すべてのエージェントを起動
@@ -113,15 +137,116 @@ class Orchestrator:
 
         self.logger.info("All agents stopped")
 
-    def run_single_cycle(self) -> None:
+    def run_event_loop(self, duration: Optional[float] = None, max_concurrency: int = 8,
+                       idle_interval: Optional[float] = None) -> AgentScheduler:
+        """
+        エージェントをスレッドではなく asyncio のコルーチンとして実行
+
+        各エージェントは自分宛て（と "all" 宛て）のメッセージが届いたときだけ起きる。
+
+        Args:
+            duration: 実行時間（秒。None=Ctrl+C まで）
+            max_concurrency: 同時に実行するエージェントの最大数
+            idle_interval: メッセージがなくても起こす間隔（秒。None=メッセージでのみ起こす）
+
+        Returns:
+            実行に使ったスケジューラー（get_stats() で起床・実行回数を確認できる）
+        """
+        if self.is_running:
+            self.logger.warning("Agents are already running")
+            return None
+
+        scheduler = AgentScheduler(self.blackboard, self.agents, max_concurrency, idle_interval)
+        self.is_running = True
+        self.logger.info(f"Running {len(self.agents)} agents on the event loop "
+                         f"(max concurrency: {max_concurrency})")
+        try:
+            scheduler.run(duration)
+        except KeyboardInterrupt:
+            self.logger.info("Interrupted")
+        finally:
+            self.is_running = False
+        return scheduler
+
+    def run_agent_processes(self, duration: float) -> None:
+        """
+        エージェントを1つずつ別プロセスで実行（GIL を避ける）
+
+        このオーケストレーターの Blackboard を localhost の BlackboardServer で公開し、
+        各プロセスは RemoteBlackboard 経由で同じ Blackboard を使う。
+
+        Args:
+            duration: 実行時間（秒）
+        """
+        if self.is_running:
+            self.logger.warning("Agents are already running")
+            return
+
+        self.is_running = True
+        server = BlackboardServer(self.blackboard).start()
+        self.logger.info(f"Serving blackboard on {server.address} for {len(self.agents)} processes")
+        processes = [
+            multiprocessing.Process(target=_run_agent_process,
+                                    args=(type(agent).__name__, server.address, duration),
+                                    name=f"agent-{agent.name}", daemon=True)
+            for agent in self.agents
+        ]
+        try:
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join(duration + 5.0)
+                if process.is_alive():
+                    self.logger.warning(f"{process.name} did not stop; terminating")
+                    process.terminate()
+        finally:
+            server.stop()
+            self.is_running = False
+        self.logger.info("All agent processes finished")
+
+    def run_single_cycle(self, parallel: bool = True, max_workers: Optional[int] = None,
+                         force: bool = False) -> None:
         """
         すべてのエージェントの think() を1回実行
+
+        parallel=True では依存関係（cycle_executor.DEFAULT_AGENT_DEPENDENCIES）の順に、
+        独立したエージェントを並行に実行する。サイクルの最後に購読者への配信を待つため、
+        次のサイクルはこのサイクルのメッセージがすべて届いた状態で始まる。
+
+        読み取る入力を reads 属性で宣言したエージェントは、前回の実行から入力が
+        変わっていなければ実行しない（Blackboard.get_input_version を参照）。
+
+        Args:
+            parallel: 依存関係に従って並列実行するか（False=登録順に1つずつ）
+            max_workers: 並列数（None=エージェント数）
+            force: 入力が変わっていないエージェントも実行するか
         """
         self.logger.info("Running single cycle...")
 
-        for agent in self.agents:
-            agent.start()
-            agent.run_once()
+        # 実行前の入力バージョン。サイクルが例外なく終わったら前回値として記録する
+        pending = {}
+
+        def should_run(agent) -> bool:
+            reads = getattr(agent, "reads", None)
+            if reads is None:
+                return True
+            version = self.blackboard.get_input_version(reads)
+            if not force and self._input_versions.get(agent.name) == version:
+                return False
+            pending[agent.name] = version
+            return True
+
+        if parallel:
+            timings = run_cycle(self.agents, max_workers=max_workers, should_run=should_run)
+            self.logger.info(f"Ran {len(timings)}/{len(self.agents)} agents, "
+                             f"critical path: {critical_path(self.agents, timings):.3f}s")
+        else:
+            for agent in self.agents:
+                if should_run(agent):
+                    agent.start()
+                    agent.run_once()
+        self._input_versions.update(pending)
+        self.blackboard.flush_subscribers()
 
         self.logger.info("Single cycle completed")
 
@@ -137,11 +262,45 @@ class Orchestrator:
         for agent in self.agents:
             agent_statuses[agent.name] = agent.get_status()
 
-        return {
+        progress = {
             "blackboard_summary": summary,
             "tasks": tasks,
             "agent_statuses": agent_statuses
         }
+        if self.metrics is not None:
+            progress["metrics"] = self.get_metrics()
+        return progress
+
+    def get_metrics(self) -> Optional[dict]:
+        """
+        計測結果（think() の所要時間・Blackboard の操作レイテンシ・ロックの待ち時間・
+        メッセージのスループット・キューの深さ）
+
+        Returns:
+            Metrics.snapshot() にロックごとの統計 (locks) を加えたもの（計測しない場合は None）
+        """
+        if self.metrics is None:
+            return None
+        snapshot = self.metrics.snapshot()
+        snapshot["locks"] = self.blackboard.get_lock_stats()
+        return snapshot
+
+    def print_metrics(self) -> None:
+        """
+        計測結果を表示
+        """
+        metrics = self.get_metrics()
+        if metrics is None:
+            print("Metrics are disabled (start with --metrics to enable)")
+            return
+        print("\n📈 Metrics:")
+        for line in format_snapshot(metrics):
+            print(f"  {line}")
+        print("\n🔒 Locks:")
+        for name, lock in metrics["locks"].items():
+            print(f"  {name:20s} acquisitions={lock['acquisitions']}  "
+                  f"contended={lock['contention_rate']:.1%}  "
+                  f"wait total={lock['total_wait_ms']:.2f}ms max={lock['max_wait_ms']:.2f}ms")
 
     def print_progress(self) -> None:
         """
@@ -160,6 +319,12 @@ class Orchestrator:
         print(f"  Generated Files: {summary['total_files']}")
         print(f"  Decisions: {summary['total_decisions']}")
         print(f"  Tasks: {summary['total_tasks']} (Completed: {summary['completed_tasks']}, Failed: {summary['failed_tasks']})")
+        if summary["messages_by_type"]:
+            by_type = ", ".join(f"{t}: {n}" for t, n in sorted(summary["messages_by_type"].items()))
+            print(f"  Messages by type: {by_type}")
+        if summary["files_by_agent"]:
+            by_agent = ", ".join(f"{a}: {n}" for a, n in sorted(summary["files_by_agent"].items()))
+            print(f"  Files by agent: {by_agent}")
 
         # タスク状態
         print(f"\n✅ Tasks:")
@@ -184,7 +349,7 @@ class Orchestrator:
             print(f"      GDScript Generated: {status.get('gdscript_generated', False)}")
 
         # 生成されたファイル
-        files = self.blackboard.get_generated_files()
+        files = self.blackboard.list_generated_files()
         if files:
             print(f"\n📄 Generated Files:")
             for filepath, file_info in files.items():
@@ -209,6 +374,7 @@ class Orchestrator:
         print("  messages [agent]  - Show messages (optional: filter by agent)")
         print("  files             - Show generated files")
         print("  export [file]     - Export blackboard to JSON")
+        print("  stats             - Show timings, throughput and queue depth")
         print("  help              - Show this help")
         print("  quit              - Exit")
         print()
@@ -251,6 +417,9 @@ class Orchestrator:
                     self.blackboard.export_to_json(filepath)
                     print(f"✅ Exported to {filepath}")
 
+                elif cmd == "stats":
+                    self.print_metrics()
+
                 elif cmd == "help":
                     print("\nCommands:")
                     print("  start [duration]  - Start all agents")
@@ -261,6 +430,7 @@ class Orchestrator:
                     print("  messages [agent]  - Show messages")
                     print("  files             - Show generated files")
                     print("  export [file]     - Export blackboard")
+                    print("  stats             - Show timings")
                     print("  quit              - Exit")
 
                 elif cmd in ["quit", "exit"]:
@@ -307,7 +477,7 @@ class Orchestrator:
         """
         生成されたファイルを表示
         """
-        files = self.blackboard.get_generated_files()
+        files = self.blackboard.list_generated_files()
 
         print(f"\n📄 Generated Files (Total: {len(files)}):")
         for filepath, file_info in files.items():
@@ -315,33 +485,90 @@ class Orchestrator:
             print(f"  Agent: {file_info['agent']}")
             print(f"  Description: {file_info['description']}")
             print(f"  Timestamp: {file_info['timestamp']}")
-            print(f"  Lines: {len(file_info['content'].splitlines())}")
+            print(f"  Version: {file_info['version']}")
+            print(f"  Lines: {file_info['lines']} ({file_info['bytes']} bytes)")
+
+
+def _run_agent_process(class_name: str, address: Address, duration: float) -> None:
+    """
+    別プロセスでエージェントを1つ実行（run_agent_processes から起動）
+
+    Args:
+        class_name: agents パッケージのエージェントのクラス名
+        address: BlackboardServer のアドレス
+        duration: 実行時間（秒）
+    """
+    import agents
+
+    with RemoteBlackboard(address) as blackboard:
+        agent = getattr(agents, class_name)(blackboard)
+        agent.run_loop(duration)
+
+
+# 長時間実行 (--run) 時の Blackboard の保持ポリシー
+RUN_MAX_MESSAGES = 10000
+RUN_MAX_DECISIONS = 1000
+RUN_ARCHIVE_DIR = "blackboard_archive"
+RUN_WAL_DIR = "blackboard_wal"
 
 
 def main():
     """
     メイン関数
+
+    --metrics [PATH] を付けると計測を有効にし、終了時に結果を JSON で書き出す
+    （PATH 省略時は metrics.json）。対話モードでは常に計測し、stats コマンドで表示できる。
     """
-    orchestrator = Orchestrator()
+    args, metrics_path = pop_metrics_option(sys.argv[1:])
+    metrics = Metrics() if metrics_path is not None or not args else None
 
+    orchestrator = None
     # コマンドライン引数に応じて動作を変更
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "--auto":
+    if args:
+        if args[0] == "--auto":
             # 自動実行モード
+            orchestrator = Orchestrator(metrics=metrics)
             print("Running in auto mode...")
             orchestrator.run_single_cycle()
             orchestrator.print_progress()
-        elif sys.argv[1] == "--run":
-            # 一定時間実行
-            duration = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+        elif args[0] == "--run":
+            # 一定時間実行（古いメッセージ・決定はアーカイブに書き出してメモリを抑える。
+            # 前回の実行の内容は先行書き込みログから復元して引き継ぐ）
+            orchestrator = Orchestrator(Blackboard.load(
+                RUN_WAL_DIR,
+                max_messages=RUN_MAX_MESSAGES,
+                max_decisions=RUN_MAX_DECISIONS,
+                archive_dir=RUN_ARCHIVE_DIR,
+                metrics=metrics
+            ))
+            duration = float(args[1]) if len(args) > 1 else 10.0
             print(f"Running for {duration} seconds...")
             orchestrator.start_agents(duration)
             time.sleep(duration + 1)
             orchestrator.print_progress()
+        elif args[0] == "--run-processes":
+            # エージェントごとに別プロセスで一定時間実行（Blackboard はサーバー経由で共有）
+            orchestrator = Orchestrator(metrics=metrics)
+            duration = float(args[1]) if len(args) > 1 else 10.0
+            print(f"Running agents in separate processes for {duration} seconds...")
+            orchestrator.run_agent_processes(duration)
+            orchestrator.print_progress()
+        elif args[0] == "--run-async":
+            # イベント駆動で一定時間実行（エージェントはメッセージが届いたときだけ動く）
+            orchestrator = Orchestrator(metrics=metrics)
+            duration = float(args[1]) if len(args) > 1 else 10.0
+            print(f"Running on the event loop for {duration} seconds...")
+            orchestrator.run_event_loop(duration)
+            orchestrator.print_progress()
     else:
         # 対話モード
+        orchestrator = Orchestrator(metrics=metrics)
         orchestrator.interactive_mode()
 
+    if metrics_path is not None and orchestrator is not None:
+        write_snapshot(orchestrator.get_metrics(), metrics_path)
+        print(f"📈 Wrote metrics to {metrics_path}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,724 @@
+"""
+Replay - 戦闘リプレイのコンパクトなバイナリ形式とシードからの再現
+
+simulate_combat の LOG_FULL ログはターンごとの辞書に名前の文字列を入れるため、
+深い階層まで進んだ試行を大量に残すと JSON で数GBになる。ここでは
+シード・ユニット表と、ユニットを整数IDにした固定長の行動レコードだけを書き出す。
+
+ファイル構成（整数はすべてビッグエンディアン）:
+    ヘッダー   b"GMPR" + バージョン(B)
+    レコード   タグ(B) + 本体 の並び
+        RUN        ダンジョン1回分の開始: シード, 最大階層, 戦術の有無, パーティ構成, 付加情報(JSON)
+        BATTLE     戦闘の開始: 階層, シード(単独の戦闘のみ), 最大ターン数, ユニット表
+        SKILL      スキル名の定義（初出時のみ。以降は番号で参照）
+        TURN       1ターン分の行動: 行動数(H) + 行動 × 8バイト
+                   (行動者ID, 種類|対象の生存フラグ, 対象ID, スキル番号, 量)
+        END        戦闘の終了: 勝敗, ターン数
+        RUN_END    ダンジョン1回分の終了: 到達階層
+
+1行動8バイトなので、30階層分の戦闘でも数十KB程度に収まる（gzip.open で開いた
+ファイルを渡せばさらに圧縮できる）。
+
+記録は simulation の recorder フック（simulate_turn / simulate_combat /
+simulate_dungeon の recorder 引数）で行い、乱数はシードから作り直すため
+replay_run / replay_combat で同じ戦闘を再実行できる。
+
+使い方:
+    with ReplayWriter("failed.gmpr") as writer:
+        record_run(writer, ["Warrior", "Mage", "Priest", "Archer"], seed=123, max_floors=30)
+
+    for battle in ReplayReader("failed.gmpr"):
+        for turn in battle.turns():      # ターンは読み進めながら1つずつ復元する
+            ...
+"""
+
+import argparse
+import io
+import json
+import struct
+import sys
+from typing import Any, BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+from simulation import (
+    LOG_FULL, LOG_NONE, CombatSimulator, create_enemies, create_party, make_rng, simulate_dungeon
+)
+
+MAGIC = b"GMPR"
+FORMAT_VERSION = 1
+
+REC_RUN = 1
+REC_BATTLE = 2
+REC_SKILL = 3
+REC_TURN = 4
+REC_END = 5
+REC_RUN_END = 6
+
+SIDE_PARTY = 0
+SIDE_ENEMY = 1
+
+# 行動の種類（tactics.ActionEvent.kind）
+ACTION_KINDS = ("damage", "healing", "buff", "defend", "wait")
+_KIND_CODES = {kind: code for code, kind in enumerate(ACTION_KINDS)}
+TARGET_ALIVE = 0x80
+NO_TARGET = 0xFF
+NO_SKILL = 0
+MAX_UNITS = NO_TARGET
+MAX_SKILLS = 255
+
+OUTCOME_DEFEAT = 0
+OUTCOME_VICTORY = 1
+OUTCOME_TIMEOUT = 2
+_OUTCOMES = {False: OUTCOME_DEFEAT, True: OUTCOME_VICTORY, None: OUTCOME_TIMEOUT}
+_VICTORY = {code: victory for victory, code in _OUTCOMES.items()}
+
+_HEADER = struct.Struct("!4sB")
+_TAG = struct.Struct("!B")
+_RUN = struct.Struct("!QHB")          # シード, 最大階層, 戦術の有無
+_BATTLE = struct.Struct("!HBQHBB")    # 階層, シードの有無, シード, 最大ターン数, 戦術の有無, ユニット数
+_UNIT = struct.Struct("!BBI")         # 陣営, 隊列位置, 開始時HP
+_ACTION = struct.Struct("!BBBBI")     # 行動者, 種類|生存, 対象, スキル, 量
+_COUNT = struct.Struct("!H")
+_END = struct.Struct("!BH")           # 勝敗, ターン数
+
+
+class ReplayFormatError(ValueError):
+    """リプレイファイルの形式が不正"""
+
+
+class ReplayUnit(NamedTuple):
+    """ユニット表の1行"""
+    side: int           # SIDE_PARTY / SIDE_ENEMY
+    name: str           # ログ用の名前（敵は種類名なので重複しうる）
+    kind: str           # 職業 / 敵の種類
+    position: int       # 隊列位置（敵は並び順）
+    hp: int             # 戦闘開始時のHP
+
+
+class ReplayAction(NamedTuple):
+    """1行動（ユニットはユニット表のID）"""
+    actor: int
+    kind: str
+    target: Optional[int]
+    amount: int
+    skill: Optional[str]
+    target_alive: bool
+
+
+class RunInfo:
+    """
+    ダンジョン1回分の情報（RUN レコード）
+    """
+
+    def __init__(self, seed: int, max_floors: int, tactics: bool,
+                 composition: List[str], meta: Dict[str, Any]):
+        self.seed = seed
+        self.max_floors = max_floors
+        self.tactics = tactics
+        self.composition = composition
+        self.meta = meta
+        self.max_floor_reached: Optional[int] = None   # RUN_END を読んだ時点で設定
+
+    def __repr__(self) -> str:
+        return (f"RunInfo(seed={self.seed}, composition={self.composition}, "
+                f"max_floors={self.max_floors}, tactics={self.tactics})")
+
+
+def _seed_field(seed: int) -> int:
+    """シードを記録用の64bit符号なし整数に変換"""
+    if not 0 <= seed < 1 << 64:
+        raise ValueError(f"seed must be an unsigned 64-bit integer: {seed}")
+    return seed
+
+
+def _pack_str(text: str, length_format: str = "!B") -> bytes:
+    """長さつき UTF-8 文字列"""
+    data = text.encode("utf-8")
+    return struct.pack(length_format, len(data)) + data
+
+
+class ReplayWriter:
+    """
+    リプレイのストリーミング書き込み
+
+    simulation の recorder として渡す（begin_battle / action / end_turn / end_battle）。
+    ターンの行動はメモリにためて end_turn() でまとめて書き出すため、保持するのは
+    1ターン分だけで済む。
+    """
+
+    def __init__(self, target, tactics: bool = False):
+        """
+        Args:
+            target: 書き込み先のパスまたはバイナリのファイルオブジェクト
+            tactics: 単独の戦闘を記録するときの既定の戦術の有無
+        """
+        if isinstance(target, (str, bytes)) or hasattr(target, "__fspath__"):
+            self._file: BinaryIO = open(target, "wb")
+            self._owns_file = True
+        else:
+            self._file = target
+            self._owns_file = False
+        self.tactics = tactics
+        self.bytes_written = 0
+        self.battles = 0
+        self._skills: Dict[str, int] = {}
+        self._unit_ids: Dict[int, int] = {}
+        self._actions: List[bytes] = []
+        self._run: Optional[RunInfo] = None
+        self._in_battle = False
+        self._write(_HEADER.pack(MAGIC, FORMAT_VERSION))
+
+    def _write(self, data: bytes) -> None:
+        self._file.write(data)
+        self.bytes_written += len(data)
+
+    # ---------------------------------------------------------
+    # ダンジョン1回分
+    # ---------------------------------------------------------
+
+    def begin_run(self, composition: Sequence[str], seed: int, max_floors: int,
+                  tactics: bool = False, meta: Optional[Dict[str, Any]] = None) -> None:
+        """
+        ダンジョン1回分の記録を開始
+
+        Args:
+            composition: パーティ構成（隊列順の職業名）
+            seed: simulate_dungeon に渡したシード
+            max_floors: 最大階層数
+            tactics: 既定の TacticsEngine で戦ったか
+            meta: 付加情報（JSON にできる辞書。スイープのキーや試行番号など）
+        """
+        if self._run is not None:
+            raise RuntimeError("begin_run called inside another run")
+        self._run = RunInfo(seed, max_floors, bool(tactics), list(composition), dict(meta or {}))
+        body = [_TAG.pack(REC_RUN), _RUN.pack(_seed_field(seed), max_floors, bool(tactics)),
+                _TAG.pack(len(composition))]
+        body.extend(_pack_str(job) for job in composition)
+        body.append(_pack_str(json.dumps(meta or {}, ensure_ascii=False), "!H"))
+        self._write(b"".join(body))
+
+    def end_run(self, result: Dict) -> None:
+        """
+        ダンジョン1回分の記録を終了
+
+        Args:
+            result: simulate_dungeon の結果
+        """
+        if self._run is None:
+            raise RuntimeError("end_run called outside a run")
+        self._write(_TAG.pack(REC_RUN_END) + _COUNT.pack(result["max_floor_reached"]))
+        self._run = None
+
+    # ---------------------------------------------------------
+    # recorder フック
+    # ---------------------------------------------------------
+
+    def begin_battle(self, floor: int, party: Sequence, enemies: Sequence,
+                     seed: Optional[int] = None, max_turns: int = 100,
+                     tactics: Optional[bool] = None) -> None:
+        """
+        戦闘の開始（ユニット表を書き出し、ユニットにIDを振る）
+
+        Args:
+            floor: 階層（単独の戦闘で敵を create_enemies 以外で作った場合は 0）
+            party: 冒険者リスト
+            enemies: 敵リスト
+            seed: 単独の戦闘の乱数シード（ダンジョン内の戦闘は None）
+            max_turns: 最大ターン数
+            tactics: 戦術の有無（None=実行中のダンジョンの設定か、コンストラクタの既定値）
+        """
+        units = list(party) + list(enemies)
+        if len(units) > MAX_UNITS:
+            raise ValueError(f"too many units for a replay: {len(units)}")
+        if tactics is None:
+            tactics = self._run.tactics if self._run is not None else self.tactics
+
+        body = [_TAG.pack(REC_BATTLE), _BATTLE.pack(
+            floor, seed is not None, _seed_field(seed) if seed is not None else 0,
+            max_turns, bool(tactics), len(units))]
+        self._unit_ids = {}
+        for index, unit in enumerate(units):
+            self._unit_ids[id(unit)] = index
+            if index < len(party):
+                body.append(_UNIT.pack(SIDE_PARTY, unit.formation_position, unit.current_hp))
+                body.append(_pack_str(unit.adventurer_name))
+                body.append(_pack_str(unit.job_class))
+            else:
+                body.append(_UNIT.pack(SIDE_ENEMY, index - len(party), unit.current_hp))
+                body.append(_pack_str(unit.name))
+                body.append(_pack_str(unit.type))
+        self._write(b"".join(body))
+        self._actions = []
+        self._in_battle = True
+
+    def action(self, unit, kind: str, target, amount: int, skill: Optional[str]) -> None:
+        """1行動を記録（simulate_turn から呼ばれる）"""
+        if skill:
+            skill_id = self._skills.get(skill)
+            if skill_id is None:
+                skill_id = self._define_skill(skill)
+        else:
+            skill_id = NO_SKILL
+        if target is None:
+            target_id = NO_TARGET
+            flags = _KIND_CODES[kind]
+        else:
+            target_id = self._unit_ids[id(target)]
+            flags = _KIND_CODES[kind] | (TARGET_ALIVE if target.is_alive else 0)
+        self._actions.append(_ACTION.pack(self._unit_ids[id(unit)], flags, target_id,
+                                          skill_id, amount))
+
+    def _define_skill(self, skill: str) -> int:
+        """スキル名に番号を振り、SKILL レコードを書き出す"""
+        if len(self._skills) >= MAX_SKILLS:
+            raise ValueError("too many distinct skills for a replay")
+        skill_id = self._skills[skill] = len(self._skills) + 1
+        self._write(_TAG.pack(REC_SKILL) + _TAG.pack(skill_id) + _pack_str(skill))
+        return skill_id
+
+    def end_turn(self) -> None:
+        """ターンの行動をまとめて書き出す"""
+        actions = self._actions
+        self._write(_TAG.pack(REC_TURN) + _COUNT.pack(len(actions)) + b"".join(actions))
+        self._actions = []
+
+    def end_battle(self, result: Dict) -> None:
+        """
+        戦闘の終了
+
+        Args:
+            result: simulate_combat の結果
+        """
+        if not self._in_battle:
+            raise RuntimeError("end_battle called outside a battle")
+        self._write(_TAG.pack(REC_END) + _END.pack(_OUTCOMES[result["victory"]], result["turns"]))
+        self._in_battle = False
+        self._unit_ids = {}
+        self.battles += 1
+
+    # ---------------------------------------------------------
+
+    def flush(self) -> None:
+        """書き込み先をフラッシュ"""
+        self._file.flush()
+
+    def close(self) -> None:
+        """書き込みを終える（パスから開いた場合はファイルを閉じる）"""
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+
+    def __enter__(self) -> "ReplayWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class Battle:
+    """
+    リプレイ中の1戦闘
+
+    turns() はファイルを読み進めながらターンを1つずつ返す。次の戦闘に進むと
+    読まなかったターンは復元せずに読み飛ばされるため、turns() はその戦闘を
+    読んでいる間にだけ呼べる。
+    """
+
+    def __init__(self, reader: "ReplayReader", floor: int, seed: Optional[int],
+                 max_turns: int, tactics: bool, units: List[ReplayUnit],
+                 run: Optional[RunInfo]):
+        self.floor = floor
+        self.seed = seed
+        self.max_turns = max_turns
+        self.tactics = tactics
+        self.units = units
+        self.run = run
+        self.victory: Optional[bool] = None     # 戦闘の終わりまで読んだ時点で設定
+        self.turn_count: Optional[int] = None
+        self._reader = reader
+        self._done = False
+        self._started = False
+
+    @property
+    def finished(self) -> bool:
+        """戦闘の終わりまで読んだか"""
+        return self._done
+
+    def turns(self) -> Iterator[List[ReplayAction]]:
+        """
+        ターンごとの行動を順に返す
+
+        Returns:
+            ReplayAction のリストを1ターンずつ返すイテレーター
+        """
+        if self._started:
+            raise RuntimeError("turns() can only be iterated once")
+        self._started = True
+        return self._read_turns(decode=True)
+
+    def turn_logs(self) -> Iterator[List[Dict]]:
+        """
+        ターンごとの行動を simulate_turn の LOG_FULL と同じ形式（名前つきの辞書）で返す
+
+        Returns:
+            ログのリストを1ターンずつ返すイテレーター
+        """
+        names = [unit.name for unit in self.units]
+        for actions in self.turns():
+            turn_log = []
+            for a in actions:
+                if a.kind == "damage":
+                    entry = {"attacker": names[a.actor], "target": names[a.target],
+                             "damage": a.amount, "target_alive": a.target_alive}
+                elif a.target is not None:
+                    entry = {"attacker": names[a.actor], "target": names[a.target],
+                             a.kind: a.amount}
+                else:
+                    entry = {"attacker": names[a.actor], "action": a.kind}
+                if a.skill:
+                    entry["skill"] = a.skill
+                turn_log.append(entry)
+            yield turn_log
+
+    def _read_turns(self, decode: bool) -> Iterator[List[ReplayAction]]:
+        """TURN レコードを END まで読む（decode=False は読み飛ばすだけ）"""
+        reader = self._reader
+        while not self._done:
+            tag = reader._read_tag()
+            if tag == REC_TURN:
+                (count,) = _COUNT.unpack(reader._read(_COUNT.size))
+                data = reader._read(count * _ACTION.size)
+                if decode:
+                    yield reader._decode_actions(data)
+            elif tag == REC_SKILL:
+                reader._read_skill()
+            elif tag == REC_END:
+                outcome, self.turn_count = _END.unpack(reader._read(_END.size))
+                self.victory = _VICTORY[outcome]
+                self._done = True
+            else:
+                raise ReplayFormatError(f"unexpected record {tag} inside a battle")
+
+    def _finish(self) -> None:
+        """読まなかったターンを読み飛ばす"""
+        for _ in self._read_turns(decode=False):
+            pass
+
+    def __repr__(self) -> str:
+        return f"Battle(floor={self.floor}, seed={self.seed}, units={len(self.units)})"
+
+
+class ReplayReader:
+    """
+    リプレイの逐次読み込み
+
+    イテレートすると戦闘（Battle）を先頭から順に返す。ダンジョン内の戦闘は
+    battle.run に RunInfo を持つ。
+    """
+
+    def __init__(self, source):
+        """
+        Args:
+            source: 読み込み元のパスまたはバイナリのファイルオブジェクト
+        """
+        if isinstance(source, (str, bytes)) or hasattr(source, "__fspath__"):
+            self._file: BinaryIO = open(source, "rb")
+            self._owns_file = True
+        else:
+            self._file = source
+            self._owns_file = False
+        self._skills: Dict[int, str] = {}
+        self.run: Optional[RunInfo] = None
+
+        magic, version = _HEADER.unpack(self._read(_HEADER.size))
+        if magic != MAGIC:
+            raise ReplayFormatError("not a replay file")
+        if version != FORMAT_VERSION:
+            raise ReplayFormatError(f"unsupported replay version: {version}")
+
+    def _read(self, size: int) -> bytes:
+        data = self._file.read(size)
+        if len(data) != size:
+            raise ReplayFormatError("truncated replay file")
+        return data
+
+    def _read_tag(self) -> Optional[int]:
+        """次のレコードのタグ（ファイルの終わりは None）"""
+        data = self._file.read(1)
+        return data[0] if data else None
+
+    def _read_str(self, length: struct.Struct = _TAG) -> str:
+        (size,) = length.unpack(self._read(length.size))
+        return self._read(size).decode("utf-8")
+
+    def _read_skill(self) -> None:
+        skill_id = self._read(1)[0]
+        self._skills[skill_id] = self._read_str()
+
+    def _decode_actions(self, data: bytes) -> List[ReplayAction]:
+        skills = self._skills
+        actions = []
+        for actor, flags, target, skill, amount in _ACTION.iter_unpack(data):
+            actions.append(ReplayAction(
+                actor, ACTION_KINDS[flags & 0x7F],
+                None if target == NO_TARGET else target,
+                amount, skills[skill] if skill != NO_SKILL else None,
+                bool(flags & TARGET_ALIVE)))
+        return actions
+
+    def _read_run(self) -> RunInfo:
+        seed, max_floors, tactics = _RUN.unpack(self._read(_RUN.size))
+        composition = [self._read_str() for _ in range(self._read(1)[0])]
+        meta = json.loads(self._read_str(_COUNT))
+        return RunInfo(seed, max_floors, bool(tactics), composition, meta)
+
+    def _read_battle(self) -> Battle:
+        floor, has_seed, seed, max_turns, tactics, count = _BATTLE.unpack(self._read(_BATTLE.size))
+        units = []
+        for _ in range(count):
+            side, position, hp = _UNIT.unpack(self._read(_UNIT.size))
+            name = self._read_str()
+            units.append(ReplayUnit(side, name, self._read_str(), position, hp))
+        return Battle(self, floor, seed if has_seed else None, max_turns, bool(tactics),
+                      units, self.run)
+
+    def battles(self) -> Iterator[Battle]:
+        """
+        戦闘を順に返す
+
+        Returns:
+            Battle のイテレーター（次の戦闘に進むと前の戦闘の残りは読み飛ばされる）
+        """
+        while True:
+            tag = self._read_tag()
+            if tag is None:
+                return
+            if tag == REC_BATTLE:
+                battle = self._read_battle()
+                yield battle
+                battle._finish()
+            elif tag == REC_RUN:
+                self.run = self._read_run()
+            elif tag == REC_RUN_END:
+                (self.run.max_floor_reached,) = _COUNT.unpack(self._read(_COUNT.size))
+                self.run = None
+            elif tag == REC_SKILL:
+                self._read_skill()
+            else:
+                raise ReplayFormatError(f"unexpected record {tag}")
+
+    def __iter__(self) -> Iterator[Battle]:
+        return self.battles()
+
+    def close(self) -> None:
+        """パスから開いた場合はファイルを閉じる"""
+        if self._owns_file:
+            self._file.close()
+
+    def __enter__(self) -> "ReplayReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _tactics_engine(enabled: bool):
+    """記録時の戦術の有無から TacticsEngine を作る（既定の戦術のみ再現できる）"""
+    if not enabled:
+        return None
+    from tactics import TacticsEngine
+    return TacticsEngine()
+
+
+def record_combat(writer: ReplayWriter, party: List, enemies: List, seed: int,
+                  max_turns: int = 100, tactics=None, floor: int = 0) -> Dict:
+    """
+    単独の戦闘をシードから実行して記録
+
+    Args:
+        writer: 記録先
+        party: 冒険者リスト（create_party で作ったもの）
+        enemies: 敵リスト（floor を指定する場合は create_enemies(floor) で作ったもの）
+        seed: 乱数シード（make_rng(seed) を使う）
+        max_turns: 最大ターン数
+        tactics: tactics.TacticsEngine（再現できるのは既定の戦術のみ）
+        floor: 敵の階層（replay_combat で敵を作り直すのに使う）
+
+    Returns:
+        simulate_combat の結果（ログなし）
+    """
+    writer.begin_battle(floor, party, enemies, seed=seed, max_turns=max_turns,
+                        tactics=tactics is not None)
+    result = CombatSimulator.simulate_combat(party, enemies, max_turns, LOG_NONE,
+                                             make_rng(seed), tactics, recorder=writer)
+    writer.end_battle(result)
+    return result
+
+
+def record_run(writer: ReplayWriter, composition: Sequence[str], seed: int,
+               max_floors: int = 50, tactics=None,
+               meta: Optional[Dict[str, Any]] = None) -> Dict:
+    """
+    ダンジョン1回分をシードから実行し、全階層の戦闘を記録
+
+    simulate_dungeon_batch の試行 i は seed=derive_seed(batch_seed, i) で同じ結果になる。
+
+    Args:
+        writer: 記録先
+        composition: パーティ構成（隊列順の職業名）
+        seed: simulate_dungeon のシード
+        max_floors: 最大階層数
+        tactics: tactics.TacticsEngine（再現できるのは既定の戦術のみ）
+        meta: 付加情報
+
+    Returns:
+        simulate_dungeon の結果
+    """
+    writer.begin_run(composition, seed, max_floors, tactics is not None, meta)
+    result = simulate_dungeon(list(composition), max_floors, seed=seed, tactics=tactics,
+                              recorder=writer)
+    writer.end_run(result)
+    return result
+
+
+def replay_combat(battle: Battle, log_level: str = LOG_FULL, recorder=None) -> Dict:
+    """
+    記録した単独の戦闘をシードとユニット表から再実行
+
+    Args:
+        battle: ReplayReader から得た戦闘（seed を持つもの）
+        log_level: simulate_combat のログ詳細度
+        recorder: 再実行を記録する ReplayWriter など
+
+    Returns:
+        simulate_combat の結果
+
+    Raises:
+        ValueError: シードのない（ダンジョン内の）戦闘の場合。replay_run を使う
+    """
+    if battle.seed is None:
+        raise ValueError("battle has no seed; replay its dungeon run with replay_run")
+    party_units = [u for u in battle.units if u.side == SIDE_PARTY]
+    enemy_units = [u for u in battle.units if u.side == SIDE_ENEMY]
+
+    party = create_party([u.kind for u in sorted(party_units, key=lambda u: u.position)])
+    by_position = {adventurer.formation_position: adventurer for adventurer in party}
+    party = [by_position[u.position] for u in party_units]
+    enemies = create_enemies(battle.floor) if battle.floor else []
+    if [e.type for e in enemies] != [u.kind for u in enemy_units]:
+        raise ValueError(f"enemies of floor {battle.floor} do not match the replay")
+
+    for unit, source in zip(party + enemies, party_units + enemy_units):
+        unit.current_hp = source.hp
+        unit.is_alive = source.hp > 0
+
+    tactics = _tactics_engine(battle.tactics)
+    if recorder is not None:
+        recorder.begin_battle(battle.floor, party, enemies, seed=battle.seed,
+                              max_turns=battle.max_turns, tactics=battle.tactics)
+    result = CombatSimulator.simulate_combat(party, enemies, battle.max_turns, log_level,
+                                             make_rng(battle.seed), tactics, recorder)
+    if recorder is not None:
+        recorder.end_battle(result)
+    return result
+
+
+def replay_run(run: RunInfo, recorder: Optional[ReplayWriter] = None) -> Dict:
+    """
+    記録したダンジョン1回分をシードから再実行
+
+    Args:
+        run: ReplayReader から得た battle.run
+        recorder: 再実行を記録する ReplayWriter（None は結果のみ）
+
+    Returns:
+        simulate_dungeon の結果
+    """
+    tactics = _tactics_engine(run.tactics)
+    if recorder is None:
+        return simulate_dungeon(run.composition, run.max_floors, seed=run.seed, tactics=tactics)
+    return record_run(recorder, run.composition, run.seed, run.max_floors, tactics, run.meta)
+
+
+def verify_replay(source) -> Dict[str, int]:
+    """
+    リプレイの各戦闘を再実行し、記録と行動単位で一致するか確認
+
+    Args:
+        source: リプレイのパスまたはファイルオブジェクト
+
+    Returns:
+        {"battles", "runs", "mismatches"}
+    """
+    def battle_key(battle: Battle) -> tuple:
+        turns = [tuple(actions) for actions in battle.turns()]
+        return (battle.floor, tuple(battle.units), tuple(turns), battle.victory, battle.turn_count)
+
+    stats = {"battles": 0, "runs": 0, "mismatches": 0}
+    current_run: Optional[RunInfo] = None
+    recorded: List[tuple] = []
+
+    def check_run() -> None:
+        buffer = io.BytesIO()
+        replay_run(current_run, ReplayWriter(buffer))
+        buffer.seek(0)
+        replayed = [battle_key(b) for b in ReplayReader(buffer)]
+        stats["runs"] += 1
+        if replayed != recorded:
+            stats["mismatches"] += 1
+
+    with ReplayReader(source) as reader:
+        for battle in reader:
+            stats["battles"] += 1
+            if battle.run is not current_run:
+                if current_run is not None:
+                    check_run()
+                current_run, recorded = battle.run, []
+            if battle.run is not None:
+                recorded.append(battle_key(battle))
+                continue
+            key = battle_key(battle)
+            buffer = io.BytesIO()
+            replay_combat(battle, LOG_NONE, ReplayWriter(buffer))
+            buffer.seek(0)
+            if [battle_key(b) for b in ReplayReader(buffer)] != [key]:
+                stats["mismatches"] += 1
+        if current_run is not None:
+            check_run()
+    return stats
+
+
+def main():
+    """
+    メイン関数（リプレイの内容表示と再現確認）
+    """
+    parser = argparse.ArgumentParser(description="Inspect or verify combat replay files")
+    parser.add_argument("path", help="replay file (.gmpr)")
+    parser.add_argument("--turns", action="store_true", help="print every action")
+    parser.add_argument("--verify", action="store_true", help="re-simulate and compare with the recording")
+    args = parser.parse_args()
+
+    if args.verify:
+        stats = verify_replay(args.path)
+        print(f"battles={stats['battles']} runs={stats['runs']} mismatches={stats['mismatches']}")
+        sys.exit(1 if stats["mismatches"] else 0)
+
+    with ReplayReader(args.path) as reader:
+        for battle in reader:
+            if battle.run is not None and battle.floor == 1:
+                print(f"Run seed={battle.run.seed} {', '.join(battle.run.composition)} "
+                      f"{json.dumps(battle.run.meta, ensure_ascii=False)}")
+            turn_logs = battle.turn_logs()
+            if args.turns:
+                for number, turn_log in enumerate(turn_logs, 1):
+                    for entry in turn_log:
+                        print(f"    T{number:3d} {entry}")
+            else:
+                for _ in turn_logs:
+                    pass
+            outcome = {True: "victory", False: "defeat", None: "timeout"}[battle.victory]
+            print(f"  floor {battle.floor:3d}: {outcome} in {battle.turn_count} turns")
+
+
+if __name__ == "__main__":
+    main()
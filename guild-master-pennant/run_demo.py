@@ -3,7 +3,6 @@
 """
 
 from orchestrator import Orchestrator
-import time
 
 
 def main():
@@ -19,14 +18,13 @@ def main():
     for cycle in range(3):
         print(f"\n--- Cycle {cycle + 1} ---")
         orchestrator.run_single_cycle()
-        time.sleep(0.5)
 
     # 進捗レポートを表示
     print("\n")
     orchestrator.print_progress()
 
     # 生成されたファイルを確認
-    files = orchestrator.blackboard.get_generated_files()
+    files = orchestrator.blackboard.list_generated_files()
     print(f"\n✅ Successfully generated {len(files)} GDScript files!\n")
 
     # Blackboardをエクスポート
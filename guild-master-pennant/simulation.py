@@ -4,65 +4,133 @@ Simulation - バランスシミュレーション
 ゲームバランスをテストするためのシミュレーション機能。
 """
 
+import hashlib
+import math
 import random
-from typing import List, Dict, Any
+import secrets
+import statistics
+from functools import lru_cache
+from typing import List, Dict, Any, Callable, Optional, Tuple
+
+from game_data import (
+    DEFAULT_JOB_STATS,
+    ENEMY_STATS,
+    JOB_STATS,
+    UnitStats,
+    floor_enemy_templates,
+    floor_scaling,
+    scale_stats
+)
+
+# 戦闘ログの詳細度
+LOG_NONE = "none"        # ログなし（勝敗とターン数のみ）
+LOG_SUMMARY = "summary"  # ターンごとの集計のみ
+LOG_FULL = "full"        # 攻撃ごとの詳細ログ
+LOG_LEVELS = (LOG_NONE, LOG_SUMMARY, LOG_FULL)
+
+# simulate_dungeon_batch のエンジン
+ENGINE_AUTO = "auto"              # 使えれば vectorized、使えなければ scalar
+ENGINE_SCALAR = "scalar"          # 1試行ずつ Python で実行（試行ごとに単独で再現できる）
+ENGINE_VECTORIZED = "vectorized"  # NumPy で全試行を一括実行
+ENGINES = (ENGINE_AUTO, ENGINE_SCALAR, ENGINE_VECTORIZED)
+
+# ダメージの乱数幅 (90% ~ 110%)
+DAMAGE_ROLL_LOW = 0.9
+DAMAGE_ROLL_SPAN = 1.1 - 0.9
+
+
+@lru_cache(maxsize=None)
+def position_modifiers(attack: int, defense: int, formation_position: int) -> Tuple[int, int, float]:
+    """
+    隊列位置による実効攻撃力・実効防御力・被弾率
+
+    Returns:
+        (実効攻撃力, 実効防御力, 被弾率)
+    """
+    if formation_position < 3:
+        # 前列: 攻撃+10%、前列3人で被弾率60%を分担
+        return int(attack * 1.1), int(defense * 1.0), 0.6 / 3.0
+    # 後列: 防御+10%、被弾率10%
+    return int(attack * 1.0), int(defense * 1.1), 0.1
+
+
+@lru_cache(maxsize=None)
+def scaled_enemy_stats(enemy_type: str, scaling: float) -> UnitStats:
+    """階層倍率を適用した敵ステータス"""
+    return scale_stats(ENEMY_STATS.get(enemy_type, ENEMY_STATS["Goblin"]), scaling)
+
+
+# 階層ごとの敵編成のひな形 {floor: (MockEnemy, ...)}
+_ENEMY_LINEUPS: Dict[int, Tuple["MockEnemy", ...]] = {}
 
 
 class MockAdventurer:
     """
     シミュレーション用の冒険者クラス
+
+    __slots__ で軽量化し、隊列位置による実効値は formation_position 設定時に計算して保持する。
+    attack / defense を直接変更した場合は refresh_modifiers() を呼ぶこと。
     """
+    __slots__ = (
+        "adventurer_name", "job_class", "is_alive",
+        "max_hp", "current_hp", "attack", "defense", "magic", "speed",
+        "_formation_position", "_effective_attack", "_effective_defense", "_hit_rate"
+    )
+
     def __init__(self, name: str, job_class: str):
         self.adventurer_name = name
         self.job_class = job_class
-        self.formation_position = 0
         self.is_alive = True
 
         # 職業別ステータス
         self._apply_job_stats()
+        self.formation_position = 0
 
     def _apply_job_stats(self):
         """職業別ステータスを適用"""
-        job_stats = {
-            "Warrior": {"max_hp": 100, "attack": 15, "defense": 12, "magic": 3, "speed": 8},
-            "Mage": {"max_hp": 60, "attack": 5, "defense": 5, "magic": 20, "speed": 10},
-            "Priest": {"max_hp": 70, "attack": 7, "defense": 8, "magic": 15, "speed": 9},
-            "Thief": {"max_hp": 75, "attack": 12, "defense": 7, "magic": 5, "speed": 18},
-            "Archer": {"max_hp": 80, "attack": 13, "defense": 8, "magic": 6, "speed": 12}
-        }
-
-        stats = job_stats.get(self.job_class, job_stats["Warrior"])
-        self.max_hp = stats["max_hp"]
-        self.current_hp = stats["max_hp"]
-        self.attack = stats["attack"]
-        self.defense = stats["defense"]
-        self.magic = stats["magic"]
-        self.speed = stats["speed"]
+        stats = JOB_STATS.get(self.job_class, DEFAULT_JOB_STATS)
+        self.max_hp = stats.max_hp
+        self.current_hp = stats.max_hp
+        self.attack = stats.attack
+        self.defense = stats.defense
+        self.magic = stats.magic
+        self.speed = stats.speed
+
+    @property
+    def formation_position(self) -> int:
+        """隊列位置 (0-2: 前列, 3-: 後列)"""
+        return self._formation_position
+
+    @formation_position.setter
+    def formation_position(self, position: int) -> None:
+        self._formation_position = position
+        self.refresh_modifiers()
+
+    def refresh_modifiers(self) -> None:
+        """隊列位置による実効値を再計算"""
+        self._effective_attack, self._effective_defense, self._hit_rate = position_modifiers(
+            self.attack, self.defense, self._formation_position
+        )
 
     def is_in_front_row(self) -> bool:
         """前列にいるか"""
-        return self.formation_position < 3
+        return self._formation_position < 3
 
     def get_effective_attack(self) -> int:
         """実効攻撃力"""
-        modifier = 1.1 if self.is_in_front_row() else 1.0
-        return int(self.attack * modifier)
+        return self._effective_attack
 
     def get_effective_defense(self) -> int:
         """実効防御力"""
-        modifier = 1.0 if self.is_in_front_row() else 1.1
-        return int(self.defense * modifier)
+        return self._effective_defense
 
     def get_hit_rate(self) -> float:
         """被弾率"""
-        if self.is_in_front_row():
-            return 0.6 / 3.0  # 前列3人で60%を分担
-        else:
-            return 0.1  # 後列は10%
+        return self._hit_rate
 
     def take_damage(self, damage: int) -> int:
         """ダメージを受ける"""
-        actual_damage = max(1, damage - self.get_effective_defense())
+        actual_damage = max(1, damage - self._effective_defense)
         self.current_hp -= actual_damage
 
         if self.current_hp <= 0:
@@ -80,32 +148,63 @@ class MockAdventurer:
         self.current_hp = min(self.max_hp, self.current_hp + amount)
         return self.current_hp - old_hp
 
+    def reset(self) -> None:
+        """HPと生存状態を初期化（バッチ実行での再利用用）"""
+        self.current_hp = self.max_hp
+        self.is_alive = True
+
+    def copy(self) -> "MockAdventurer":
+        """同じ状態の冒険者を複製（ステータス再計算なし）"""
+        clone = MockAdventurer.__new__(MockAdventurer)
+        for slot in MockAdventurer.__slots__:
+            setattr(clone, slot, getattr(self, slot))
+        return clone
+
 
 class MockEnemy:
     """
     シミュレーション用の敵クラス
+
+    倍率適用済みのステータスは scaled_enemy_stats でキャッシュされ、同じ種類・倍率の敵は共有する。
     """
+    __slots__ = (
+        "name", "type", "is_alive",
+        "max_hp", "current_hp", "attack", "defense", "magic", "speed"
+    )
+
     def __init__(self, enemy_type: str, scaling: float = 1.0):
         self.name = enemy_type
         self.type = enemy_type
         self.is_alive = True
 
-        # 敵のベースステータス
-        enemy_stats = {
-            "Goblin": {"hp": 50, "attack": 10, "defense": 5, "magic": 0, "speed": 12},
-            "Orc": {"hp": 80, "attack": 15, "defense": 10, "magic": 0, "speed": 6},
-            "Dark Mage": {"hp": 40, "attack": 5, "defense": 3, "magic": 18, "speed": 10},
-            "Skeleton": {"hp": 60, "attack": 12, "defense": 8, "magic": 0, "speed": 8},
-            "Dragon": {"hp": 200, "attack": 25, "defense": 20, "magic": 15, "speed": 14}
-        }
+        self._apply_stats(scaled_enemy_stats(enemy_type, scaling))
+
+    @classmethod
+    def from_stats(cls, enemy_type: str, stats: UnitStats) -> "MockEnemy":
+        """倍率適用済みのステータスから敵を作成"""
+        enemy = cls.__new__(cls)
+        enemy.name = enemy_type
+        enemy.type = enemy_type
+        enemy.is_alive = True
+        enemy._apply_stats(stats)
+        return enemy
+
+    def _apply_stats(self, stats: UnitStats) -> None:
+        """ステータスを適用"""
+        self.max_hp = stats.max_hp
+        self.current_hp = stats.max_hp
+        self.attack = stats.attack
+        self.defense = stats.defense
+        self.magic = stats.magic
+        self.speed = stats.speed
 
-        stats = enemy_stats.get(enemy_type, enemy_stats["Goblin"])
-        self.max_hp = int(stats["hp"] * scaling)
-        self.current_hp = int(stats["hp"] * scaling)
-        self.attack = int(stats["attack"] * scaling)
-        self.defense = int(stats["defense"] * scaling)
-        self.magic = int(stats["magic"] * scaling)
-        self.speed = int(stats["speed"] * scaling)
+    def get_effective_attack(self) -> int:
+        """実効攻撃力（敵は隊列補正なし）"""
+        return self.attack
+
+    def get_effective_defense(self) -> int:
+        """実効防御力（敵は隊列補正なし）"""
+        return self.defense
 
     def take_damage(self, damage: int) -> int:
         """ダメージを受ける"""
@@ -118,6 +217,45 @@ class MockEnemy:
 
         return actual_damage
 
+    def reset(self) -> None:
+        """HPと生存状態を初期化（バッチ実行での再利用用）"""
+        self.current_hp = self.max_hp
+        self.is_alive = True
+
+    def copy(self) -> "MockEnemy":
+        """同じ状態の敵を複製（ステータス再計算なし）"""
+        clone = MockEnemy.__new__(MockEnemy)
+        for slot in MockEnemy.__slots__:
+            setattr(clone, slot, getattr(self, slot))
+        return clone
+
+
+def derive_seed(master_seed: int, *keys: Any) -> int:
+    """
+    マスターシードとキーからサブストリーム用の64bitシードを導出
+
+    同じ (master_seed, keys) からは常に同じシードが得られ、キーが異なれば実質的に独立になる。
+    """
+    material = ":".join(str(part) for part in (master_seed,) + keys)
+    digest = hashlib.sha256(material.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def make_rng(seed: Optional[int] = None):
+    """
+    シミュレーション用のRNGを作成
+
+    乱数をブロック単位で事前生成するRNGは、1回の取り出しが random.Random.random()
+    （C実装の1回の呼び出し）より速くならないため用意していない。
+
+    Args:
+        seed: シード
+
+    Returns:
+        random() / uniform() を持つRNG
+    """
+    return random.Random(seed)
+
 
 class CombatSimulator:
     """
@@ -125,19 +263,21 @@ class CombatSimulator:
     """
 
     @staticmethod
-    def calculate_damage(attacker, defender) -> int:
-        """ダメージ計算"""
-        base_damage = attacker.get_effective_attack() if hasattr(attacker, 'get_effective_attack') else attacker.attack
-        defense = defender.get_effective_defense() if hasattr(defender, 'get_effective_defense') else defender.defense
+    def calculate_damage(attacker, defender, rng=None) -> int:
+        """ダメージ計算（rng 省略時はグローバルな random を使う）"""
+        base_damage = attacker.get_effective_attack()
+        defense = defender.get_effective_defense()
 
-        damage = base_damage - (defense / 2)
-        damage = int(damage * random.uniform(0.9, 1.1))
+        # GDScript と同じ整数除算
+        damage = base_damage - defense // 2
+        # random.uniform(0.9, 1.1) と同じ計算（メソッド呼び出しが random() の1回で済む）
+        damage = int(damage * (DAMAGE_ROLL_LOW + DAMAGE_ROLL_SPAN * (rng or random).random()))
 
         return max(1, damage)
 
     @staticmethod
-    def select_target_by_hit_rate(targets: List) -> Any:
-        """被弾率に基づいてターゲットを選択"""
+    def select_target_by_hit_rate(targets: List, rng=None) -> Any:
+        """被弾率に基づいてターゲットを選択（rng 省略時はグローバルな random を使う）"""
         total_weight = 0.0
         weights = []
 
@@ -146,7 +286,7 @@ class CombatSimulator:
             weights.append(hit_rate)
             total_weight += hit_rate
 
-        rand = random.random() * total_weight
+        rand = (rng or random).random() * total_weight
         cumulative = 0.0
 
         for i in range(len(targets)):
@@ -157,13 +297,63 @@ class CombatSimulator:
         return targets[0]
 
     @staticmethod
-    def simulate_turn(party: List, enemies: List) -> Dict:
-        """1ターンをシミュレート"""
+    def unit_name(unit) -> str:
+        """ログ用のユニット名"""
+        name = getattr(unit, "adventurer_name", None)
+        return name if name is not None else unit.name
+
+    @staticmethod
+    def _event_log(unit, event) -> Dict:
+        """戦術行動の結果をログ形式に変換"""
+        if event.kind == "damage":
+            entry = {
+                "attacker": CombatSimulator.unit_name(unit),
+                "target": CombatSimulator.unit_name(event.target),
+                "damage": event.amount,
+                "target_alive": event.target.is_alive
+            }
+        elif event.target is not None:
+            entry = {
+                "attacker": CombatSimulator.unit_name(unit),
+                "target": CombatSimulator.unit_name(event.target),
+                event.kind: event.amount
+            }
+        else:
+            entry = {"attacker": CombatSimulator.unit_name(unit), "action": event.kind}
+
+        if event.skill:
+            entry["skill"] = event.skill
+        return entry
+
+    @staticmethod
+    def simulate_turn(party: List, enemies: List, log_level: str = LOG_FULL,
+                      rng=None, tactics=None, recorder=None) -> Optional[Dict]:
+        """
+        1ターンをシミュレート
+
+        Args:
+            party: 冒険者リスト
+            enemies: 敵リスト
+            log_level: ログ詳細度 (LOG_NONE / LOG_SUMMARY / LOG_FULL)
+            rng: 乱数生成器（make_rng で作成。None はグローバルな random）
+            tactics: tactics.TacticsEngine（指定時は味方の行動を戦術で決定。None は最初の敵を通常攻撃）
+            recorder: 行動ごとに action(unit, kind, target, amount, skill)、ターンの終わりに
+                end_turn() を呼ぶ記録先（replay.ReplayWriter。log_level とは独立）
+
+        Returns:
+            LOG_FULL: 攻撃ごとのログと生存数
+            LOG_SUMMARY: 行動数・総ダメージと生存数（攻撃ごとのログなし）
+            LOG_NONE: None
+        """
         # 行動順を決定（速度順）
         all_units = [(u, "party") for u in party if u.is_alive] + [(u, "enemy") for u in enemies if u.is_alive]
         all_units.sort(key=lambda x: x[0].speed, reverse=True)
 
+        record_attacks = log_level == LOG_FULL
+        record_summary = log_level == LOG_SUMMARY
         turn_log = []
+        actions = 0
+        total_damage = 0
 
         for unit, side in all_units:
             if not unit.is_alive:
@@ -174,110 +364,404 @@ class CombatSimulator:
                 alive_enemies = [e for e in enemies if e.is_alive]
                 if not alive_enemies:
                     break
+
+                if tactics is not None:
+                    # 戦術に基づいて行動（スキル・回復・防御を含む）
+                    action = tactics.decide_action(unit, party, enemies, rng)
+                    for event in tactics.execute_action(action, party, enemies, rng):
+                        if recorder is not None:
+                            recorder.action(unit, event.kind, event.target, event.amount, event.skill)
+                        if record_attacks:
+                            turn_log.append(CombatSimulator._event_log(unit, event))
+                        elif record_summary:
+                            actions += 1
+                            if event.kind == "damage":
+                                total_damage += event.amount
+                    continue
+
                 target = alive_enemies[0]  # 最初の敵を攻撃
             else:
                 alive_party = [p for p in party if p.is_alive]
                 if not alive_party:
                     break
-                target = CombatSimulator.select_target_by_hit_rate(alive_party)
+                target = CombatSimulator.select_target_by_hit_rate(alive_party, rng)
 
             # 攻撃
-            damage = CombatSimulator.calculate_damage(unit, target)
+            damage = CombatSimulator.calculate_damage(unit, target, rng)
             actual_damage = target.take_damage(damage)
 
-            turn_log.append({
-                "attacker": unit.adventurer_name if hasattr(unit, 'adventurer_name') else unit.name,
-                "target": target.adventurer_name if hasattr(target, 'adventurer_name') else target.name,
-                "damage": actual_damage,
-                "target_alive": target.is_alive
-            })
+            if recorder is not None:
+                recorder.action(unit, "damage", target, actual_damage, None)
+            if record_attacks:
+                turn_log.append({
+                    "attacker": CombatSimulator.unit_name(unit),
+                    "target": CombatSimulator.unit_name(target),
+                    "damage": actual_damage,
+                    "target_alive": target.is_alive
+                })
+            elif record_summary:
+                actions += 1
+                total_damage += actual_damage
+
+        if tactics is not None:
+            tactics.end_turn()
+        if recorder is not None:
+            recorder.end_turn()
+
+        if log_level == LOG_NONE:
+            return None
+
+        party_alive = sum(1 for p in party if p.is_alive)
+        enemies_alive = sum(1 for e in enemies if e.is_alive)
+
+        if record_attacks:
+            return {
+                "log": turn_log,
+                "party_alive": party_alive,
+                "enemies_alive": enemies_alive
+            }
 
         return {
-            "log": turn_log,
-            "party_alive": sum(1 for p in party if p.is_alive),
-            "enemies_alive": sum(1 for e in enemies if e.is_alive)
+            "actions": actions,
+            "damage": total_damage,
+            "party_alive": party_alive,
+            "enemies_alive": enemies_alive
         }
 
     @staticmethod
-    def simulate_combat(party: List, enemies: List, max_turns: int = 100) -> Dict:
-        """戦闘全体をシミュレート"""
+    def simulate_combat(party: List, enemies: List, max_turns: int = 100,
+                        log_level: str = LOG_FULL, rng=None, tactics=None,
+                        recorder=None) -> Dict:
+        """
+        戦闘全体をシミュレート
+
+        Args:
+            party: 冒険者リスト
+            enemies: 敵リスト
+            max_turns: 最大ターン数
+            log_level: ログ詳細度。LOG_NONE の場合 "log" は空リスト
+            rng: 乱数生成器（None はグローバルな random）
+            tactics: tactics.TacticsEngine（None は全員が最初の敵を通常攻撃）
+            recorder: ターンごとの行動の記録先（simulate_turn を参照）
+
+        Returns:
+            {"victory": True/False/None(時間切れ), "turns": ターン数, "log": ターンごとの結果}
+        """
+        if log_level not in LOG_LEVELS:
+            raise ValueError(f"Unknown log level: {log_level}")
+
         turn = 0
         combat_log = []
+        keep_log = log_level != LOG_NONE
+
+        if tactics is not None:
+            tactics.start_combat()
 
         while turn < max_turns:
             turn += 1
 
-            party_alive = [p for p in party if p.is_alive]
-            enemies_alive = [e for e in enemies if e.is_alive]
-
             # 勝敗判定
-            if not party_alive:
+            if not any(p.is_alive for p in party):
                 return {"victory": False, "turns": turn, "log": combat_log}
-            if not enemies_alive:
+            if not any(e.is_alive for e in enemies):
                 return {"victory": True, "turns": turn, "log": combat_log}
 
             # ターン実行
-            turn_result = CombatSimulator.simulate_turn(party, enemies)
-            combat_log.append(turn_result)
+            turn_result = CombatSimulator.simulate_turn(party, enemies, log_level, rng, tactics, recorder)
+            if keep_log:
+                combat_log.append(turn_result)
 
         return {"victory": None, "turns": turn, "log": combat_log}
 
 
-def simulate_dungeon(party_composition: List[str], max_floors: int = 50) -> Dict:
+def create_party(party_composition: List[str]) -> List[MockAdventurer]:
     """
-    ダンジョン踏破をシミュレート
+    パーティを作成
 
     Args:
         party_composition: パーティ構成（職業名のリスト）
-        max_floors: 最大階層数
 
     Returns:
-        シミュレーション結果
+        隊列位置を設定済みの冒険者リスト
     """
-    # パーティを作成
     party = []
     for i, job_class in enumerate(party_composition):
         adventurer = MockAdventurer(f"{job_class}{i+1}", job_class)
         adventurer.formation_position = i
         party.append(adventurer)
+    return party
+
+
+def _enemy_lineup(floor: int) -> Tuple[MockEnemy, ...]:
+    """階層ごとの敵編成のひな形（create_enemies で複製して使う）"""
+    lineup = _ENEMY_LINEUPS.get(floor)
+    if lineup is None:
+        lineup = _ENEMY_LINEUPS[floor] = tuple(
+            MockEnemy.from_stats(enemy_type, stats)
+            for enemy_type, stats in floor_enemy_templates(floor)
+        )
+    return lineup
+
+
+def create_enemies(floor: int) -> List[MockEnemy]:
+    """
+    階層に応じた敵を生成
 
+    Args:
+        floor: 階層
+
+    Returns:
+        敵のリスト（EnemyGenerator と同じ編成。階層ごとのひな形の複製）
+    """
+    return [enemy.copy() for enemy in _enemy_lineup(floor)]
+
+
+def _run_dungeon(party: List[MockAdventurer], max_floors: int, enemies_for_floor,
+                 rng=None, tactics=None, floor_cache=None, recorder=None) -> int:
+    """
+    1回分のダンジョン踏破を実行し、到達階層を返す
+
+    Args:
+        party: 冒険者リスト（HPは呼び出し側で初期化済み）
+        max_floors: 最大階層数
+        enemies_for_floor: 階層を受け取り敵リストを返す関数
+        rng: 乱数生成器
+        tactics: tactics.TacticsEngine
+        floor_cache: floor_cache.FloorOutcomeCache（None はすべての階層をシミュレート）
+        recorder: 戦闘の記録先（階層ごとに begin_battle(floor, party, enemies) と
+            end_battle(result) を呼ぶ。キャッシュから結果を抽選した階層は記録されない）
+    """
     floor = 1
-    total_victories = 0
+    context = (tuple(p.job_class for p in party), tactics is not None)
 
     while floor <= max_floors:
-        # 敵を生成
-        scaling = 1.1 ** (floor - 1)
-
-        if floor <= 3:
-            enemies = [MockEnemy("Goblin", scaling) for _ in range(2)]
-        elif floor <= 7:
-            enemies = [MockEnemy("Goblin", scaling), MockEnemy("Orc", scaling), MockEnemy("Skeleton", scaling)]
-        elif floor <= 15:
-            enemies = [MockEnemy("Orc", scaling), MockEnemy("Dark Mage", scaling), MockEnemy("Skeleton", scaling)]
-        else:
-            enemies = [MockEnemy("Dragon", scaling), MockEnemy("Dark Mage", scaling), MockEnemy("Orc", scaling)]
+        key = None
+        if floor_cache is not None and floor_cache.applies_to(floor):
+            key = floor_cache.key(context, floor, party)
+            outcome = floor_cache.sample(key, rng)
+            if outcome is not None:
+                floor_cache.apply(outcome, party)
+                if not outcome.victory:
+                    break
+                floor += 1
+                continue
+            before = floor_cache.capture(party)
+
+        enemies = enemies_for_floor(floor)
+        if recorder is not None:
+            recorder.begin_battle(floor, party, enemies)
 
-        # 戦闘シミュレート
-        result = CombatSimulator.simulate_combat(party, enemies)
+        # 戦闘シミュレート（勝敗のみ使うのでログは作らない）
+        result = CombatSimulator.simulate_combat(party, enemies, log_level=LOG_NONE,
+                                                 rng=rng, tactics=tactics, recorder=recorder)
+        if recorder is not None:
+            recorder.end_battle(result)
+
+        if key is not None:
+            floor_cache.record(key, floor_cache.outcome_from(result["victory"], before, party))
 
         if result["victory"]:
-            total_victories += 1
             floor += 1
         else:
             # 全滅
             break
 
+    return floor - 1
+
+
+def simulate_dungeon(party_composition: List[str], max_floors: int = 50,
+                     seed: Optional[int] = None, rng=None, tactics=None,
+                     floor_cache=None, recorder=None) -> Dict:
+    """
+    ダンジョン踏破をシミュレート
+
+    Args:
+        party_composition: パーティ構成（職業名のリスト）
+        max_floors: 最大階層数
+        seed: 乱数シード（rng 未指定時に make_rng(seed) を使う）
+        rng: 乱数生成器（seed と rng がともに None ならグローバルな random）
+        tactics: tactics.TacticsEngine（None は全員が最初の敵を通常攻撃）
+        floor_cache: floor_cache.FloorOutcomeCache（階層結果のメモ化）
+        recorder: 戦闘の記録先（replay.ReplayWriter。floor_cache とは併用できない）
+
+    Returns:
+        シミュレーション結果
+    """
+    if recorder is not None and floor_cache is not None:
+        raise ValueError("recorder cannot be combined with floor_cache")
+    if rng is None and seed is not None:
+        rng = make_rng(seed)
+
+    party = create_party(party_composition)
+    max_floor_reached = _run_dungeon(party, max_floors, create_enemies, rng, tactics, floor_cache,
+                                     recorder)
+
     return {
         "party_composition": party_composition,
-        "max_floor_reached": floor - 1,
-        "total_victories": total_victories,
-        "final_scaling": 1.1 ** (floor - 2) if floor > 1 else 1.0
+        "max_floor_reached": max_floor_reached,
+        "total_victories": max_floor_reached,
+        "final_scaling": floor_scaling(max_floor_reached) if max_floor_reached > 0 else 1.0
     }
 
 
-def run_balance_tests():
+def summarize_floor_distribution(floors: List[int], max_floors: int,
+                                  confidence: float = 0.95) -> Dict:
+    """
+    到達階層の分布を集計
+
+    Args:
+        floors: 各試行の到達階層
+        max_floors: 最大階層数
+        confidence: 信頼区間の信頼水準
+
+    Returns:
+        平均・標準偏差・パーセンタイル・信頼区間・階層別生存率
+    """
+    runs = len(floors)
+    if runs == 0:
+        raise ValueError("floors must not be empty")
+
+    ordered = sorted(floors)
+    mean = statistics.fmean(ordered)
+    stdev = statistics.stdev(ordered) if runs > 1 else 0.0
+
+    # 平均の信頼区間（正規近似）
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    margin = z * stdev / math.sqrt(runs)
+
+    # パーセンタイル（最近傍順位法）
+    percentiles = {}
+    for p in (5, 25, 50, 75, 95):
+        rank = max(1, math.ceil(p / 100 * runs))
+        percentiles[f"p{p}"] = ordered[rank - 1]
+
+    # 階層別の到達回数 → 生存曲線（floor f をクリアした割合）
+    histogram = [0] * (max_floors + 1)
+    for f in ordered:
+        histogram[f] += 1
+
+    survival = []
+    remaining = runs
+    for f in range(1, max_floors + 1):
+        remaining -= histogram[f - 1]
+        survival.append(remaining / runs)
+
+    return {
+        "runs": runs,
+        "mean": mean,
+        "stdev": stdev,
+        "min": ordered[0],
+        "max": ordered[-1],
+        "percentiles": percentiles,
+        "confidence": confidence,
+        "confidence_interval": (mean - margin, mean + margin),
+        "histogram": histogram,
+        "survival": survival
+    }
+
+
+def _vectorized_available() -> bool:
+    """NumPy が利用可能で vectorized エンジンを使えるか"""
+    import vectorized_simulation
+    return vectorized_simulation.np is not None
+
+
+def simulate_dungeon_batch(party_composition: List[str], runs: int = 1000,
+                           seed: Optional[int] = None, max_floors: int = 50,
+                           tactics=None,
+                           floor_cache=None,
+                           select_runs: Optional[Callable[[int], bool]] = None,
+                           engine: str = ENGINE_AUTO) -> Dict:
+    """
+    同じパーティ構成でダンジョン踏破を繰り返しシミュレート（モンテカルロ）
+
+    既定 (engine="auto") では、NumPy があり tactics / floor_cache / select_runs を使わない場合に
+    vectorized_simulation.simulate_dungeon_vectorized で全試行を一括処理する
+    （4人・30階層の1万試行で1秒未満）。それ以外は scalar エンジンで1試行ずつ実行する。
+
+    scalar エンジンは冒険者と敵のオブジェクトを1度だけ生成し、試行ごとにHPを初期化して再利用する
+    （4人・30階層の1万試行で10〜20秒）。試行 i は derive_seed(seed, i) のサブストリームを使うため、
+    simulate_dungeon(party_composition, max_floors, seed=derive_seed(seed, i)) で単独に再現できる。
+    vectorized エンジンは同じシードで同じ分布統計になるが、試行ごとの単独再現はできない。
+
+    Args:
+        party_composition: パーティ構成（職業名のリスト）
+        runs: 試行回数
+        seed: マスターシード（Noneの場合はランダムに決め、結果の "seed" に記録する）
+        max_floors: 最大階層数
+        tactics: tactics.TacticsEngine（None は全員が最初の敵を通常攻撃）
+        floor_cache: floor_cache.FloorOutcomeCache（指定時は保存済みの階層結果を抽選して再利用する。
+            結果は統計的に近似となり、derive_seed による単独再現は成り立たない）
+        select_runs: 到達階層を受け取り、True を返した試行の {run, seed, floor} を
+            結果の "selected_runs" に記録する（replay.record_run で後から戦闘を記録する用）
+        engine: "auto" / "scalar" / "vectorized"（vectorized は tactics・floor_cache・select_runs 不可）
+
+    Returns:
+        到達階層の分布統計（summarize_floor_distribution の結果 + パーティ構成・シード・使ったエンジン）
+    """
+    if runs < 1:
+        raise ValueError("runs must be >= 1")
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine}")
+
+    scalar_only = tactics is not None or floor_cache is not None or select_runs is not None
+    if engine == ENGINE_AUTO:
+        engine = ENGINE_SCALAR if scalar_only or not _vectorized_available() else ENGINE_VECTORIZED
+    elif engine == ENGINE_VECTORIZED and scalar_only:
+        raise ValueError("the vectorized engine does not support tactics, floor_cache or select_runs")
+
+    if seed is None:
+        seed = secrets.randbits(64)
+
+    if engine == ENGINE_VECTORIZED:
+        from vectorized_simulation import simulate_dungeon_vectorized
+        result = simulate_dungeon_vectorized(party_composition, runs=runs, seed=seed,
+                                             max_floors=max_floors)
+        result["engine"] = engine
+        return result
+
+    party = create_party(party_composition)
+    enemy_cache: Dict[int, List[MockEnemy]] = {}
+
+    def enemies_for_floor(floor: int) -> List[MockEnemy]:
+        enemies = enemy_cache.get(floor)
+        if enemies is None:
+            enemies = enemy_cache[floor] = create_enemies(floor)
+        else:
+            for enemy in enemies:
+                enemy.reset()
+        return enemies
+
+    floors = []
+    selected = []
+    for run_index in range(runs):
+        for adventurer in party:
+            adventurer.reset()
+        run_seed = derive_seed(seed, run_index)
+        rng = make_rng(run_seed)
+        floor = _run_dungeon(party, max_floors, enemies_for_floor, rng, tactics, floor_cache)
+        floors.append(floor)
+        if select_runs is not None and select_runs(floor):
+            selected.append({"run": run_index, "seed": run_seed, "floor": floor})
+
+    result = summarize_floor_distribution(floors, max_floors)
+    result["party_composition"] = list(party_composition)
+    result["seed"] = seed
+    result["engine"] = engine
+    if select_runs is not None:
+        result["selected_runs"] = selected
+    if floor_cache is not None:
+        result["floor_cache"] = floor_cache.get_stats()
+    return result
+
+
+def run_balance_tests(runs: int = 1000, seed: Optional[int] = 0):
     """
     バランステストを実行
+
+    Args:
+        runs: 構成ごとの試行回数
+        seed: 乱数シード
     """
     print("\n" + "="*60)
     print("Guild Master Pennant - Balance Simulation")
@@ -295,14 +779,13 @@ def run_balance_tests():
     results = []
 
     for composition in test_compositions:
-        print(f"Testing: {', '.join(composition)}")
-        result = simulate_dungeon(composition, max_floors=30)
+        print(f"Testing: {', '.join(composition)} ({runs} runs)")
+        result = simulate_dungeon_batch(composition, runs=runs, seed=seed, max_floors=30)
         results.append(result)
-        print(f"  Max Floor: {result['max_floor_reached']}")
-        print(f"  Final Scaling: {result['final_scaling']:.2f}x\n")
+        _print_batch_result(result)
 
-    # 結果をランキング
-    results.sort(key=lambda x: x["max_floor_reached"], reverse=True)
+    # 結果をランキング（平均到達階層）
+    results.sort(key=lambda x: x["mean"], reverse=True)
 
     print("\n" + "="*60)
     print("RESULTS - Party Composition Ranking")
@@ -310,8 +793,16 @@ def run_balance_tests():
 
     for i, result in enumerate(results, 1):
         print(f"{i}. {', '.join(result['party_composition'])}")
-        print(f"   Max Floor: {result['max_floor_reached']}")
-        print(f"   Final Scaling: {result['final_scaling']:.2f}x\n")
+        _print_batch_result(result)
+
+
+def _print_batch_result(result: Dict) -> None:
+    """バッチ結果を表示"""
+    low, high = result["confidence_interval"]
+    percentiles = result["percentiles"]
+    print(f"   Mean Floor: {result['mean']:.2f} (95% CI {low:.2f} - {high:.2f})")
+    print(f"   Percentiles: p5={percentiles['p5']} p50={percentiles['p50']} p95={percentiles['p95']}")
+    print(f"   Best Run: {result['max']}  Final Scaling: {floor_scaling(max(1, result['max'])):.2f}x\n")
 
 
 if __name__ == "__main__":
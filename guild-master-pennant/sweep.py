@@ -0,0 +1,424 @@
+"""
+Sweep - パーティ構成の全探索
+
+5職業から4人を選ぶすべての組み合わせ × 隊列の並び順をマルチプロセスでシミュレートし、
+1つのランキング表にまとめる。チェックポイントファイルにより中断からの再開が可能。
+
+使い方:
+    python sweep.py --runs 1000 --seed 42 --workers 32 --checkpoint sweep.jsonl
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations_with_replacement, permutations
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from simulation import (
+    ENGINE_SCALAR,
+    ENGINE_VECTORIZED,
+    JOB_STATS,
+    derive_seed,
+    simulate_dungeon_batch
+)
+
+JOB_CLASSES = tuple(JOB_STATS)
+PARTY_SIZE = 4
+# スイープは隊列ごとの結果をシードで再現できるよう、エンジンを明示的に選ぶ（auto なし）
+SWEEP_ENGINES = (ENGINE_SCALAR, ENGINE_VECTORIZED)
+
+
+def enumerate_compositions(jobs: Sequence[str] = JOB_CLASSES,
+                           party_size: int = PARTY_SIZE) -> List[Tuple[str, ...]]:
+    """
+    職業の組み合わせ（重複あり・順序なし）を列挙
+
+    Returns:
+        ソート済みの職業タプルのリスト
+    """
+    return list(combinations_with_replacement(jobs, party_size))
+
+
+def enumerate_formations(composition: Sequence[str]) -> List[Tuple[str, ...]]:
+    """
+    組み合わせの隊列（並び順）を重複なしで列挙
+
+    Returns:
+        隊列位置順の職業タプルのリスト
+    """
+    return sorted(set(permutations(composition)))
+
+
+def enumerate_sweep(jobs: Sequence[str] = JOB_CLASSES,
+                    party_size: int = PARTY_SIZE) -> List[Tuple[str, ...]]:
+    """探索対象の隊列をすべて列挙"""
+    formations = []
+    for composition in enumerate_compositions(jobs, party_size):
+        formations.extend(enumerate_formations(composition))
+    return formations
+
+
+def task_key(formation: Sequence[str]) -> str:
+    """隊列のキー（チェックポイント用）"""
+    return ",".join(formation)
+
+
+def task_seed(master_seed: int, formation: Sequence[str]) -> int:
+    """
+    マスターシードと隊列からタスク固有のシードを導出
+
+    ワーカー数やチャンク分割に依存しないため、同じマスターシードなら常に同じ結果になる。
+    """
+    return derive_seed(master_seed, task_key(formation))
+
+
+def _chunked(items: List, size: int) -> Iterable[List]:
+    """リストを指定サイズに分割"""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def replay_path(replay_dir: str, formation: Sequence[str]) -> str:
+    """隊列のリプレイファイルのパス"""
+    return os.path.join(replay_dir, task_key(formation) + ".gmpr")
+
+
+def run_chunk(formations: List[Tuple[str, ...]], runs: int, max_floors: int,
+              master_seed: int, engine: str = "scalar", use_tactics: bool = False,
+              replay_dir: Optional[str] = None, replay_min_floor: int = 1) -> List[Dict]:
+    """
+    ワーカープロセスで隊列のチャンクをシミュレート
+
+    replay_dir を指定すると、replay_min_floor 階以上まで進んで全滅した試行を
+    シードから再実行し、隊列ごとのリプレイファイル（replay.py の形式）に記録する。
+
+    Returns:
+        隊列ごとの結果（チェックポイントにそのまま書き出せる形式）
+    """
+    validate_sweep_options(engine, use_tactics, replay_dir)
+    options = {}
+    if engine == "vectorized":
+        from vectorized_simulation import simulate_dungeon_vectorized as simulate
+    else:
+        simulate = simulate_dungeon_batch
+        options["engine"] = "scalar"
+        if use_tactics:
+            from tactics import TacticsEngine
+            options["tactics"] = TacticsEngine()
+        if replay_dir:
+            # 全滅した深い試行（最大階層まで到達した試行は含めない）
+            options["select_runs"] = lambda floor: replay_min_floor <= floor < max_floors
+
+    results = []
+    for formation in formations:
+        seed = task_seed(master_seed, formation)
+        stats = simulate(list(formation), runs=runs, seed=seed, max_floors=max_floors, **options)
+        record = {
+            "key": task_key(formation),
+            "formation": list(formation),
+            "composition": sorted(formation),
+            "seed": seed,
+            "runs": stats["runs"],
+            "mean": stats["mean"],
+            "stdev": stats["stdev"],
+            "confidence_interval": list(stats["confidence_interval"]),
+            "percentiles": stats["percentiles"],
+            "max": stats["max"]
+        }
+        if replay_dir:
+            record["replays"] = _record_replays(replay_dir, formation, stats, max_floors,
+                                                options.get("tactics"))
+        results.append(record)
+    return results
+
+
+def _record_replays(replay_dir: str, formation: Sequence[str], stats: Dict,
+                    max_floors: int, tactics=None) -> int:
+    """selected_runs の試行をシードから再実行してリプレイファイルに書き出す"""
+    from replay import ReplayWriter, record_run
+
+    selected = stats["selected_runs"]
+    if not selected:
+        return 0
+    with ReplayWriter(replay_path(replay_dir, formation)) as writer:
+        for run in selected:
+            record_run(writer, formation, run["seed"], max_floors, tactics,
+                       meta={"key": task_key(formation), "run": run["run"]})
+    return len(selected)
+
+
+def validate_sweep_options(engine: str, use_tactics: bool = False,
+                           replay_dir: Optional[str] = None) -> None:
+    """
+    エンジンとオプションの組み合わせを確認
+
+    Raises:
+        ValueError: 未知のエンジン、または vectorized で戦術・リプレイを指定した場合
+    """
+    if engine not in SWEEP_ENGINES:
+        raise ValueError(f"unknown engine: {engine!r} (expected one of {', '.join(SWEEP_ENGINES)})")
+    if engine == "vectorized":
+        if use_tactics:
+            raise ValueError("the vectorized engine does not support tactics")
+        if replay_dir:
+            raise ValueError("the vectorized engine does not support replays")
+
+
+def sweep_config(runs: int, seed: int, max_floors: int, engine: str,
+                 use_tactics: bool, replay_dir: Optional[str] = None,
+                 replay_min_floor: int = 1) -> Dict:
+    """
+    結果に影響するスイープの設定（チェックポイントのヘッダーに記録する）
+
+    リプレイを書き出さない場合、replay_min_floor は結果に影響しないので記録しない。
+    """
+    return {"runs": runs, "seed": seed, "max_floors": max_floors,
+            "engine": engine, "use_tactics": use_tactics,
+            "replay_dir": replay_dir or None,
+            "replay_min_floor": replay_min_floor if replay_dir else None}
+
+
+class CheckpointError(ValueError):
+    """チェックポイントファイルが壊れている、または設定が一致しない"""
+
+
+def _read_checkpoint(path: str) -> Tuple[Optional[Dict], Dict[str, Dict], int]:
+    """
+    チェックポイントファイルを読む
+
+    Returns:
+        (ヘッダーの設定, {キー: 結果}, 有効な部分のバイト数)。
+        書き込み途中で中断された最終行（改行で終わっていない行）だけは無視し、
+        有効な部分のバイト数に含めない
+
+    Raises:
+        CheckpointError: 最終行以外に読めない行がある場合
+    """
+    config = None
+    completed = {}
+    valid_bytes = 0
+    with open(path, "rb") as f:
+        for number, line in enumerate(f, 1):
+            try:
+                record = json.loads(line)
+                if number == 1:
+                    if record.get("type") != "header":
+                        raise CheckpointError(f"{path}: missing sweep config header")
+                    config = record["config"]
+                else:
+                    completed[record["key"]] = record
+            except (json.JSONDecodeError, UnicodeDecodeError, KeyError, AttributeError) as e:
+                if not line.endswith(b"\n"):
+                    break
+                raise CheckpointError(f"{path}:{number}: corrupt checkpoint record") from e
+            valid_bytes += len(line)
+    return config, completed, valid_bytes
+
+
+def load_checkpoint(path: Optional[str], config: Optional[Dict] = None) -> Dict[str, Dict]:
+    """
+    チェックポイントファイルから完了済みの結果を読み込む
+
+    途中で書き込みが中断された最終行は無視する。
+
+    Args:
+        path: チェックポイントファイル（None や存在しない場合は空）
+        config: sweep_config() の設定（指定時はヘッダーと一致しなければエラー）
+
+    Returns:
+        {キー: 結果}
+
+    Raises:
+        CheckpointError: 最終行以外が壊れている、または設定が一致しない場合
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    saved, completed, _ = _read_checkpoint(path)
+    if config is not None and saved is not None and saved != config:
+        raise CheckpointError(
+            f"{path} was written by a sweep with different settings: {saved} (now {config})")
+    return completed
+
+
+def run_sweep(runs: int = 1000, seed: int = 0, max_floors: int = 30,
+              workers: Optional[int] = None, chunk_size: int = 4,
+              checkpoint: Optional[str] = None, engine: str = "scalar",
+              use_tactics: bool = False, jobs: Sequence[str] = JOB_CLASSES,
+              replay_dir: Optional[str] = None, replay_min_floor: int = 1) -> List[Dict]:
+    """
+    全構成をスイープしてランキングを返す
+
+    Args:
+        runs: 隊列ごとの試行回数
+        seed: マスターシード
+        max_floors: 最大階層数
+        workers: ワーカープロセス数（None=CPU数）
+        chunk_size: 1タスクあたりの隊列数
+        checkpoint: チェックポイントファイル（JSONL、指定時は再開可能）。1行目に結果に影響する
+            設定（リプレイの設定を含む）を記録し、設定の異なるスイープでは再開しない（CheckpointError）
+        engine: "scalar" (simulation) または "vectorized" (NumPy)
+        use_tactics: 味方の行動を戦術エンジン (tactics.py) で決定する（scalar のみ）
+        jobs: 対象の職業
+        replay_dir: 全滅した深い試行のリプレイを書き出すディレクトリ（scalar のみ）
+        replay_min_floor: リプレイを残す試行の最低到達階層
+
+    Returns:
+        平均到達階層の降順に並んだ結果
+
+    Raises:
+        ValueError: エンジンとオプションの組み合わせが不正な場合（validate_sweep_options）
+        CheckpointError: チェックポイントが壊れている、または設定が一致しない場合
+    """
+    # ワーカープロセスやチェックポイントを作る前に組み合わせを確認する
+    validate_sweep_options(engine, use_tactics, replay_dir)
+    formations = enumerate_sweep(jobs)
+    config = sweep_config(runs, seed, max_floors, engine, use_tactics,
+                          replay_dir, replay_min_floor)
+    completed = load_checkpoint(checkpoint, config)
+    pending = [f for f in formations if task_key(f) not in completed]
+
+    if pending and replay_dir:
+        os.makedirs(replay_dir, exist_ok=True)
+    if pending:
+        out = _open_checkpoint(checkpoint, config) if checkpoint else None
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(run_chunk, chunk, runs, max_floors, seed, engine, use_tactics,
+                                    replay_dir, replay_min_floor)
+                    for chunk in _chunked(pending, chunk_size)
+                ]
+                for future in as_completed(futures):
+                    for record in future.result():
+                        completed[record["key"]] = record
+                        if out:
+                            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    if out:
+                        out.flush()
+        finally:
+            if out:
+                out.close()
+
+    results = [completed[task_key(f)] for f in formations if task_key(f) in completed]
+    return rank_results(results)
+
+
+def _open_checkpoint(path: str, config: Dict):
+    """
+    チェックポイントファイルを追記用に開く
+
+    新しいファイルにはヘッダーを書き、中断された最終行があれば切り詰めてから追記する。
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        out = open(path, "w", encoding="utf-8")
+        out.write(json.dumps({"type": "header", "config": config}, ensure_ascii=False) + "\n")
+        out.flush()
+        return out
+    _, _, valid_bytes = _read_checkpoint(path)
+    if valid_bytes == 0:
+        # ヘッダーの書き込み中に中断された
+        os.remove(path)
+        return _open_checkpoint(path, config)
+    with open(path, "r+b") as f:
+        f.truncate(valid_bytes)
+    return open(path, "a", encoding="utf-8")
+
+
+def rank_results(results: List[Dict]) -> List[Dict]:
+    """平均到達階層（同値は隊列名）でランキング"""
+    return sorted(results, key=lambda r: (-r["mean"], r["key"]))
+
+
+def summarize_by_composition(results: List[Dict]) -> List[Dict]:
+    """
+    組み合わせごとに最良の隊列をまとめる
+
+    Returns:
+        組み合わせごとの {composition, best_formation, best_mean, worst_mean}
+    """
+    groups: Dict[Tuple[str, ...], List[Dict]] = {}
+    for record in results:
+        groups.setdefault(tuple(record["composition"]), []).append(record)
+
+    summary = []
+    for composition, records in groups.items():
+        best = max(records, key=lambda r: r["mean"])
+        worst = min(records, key=lambda r: r["mean"])
+        summary.append({
+            "composition": list(composition),
+            "formations": len(records),
+            "best_formation": best["formation"],
+            "best_mean": best["mean"],
+            "worst_mean": worst["mean"]
+        })
+    summary.sort(key=lambda s: -s["best_mean"])
+    return summary
+
+
+def print_ranking(results: List[Dict], top: int = 20) -> None:
+    """ランキング表を表示"""
+    print("\n" + "="*60)
+    print(f"SWEEP RESULTS - {len(results)} formations")
+    print("="*60 + "\n")
+
+    for i, record in enumerate(results[:top], 1):
+        low, high = record["confidence_interval"]
+        print(f"{i:3d}. {', '.join(record['formation'])}")
+        print(f"     Mean Floor: {record['mean']:.2f} (95% CI {low:.2f} - {high:.2f})  "
+              f"p50={record['percentiles']['p50']}  Best={record['max']}")
+
+
+def main():
+    """
+    メイン関数
+    """
+    parser = argparse.ArgumentParser(description="Party composition sweep")
+    parser.add_argument("--runs", type=int, default=1000, help="runs per formation")
+    parser.add_argument("--seed", type=int, default=0, help="master seed")
+    parser.add_argument("--max-floors", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=4, help="formations per work unit")
+    parser.add_argument("--checkpoint", default=None, help="JSONL checkpoint file for resuming")
+    parser.add_argument("--engine", choices=SWEEP_ENGINES, default="scalar")
+    parser.add_argument("--tactics", action="store_true", help="use the game tactics/skill AI for the party")
+    parser.add_argument("--replay-dir", default=None,
+                        help="write replays of failed deep runs to this directory")
+    parser.add_argument("--replay-min-floor", type=int, default=1,
+                        help="minimum floor reached for a failed run to be replayed")
+    parser.add_argument("--top", type=int, default=20, help="rows to print")
+    parser.add_argument("--output", default=None, help="write ranked results as JSON")
+    args = parser.parse_args()
+    try:
+        validate_sweep_options(args.engine, args.tactics, args.replay_dir)
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        results = run_sweep(
+            runs=args.runs,
+            seed=args.seed,
+            max_floors=args.max_floors,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            checkpoint=args.checkpoint,
+            engine=args.engine,
+            use_tactics=args.tactics,
+            replay_dir=args.replay_dir,
+            replay_min_floor=args.replay_min_floor
+        )
+    except CheckpointError as e:
+        parser.error(str(e))
+    print_ranking(results, args.top)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "formations": results,
+                "compositions": summarize_by_composition(results)
+            }, f, ensure_ascii=False, indent=2)
+        print(f"\n📝 Exported results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+"""
+Tactics - 戦術・スキルシステム（Python版）
+
+game/scripts の TacticsSystem.gd / TacticsCondition.gd / SkillSystem.gd を
+シミュレーション用に移植したもの。スキルと職業の所持スキルは game_data（balance.json）から読む。
+戦術ルールは優先度順に並べた決定テーブルへ1度だけコンパイルし、行動決定のたびにソートし直さない。
+"""
+
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+import random
+
+from game_data import JOB_SKILLS, SKILL_DATA
+from simulation import DAMAGE_ROLL_LOW, DAMAGE_ROLL_SPAN
+
+
+def get_skill(skill_name: str) -> Optional[Mapping[str, Any]]:
+    """スキルデータを取得"""
+    return SKILL_DATA.get(skill_name)
+
+
+# =============================================================
+# 戦術条件 (TacticsCondition.gd)
+# =============================================================
+
+def count_alive(units: Sequence) -> int:
+    """生存ユニット数を数える"""
+    return sum(1 for unit in units if unit.is_alive)
+
+
+def hp_below_percent(unit, percent: float) -> bool:
+    """HP が指定パーセント以下"""
+    return unit.current_hp < unit.max_hp * percent
+
+
+def hp_above_percent(unit, percent: float) -> bool:
+    """HP が指定パーセント以上"""
+    return unit.current_hp >= unit.max_hp * percent
+
+
+def hp_below_value(unit, value: int) -> bool:
+    """HP が指定値以下"""
+    return unit.current_hp <= value
+
+
+def enemy_count_above(enemies: Sequence, count: int) -> bool:
+    """生存している敵が指定数以上"""
+    return count_alive(enemies) >= count
+
+
+def enemy_count_below(enemies: Sequence, count: int) -> bool:
+    """生存している敵が指定数以下"""
+    return count_alive(enemies) <= count
+
+
+def has_enemy_type(enemies: Sequence, enemy_type: str) -> bool:
+    """指定タイプの敵がいる"""
+    return any(e.is_alive and getattr(e, "type", None) == enemy_type for e in enemies)
+
+
+def has_injured_ally(party: Sequence, threshold: float = 0.8) -> bool:
+    """負傷した味方がいる"""
+    return any(m.is_alive and m.current_hp < m.max_hp * threshold for m in party)
+
+
+def ally_count_below(party: Sequence, count: int) -> bool:
+    """生存している味方が指定数以下"""
+    return count_alive(party) <= count
+
+
+def is_in_front_row(unit) -> bool:
+    """前列にいる"""
+    return unit.formation_position < 3
+
+
+def is_in_back_row(unit) -> bool:
+    """後列にいる"""
+    return not is_in_front_row(unit)
+
+
+def can_use_magic(unit) -> bool:
+    """魔法が使える"""
+    return unit.magic > 0
+
+
+def emergency_condition(unit, party: Sequence) -> bool:
+    """緊急状態（HPが30%以下または味方が2人以下）"""
+    return hp_below_percent(unit, 0.3) or ally_count_below(party, 2)
+
+
+def offensive_condition(unit, enemies: Sequence) -> bool:
+    """攻撃的状態（HPが50%以上かつ敵が2体以上）"""
+    return hp_above_percent(unit, 0.5) and enemy_count_above(enemies, 2)
+
+
+def defensive_condition(unit, party: Sequence) -> bool:
+    """防御的状態（HPが50%以下または負傷した味方がいる）"""
+    return hp_below_percent(unit, 0.5) or has_injured_ally(party, 0.7)
+
+
+# =============================================================
+# 戦術ルール (TacticsSystem.gd)
+# =============================================================
+
+# 条件: (unit, party, enemies) -> bool
+Condition = Callable[[Any, Sequence, Sequence], bool]
+
+
+class TacticRule(NamedTuple):
+    """戦術ルール"""
+    priority: int
+    condition: Condition
+    action_type: str = "attack"
+    action_params: Mapping[str, Any] = MappingProxyType({})
+
+
+class CompiledRule(NamedTuple):
+    """コンパイル済みルール（スキルとターゲット選択を解決済み）"""
+    condition: Condition
+    action_type: str
+    target_selection: str
+    skill: Optional[Mapping[str, Any]]
+
+
+def _always(unit, party, enemies) -> bool:
+    return True
+
+
+# 職業別デフォルト戦術 (TacticsSystem._set_default_tactics)
+DEFAULT_TACTICS: Mapping[str, Tuple[TacticRule, ...]] = MappingProxyType({
+    # 戦士: HPが低い敵を優先攻撃
+    "Warrior": (
+        TacticRule(10, _always, "attack", MappingProxyType({"target_selection": "lowest_hp"})),
+    ),
+    # 魔法使い: HPが50%以下なら防御、それ以外は魔法攻撃
+    "Mage": (
+        TacticRule(20, lambda u, p, e: hp_below_percent(u, 0.5), "defend"),
+        TacticRule(10, lambda u, p, e: can_use_magic(u), "skill",
+                   MappingProxyType({"skill_name": "ファイア"})),
+    ),
+    # 僧侶: 味方のHPが50%以下なら回復、それ以外は攻撃
+    "Priest": (
+        TacticRule(30, lambda u, p, e: has_injured_ally(p, 0.5), "skill",
+                   MappingProxyType({"skill_name": "ヒール", "target_selection": "lowest_hp_ally"})),
+        TacticRule(10, _always, "attack"),
+    ),
+    # 盗賊: 敵が2体以上なら範囲攻撃、それ以外は通常攻撃
+    "Thief": (
+        TacticRule(20, lambda u, p, e: enemy_count_above(e, 2), "skill",
+                   MappingProxyType({"skill_name": "乱れ撃ち"})),
+        TacticRule(10, _always, "attack"),
+    ),
+    # 弓使い: 常に通常攻撃
+    "Archer": (
+        TacticRule(10, _always, "attack"),
+    ),
+})
+
+
+def compile_rules(rules: Sequence[TacticRule], skills: Sequence[str] = ()) -> Tuple[CompiledRule, ...]:
+    """
+    戦術ルールを決定テーブルにコンパイル
+
+    優先度の降順（同優先度は定義順）に並べ、スキル名を解決する。
+    所持していないスキルのルールは decide_action と同じく「ランダムな敵への攻撃」になる。
+    """
+    table = []
+    for rule in sorted(rules, key=lambda r: r.priority, reverse=True):
+        params = rule.action_params
+        action_type = rule.action_type
+        target_selection = params.get("target_selection", "random")
+        skill = None
+
+        if action_type == "skill":
+            skill_name = params.get("skill_name", "")
+            skill = get_skill(skill_name) if skill_name in skills else None
+            if skill is None:
+                action_type = "attack"
+                target_selection = "random"
+
+        table.append(CompiledRule(rule.condition, action_type, target_selection, skill))
+    return tuple(table)
+
+
+class Action(NamedTuple):
+    """決定された行動"""
+    type: str
+    actor: Any
+    target: Any = None
+    skill: Optional[Mapping[str, Any]] = None
+
+
+class ActionEvent(NamedTuple):
+    """行動の結果（対象ごと）"""
+    target: Any
+    kind: str        # "damage" / "healing" / "buff" / "defend" / "wait"
+    amount: int = 0
+    skill: Optional[str] = None
+
+
+class TacticsEngine:
+    """
+    戦術による行動決定とスキル実行
+
+    決定テーブルは職業（と所持スキル）ごとに1度だけコンパイルしてキャッシュする。
+    バフの状態は戦闘ごとに start_combat() でクリアする。
+    """
+
+    def __init__(self, tactics: Optional[Mapping[str, Sequence[TacticRule]]] = None,
+                 job_skills: Optional[Mapping[str, Sequence[str]]] = None):
+        self.tactics = tactics if tactics is not None else DEFAULT_TACTICS
+        self.job_skills = job_skills if job_skills is not None else JOB_SKILLS
+        self._tables: Dict[Tuple[str, Tuple[str, ...]], Tuple[CompiledRule, ...]] = {}
+        self._unit_tables: Dict[str, Tuple[CompiledRule, ...]] = {}
+        self.active_buffs: Dict[int, List[List]] = {}  # {id(unit): [[effect, multiplier, remaining], ...]}
+
+    # ---------------------------------------------------------
+    # 戦術
+    # ---------------------------------------------------------
+
+    def skills_for(self, unit) -> Tuple[str, ...]:
+        """ユニットの所持スキル（unit.skills がなければ職業の既定）"""
+        skills = getattr(unit, "skills", None)
+        if skills is None:
+            skills = self.job_skills.get(getattr(unit, "job_class", ""), ())
+        return tuple(skills)
+
+    def set_unit_tactics(self, unit, rules: Sequence[TacticRule]) -> None:
+        """ユニットに個別の戦術を設定（設定時にコンパイル）"""
+        self._unit_tables[unit.adventurer_name] = compile_rules(rules, self.skills_for(unit))
+
+    def decision_table(self, unit) -> Tuple[CompiledRule, ...]:
+        """ユニットの決定テーブルを取得"""
+        table = self._unit_tables.get(unit.adventurer_name)
+        if table is not None:
+            return table
+
+        job = unit.job_class
+        skills = self.skills_for(unit)
+        key = (job, skills)
+        table = self._tables.get(key)
+        if table is None:
+            table = self._tables[key] = compile_rules(self.tactics.get(job, ()), skills)
+        return table
+
+    def decide_action(self, unit, party: Sequence, enemies: Sequence, rng=None) -> Action:
+        """戦術に基づいて行動を決定"""
+        for rule in self.decision_table(unit):
+            if rule.condition(unit, party, enemies):
+                return self._create_action(unit, rule, party, enemies, rng)
+
+        # どの条件も満たさない場合は待機
+        return Action("wait", unit)
+
+    def _create_action(self, unit, rule: CompiledRule, party: Sequence,
+                       enemies: Sequence, rng) -> Action:
+        """ルールから行動を作成"""
+        if rule.action_type == "attack":
+            return Action("attack", unit, self.select_target(enemies, rule.target_selection, rng))
+
+        if rule.action_type == "skill":
+            if rule.target_selection == "lowest_hp_ally":
+                target = self.select_target(party, "lowest_hp", rng)
+            else:
+                target = self.select_target(enemies, rule.target_selection, rng)
+            return Action("skill", unit, target, rule.skill)
+
+        return Action(rule.action_type, unit)
+
+    @staticmethod
+    def select_target(targets: Sequence, selection_method: str, rng=None):
+        """ターゲットを選択"""
+        alive_targets = [t for t in targets if t.is_alive]
+        if not alive_targets:
+            return None
+
+        if selection_method == "lowest_hp":
+            return min(alive_targets, key=lambda t: t.current_hp)
+        if selection_method == "highest_hp":
+            return max(alive_targets, key=lambda t: t.current_hp)
+        if selection_method == "random":
+            return alive_targets[int((rng or random).random() * len(alive_targets))]
+        return alive_targets[0]
+
+    # ---------------------------------------------------------
+    # 行動の実行 (CombatManager._execute_action / SkillSystem)
+    # ---------------------------------------------------------
+
+    def execute_action(self, action: Action, party: Sequence, enemies: Sequence,
+                       rng=None) -> List[ActionEvent]:
+        """行動を実行し、対象ごとの結果を返す"""
+        if action.type == "attack":
+            if action.target is None:
+                return []
+            damage = self.physical_damage(action.actor, action.target, 1.0, rng)
+            return [ActionEvent(action.target, "damage", action.target.take_damage(damage))]
+
+        if action.type == "skill":
+            return self.execute_skill(action.actor, action.skill, action.target, party, enemies, rng)
+
+        return [ActionEvent(None, action.type)]
+
+    def execute_skill(self, caster, skill: Mapping[str, Any], target, party: Sequence,
+                      enemies: Sequence, rng=None) -> List[ActionEvent]:
+        """
+        スキルを実行 (SkillSystem.execute_skill)
+
+        ゲーム本体と同じく、スキルの "target"（"all" / "all_allies"）によらず
+        選択された1体だけが対象になる。
+        """
+        if target is None:
+            return []
+        skill_type = skill["type"]
+        name = skill["name"]
+
+        if skill_type == "attack":
+            damage = self.physical_damage(caster, target, skill["multiplier"], rng)
+            # パッシブスキル: 会心の一撃
+            if self._check_passive(caster, "critical", rng):
+                damage = int(damage * 2.0)
+            return [ActionEvent(target, "damage", target.take_damage(damage), name)]
+        if skill_type == "magic_attack":
+            damage = self.magic_damage(caster, target, skill["multiplier"], rng)
+            return [ActionEvent(target, "damage", target.take_damage(damage), name)]
+        if skill_type == "heal":
+            healing = self.healing(caster, skill["multiplier"], rng)
+            return [ActionEvent(target, "healing", target.heal(healing), name)]
+        if skill_type == "buff":
+            self.active_buffs.setdefault(id(target), []).append(
+                [skill["effect"], skill["multiplier"], skill["duration"]]
+            )
+            return [ActionEvent(target, "buff", 0, name)]
+        return []
+
+    def physical_damage(self, attacker, defender, multiplier: float = 1.0, rng=None) -> int:
+        """
+        物理ダメージを計算 (CombatAction.calculate_physical_damage + バフ倍率)
+
+        防御力の1/2は GDScript と同じ整数除算。倍率1.0・バフなしの通常攻撃は
+        CombatSimulator.calculate_damage と同じ結果になる。
+        """
+        attack_power = attacker.get_effective_attack() * self.get_buff_multiplier(attacker, "attack")
+        defense_power = defender.get_effective_defense() * self.get_buff_multiplier(defender, "defense")
+
+        base_damage = attack_power * multiplier - defense_power // 2
+        return max(1, int(base_damage * (DAMAGE_ROLL_LOW + DAMAGE_ROLL_SPAN * (rng or random).random())))
+
+    @staticmethod
+    def magic_damage(attacker, defender, multiplier: float = 1.0, rng=None) -> int:
+        """魔法ダメージを計算（魔法防御は物理防御の1/3。GDScript と同じ整数除算）"""
+        base_damage = attacker.magic * multiplier - defender.defense // 3
+        return max(1, int(base_damage * (DAMAGE_ROLL_LOW + DAMAGE_ROLL_SPAN * (rng or random).random())))
+
+    @staticmethod
+    def healing(caster, multiplier: float = 1.0, rng=None) -> int:
+        """回復量を計算"""
+        return max(1, int(caster.magic * multiplier * (rng or random).uniform(0.95, 1.05)))
+
+    @staticmethod
+    def _check_passive(unit, passive_type: str, rng=None) -> bool:
+        """パッシブスキルの発動判定"""
+        for passive_name in getattr(unit, "passive_skills", None) or ():
+            passive = SKILL_DATA.get(passive_name)
+            if passive and passive.get("effect") == passive_type:
+                return (rng or random).random() < passive["chance"]
+        return False
+
+    # ---------------------------------------------------------
+    # バフ管理 (SkillSystem)
+    # ---------------------------------------------------------
+
+    def get_buff_multiplier(self, unit, stat_type: str) -> float:
+        """バフによる能力値倍率を取得"""
+        buffs = self.active_buffs.get(id(unit))
+        if not buffs:
+            return 1.0
+
+        multiplier = 1.0
+        for effect, value, _ in buffs:
+            if effect == stat_type:
+                multiplier *= value
+        return multiplier
+
+    def update_buffs_turn(self) -> None:
+        """バフのターン経過処理"""
+        for unit_id in list(self.active_buffs):
+            remaining = []
+            for buff in self.active_buffs[unit_id]:
+                buff[2] -= 1
+                if buff[2] > 0:
+                    remaining.append(buff)
+            if remaining:
+                self.active_buffs[unit_id] = remaining
+            else:
+                del self.active_buffs[unit_id]
+
+    def start_combat(self) -> None:
+        """戦闘開始時の初期化（すべてのバフをクリア）"""
+        self.active_buffs.clear()
+
+    def end_turn(self) -> None:
+        """ターン終了時の処理"""
+        if self.active_buffs:
+            self.update_buffs_turn()
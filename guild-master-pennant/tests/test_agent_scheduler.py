@@ -0,0 +1,217 @@
+"""
+agent_scheduler のテスト（メッセージでの起床・同時実行数の上限・停止と購読解除）
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from agent_scheduler import AgentScheduler
+from blackboard import Blackboard
+
+
+class _Concurrency:
+    """同時に実行中の run_once() の数と最大値を記録"""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def enter(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def leave(self):
+        with self._lock:
+            self.current -= 1
+
+
+class _SyncAgent:
+    def __init__(self, name, concurrency=None, delay=0.0):
+        self.name = name
+        self.concurrency = concurrency
+        self.delay = delay
+        self.runs = 0
+        self.started = False
+        self.stopped = False
+
+    def start(self):
+        self.started = True
+
+    def run_once(self):
+        if self.concurrency:
+            self.concurrency.enter()
+        try:
+            time.sleep(self.delay)
+            self.runs += 1
+        finally:
+            if self.concurrency:
+                self.concurrency.leave()
+
+    def stop(self):
+        self.stopped = True
+
+
+class _AsyncAgent(_SyncAgent):
+    async def run_once(self):
+        self.concurrency.enter()
+        try:
+            await asyncio.sleep(self.delay)
+            self.runs += 1
+        finally:
+            self.concurrency.leave()
+
+
+async def _wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+def _run_with(scheduler, body):
+    """スケジューラーを動かしながら body() を実行し、終わったら止める"""
+    async def main():
+        runner = asyncio.create_task(scheduler.run_async())
+        try:
+            await body()
+        finally:
+            scheduler.stop()
+            await asyncio.wait_for(runner, 5.0)
+    asyncio.run(main())
+
+
+def test_agents_wake_only_for_their_messages():
+    board = Blackboard()
+    alice, bob = _SyncAgent("alice"), _SyncAgent("bob")
+    scheduler = AgentScheduler(board, [alice, bob], wake_on_broadcast=False)
+
+    async def body():
+        # 最初の1回はメッセージなしで実行される
+        await _wait_until(lambda: alice.runs == 1 and bob.runs == 1)
+        board.post_message("bob", "alice", "ping")
+        await _wait_until(lambda: alice.runs == 2)
+        board.post_message("alice", "all", "broadcast")
+        await asyncio.sleep(0.1)
+        assert (alice.runs, bob.runs) == (2, 1)
+
+    try:
+        _run_with(scheduler, body)
+        assert scheduler.get_stats()["alice"]["runs"] == 2
+    finally:
+        board.close()
+
+
+def test_broadcast_wakes_every_agent():
+    board = Blackboard()
+    agents = [_SyncAgent(f"agent{i}") for i in range(3)]
+    scheduler = AgentScheduler(board, agents)
+
+    async def body():
+        await _wait_until(lambda: all(a.runs == 1 for a in agents))
+        board.post_message("system", "all", "go")
+        await _wait_until(lambda: all(a.runs == 2 for a in agents))
+
+    try:
+        _run_with(scheduler, body)
+    finally:
+        board.close()
+
+
+def test_idle_interval_wakes_without_messages():
+    board = Blackboard()
+    agent = _SyncAgent("idle")
+    try:
+        AgentScheduler(board, [agent], idle_interval=0.02).run(duration=0.3)
+        assert agent.runs >= 3
+        agent = _SyncAgent("waiting")
+        AgentScheduler(board, [agent]).run(duration=0.2)
+        assert agent.runs == 1
+    finally:
+        board.close()
+
+
+def test_max_concurrency_limits_sync_agents():
+    board = Blackboard()
+    concurrency = _Concurrency()
+    agents = [_SyncAgent(f"agent{i}", concurrency, delay=0.05) for i in range(6)]
+    scheduler = AgentScheduler(board, agents, max_concurrency=2)
+
+    async def body():
+        await _wait_until(lambda: all(a.runs == 1 for a in agents))
+
+    try:
+        _run_with(scheduler, body)
+        assert concurrency.peak == 2
+    finally:
+        board.close()
+
+
+def test_hundreds_of_agents_never_exceed_the_limit():
+    board = Blackboard()
+    concurrency = _Concurrency()
+    agents = [_AsyncAgent(f"agent{i}", concurrency, delay=0.001) for i in range(300)]
+    scheduler = AgentScheduler(board, agents, max_concurrency=8)
+
+    async def body():
+        await _wait_until(lambda: all(a.runs >= 1 for a in agents))
+        for i in range(0, 300, 7):
+            board.post_message("system", f"agent{i}", "work")
+        board.post_message("system", "all", "work")
+        await _wait_until(lambda: all(a.runs >= 2 for a in agents))
+
+    try:
+        _run_with(scheduler, body)
+        assert 1 < concurrency.peak <= 8
+        assert sum(stats["errors"] for stats in scheduler.get_stats().values()) == 0
+    finally:
+        board.close()
+
+
+def test_stop_from_another_thread_unsubscribes_and_stops_agents():
+    board = Blackboard()
+    agents = [_SyncAgent("alice"), _SyncAgent("bob")]
+    scheduler = AgentScheduler(board, agents)
+    stopper = threading.Timer(0.1, scheduler.stop)
+    try:
+        stopper.start()
+        started = time.monotonic()
+        scheduler.run()
+        assert time.monotonic() - started < 5.0
+        assert all(a.started and a.stopped for a in agents)
+        # 終了時に購読をすべて解除する
+        assert board.get_subscriber_stats() == []
+        runs = [a.runs for a in agents]
+        board.post_message("system", "all", "late")
+        board.flush_subscribers(1.0)
+        assert [a.runs for a in agents] == runs
+    finally:
+        stopper.cancel()
+        board.close()
+
+
+def test_stop_before_run_returns_immediately():
+    board = Blackboard()
+    agent = _SyncAgent("alice")
+    scheduler = AgentScheduler(board, [agent])
+    try:
+        scheduler.stop()
+        scheduler.run()
+        assert agent.runs == 0 and agent.stopped
+    finally:
+        board.close()
+
+
+@pytest.mark.parametrize("options", [{"max_concurrency": 0}, {"idle_interval": 0}])
+def test_invalid_options_raise(options):
+    board = Blackboard()
+    try:
+        with pytest.raises(ValueError):
+            AgentScheduler(board, [], **options)
+    finally:
+        board.close()
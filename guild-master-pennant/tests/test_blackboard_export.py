@@ -0,0 +1,145 @@
+"""
+Blackboard のエクスポート（export_to_json / export_delta）のテスト
+"""
+
+import json
+
+from blackboard import Blackboard
+
+
+def _read_delta(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def _apply_delta(records, state):
+    """差分を読み込み側の状態に反映（ヘッダーの数を返す）"""
+    headers = 0
+    for record in records:
+        if record["type"] == "header":
+            headers += 1
+        elif record["type"] == "message":
+            state["messages"].append(record["entry"])
+        elif record["type"] == "decision":
+            state["decisions"].append(record["entry"])
+        else:
+            state.setdefault(record["category"], {})[record["key"]] = record["value"]
+    return headers
+
+
+def _empty_state():
+    return {"messages": [], "decisions": []}
+
+
+def _mutate(board, start):
+    for i in range(start, start + 5):
+        board.post_message("A", "B" if i % 2 else "all", f"m{i}")
+        board.add_decision("A", f"d{i}", "why")
+        board.set_value(f"k{i}", i)
+    board.set_task_status("build", f"step {start}", agent="A")
+    board.add_generated_file("main.py", f"print({start})\n", "A", "entry")
+
+
+def _expected(board, decisions):
+    files = board.list_generated_files()
+    return {
+        "messages": board.get_messages(since_id=-1),
+        "decisions": decisions,
+        "system_state": {key: board.get_value(key) for key in board._data["system_state"]},
+        "tasks": board.get_all_tasks(),
+        "generated_files": files,
+        "file_history": {path: board.get_file_history(path) for path in files},
+    }
+
+
+def _actual(state):
+    return {name: state.get(name, {}) for name in
+            ("messages", "decisions", "system_state", "tasks", "generated_files", "file_history")}
+
+
+def test_export_to_json_matches_json_dump_format(tmp_path):
+    board = Blackboard()
+    try:
+        _mutate(board, 0)
+        path = tmp_path / "board.json"
+        board.export_to_json(str(path))
+
+        text = path.read_text(encoding="utf-8")
+        data = json.loads(text)
+        assert text == json.dumps(data, ensure_ascii=False, indent=2)
+        assert [m["content"] for m in data["messages"]] == [f"m{i}" for i in range(5)]
+        assert data["system_state"]["k3"] == 3
+        assert data["file_blobs"][data["generated_files"]["main.py"]["hash"]] == "print(0)\n"
+    finally:
+        board.close()
+
+
+def test_deltas_rebuild_the_board(tmp_path):
+    board = Blackboard()
+    path = tmp_path / "delta.jsonl"
+    state = _empty_state()
+    try:
+        _mutate(board, 0)
+        cursor = board.export_delta(str(path), append=False)
+        first = _read_delta(path)
+        assert _apply_delta(first, state) == 1
+
+        _mutate(board, 5)
+        board.set_value("k0", "changed")
+        cursor = board.export_delta(str(path), cursor=cursor, append=False)
+        second = _read_delta(path)
+        _apply_delta(second, state)
+
+        # 2回目は変更分だけ
+        assert len([r for r in second if r["type"] == "message"]) == 5
+        assert {r["key"] for r in second if r.get("category") == "system_state"} == \
+            {"k0"} | {f"k{i}" for i in range(5, 10)}
+        assert second[0]["since"] == first[0]["version"]
+
+        assert [d["decision"] for d in state["decisions"]] == [f"d{i}" for i in range(10)]
+        assert _actual(state) == _expected(board, state["decisions"])
+        assert len(state["file_history"]["main.py"]) == 2
+        for entry in state["file_history"]["main.py"]:
+            assert entry["hash"] in state["file_blobs"]
+
+        # 変更がなければヘッダーだけ
+        board.export_delta(str(path), cursor=cursor, append=False)
+        assert [r["type"] for r in _read_delta(path)] == ["header"]
+    finally:
+        board.close()
+
+
+def test_delta_includes_entries_archived_since_the_cursor(tmp_path):
+    board = Blackboard(max_messages=2, max_decisions=2, archive_dir=str(tmp_path / "archive"))
+    path = tmp_path / "delta.jsonl"
+    state = _empty_state()
+    try:
+        _mutate(board, 0)
+        cursor = board.export_delta(str(path))
+        _mutate(board, 5)
+        board.export_delta(str(path), cursor=cursor)
+        _apply_delta(_read_delta(path), state)
+
+        assert [m["id"] for m in state["messages"]] == list(range(10))
+        assert [d["decision"] for d in state["decisions"]] == [f"d{i}" for i in range(10)]
+    finally:
+        board.close()
+
+
+def test_archive_files_are_read_outside_the_locks(tmp_path, monkeypatch):
+    board = Blackboard(max_messages=1, archive_dir=str(tmp_path / "archive"))
+    read_archive = Blackboard._read_archive_extent
+    held = []
+
+    def checking(extent):
+        held.extend(lock.name for lock in (board._message_lock, board._decision_lock)
+                    if lock._lock.locked())
+        return read_archive(extent)
+
+    monkeypatch.setattr(Blackboard, "_read_archive_extent", staticmethod(checking))
+    try:
+        _mutate(board, 0)
+        board.export_delta(str(tmp_path / "delta.jsonl"))
+        assert held == []
+    finally:
+        board.close()
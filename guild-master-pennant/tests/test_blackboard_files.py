@@ -0,0 +1,124 @@
+"""
+Blackboard の生成ファイル（内容の共有・参照数・版の履歴・旧形式の取り込み）のテスト
+"""
+
+import hashlib
+import json
+import os
+
+from blackboard import WAL_SEGMENT_FORMAT, Blackboard
+
+
+def _digest(content):
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class _Untouchable:
+    """読まれたらテストを失敗させる内容の保存先"""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"file contents were accessed ({name})")
+
+    def __getitem__(self, key):
+        raise AssertionError("file contents were accessed")
+
+    def __contains__(self, key):
+        raise AssertionError("file contents were accessed")
+
+
+def test_same_content_is_stored_once_across_paths():
+    board = Blackboard()
+    try:
+        board.add_generated_file("a.py", "shared\n", "A")
+        board.add_generated_file("b.py", "shared\n", "B")
+        board.add_generated_file("c.py", "other\n", "A")
+
+        assert board._data["file_blobs"] == {_digest("shared\n"): "shared\n",
+                                             _digest("other\n"): "other\n"}
+        assert board._blob_refs == {_digest("shared\n"): 2, _digest("other\n"): 1}
+        assert board.get_summary()["unique_file_blobs"] == 2
+        assert board.get_file_content("b.py") == "shared\n"
+    finally:
+        board.close()
+
+
+def test_trimmed_history_releases_blob_only_when_unreferenced():
+    board = Blackboard(max_file_versions=2)
+    try:
+        board.add_generated_file("a.py", "v1\n", "A")
+        board.add_generated_file("b.py", "v1\n", "B")  # v1 は b.py からも参照される
+        board.add_generated_file("a.py", "v2\n", "A")
+        board.add_generated_file("a.py", "v3\n", "A")
+
+        # a.py の版1は履歴から消えるが、b.py が参照しているので内容は残る
+        assert [e["version"] for e in board.get_file_history("a.py")] == [2, 3]
+        assert board.get_file_content("a.py", version=1) is None
+        assert board._blob_refs[_digest("v1\n")] == 1
+        assert board.get_file_content("b.py") == "v1\n"
+
+        board.add_generated_file("b.py", "w2\n", "B")
+        board.add_generated_file("b.py", "w3\n", "B")
+        # 最後の参照が消えたので破棄される
+        assert _digest("v1\n") not in board._blob_refs
+        assert _digest("v1\n") not in board._data["file_blobs"]
+        assert set(board._data["file_blobs"]) == {_digest(c) for c in ("v2\n", "v3\n", "w2\n", "w3\n")}
+    finally:
+        board.close()
+
+
+def test_regenerating_an_older_content_keeps_one_blob_per_reference():
+    board = Blackboard(max_file_versions=2)
+    try:
+        board.add_generated_file("a.py", "x\n", "A")
+        board.add_generated_file("a.py", "y\n", "A")
+        board.add_generated_file("a.py", "x\n", "A")  # 版1が消え、版3が同じ内容を参照する
+
+        assert board._blob_refs == {_digest("x\n"): 1, _digest("y\n"): 1}
+        assert board.get_file_content("a.py") == "x\n"
+    finally:
+        board.close()
+
+
+def test_list_generated_files_does_not_touch_contents():
+    board = Blackboard()
+    try:
+        board.add_generated_file("a.py", "print(1)\n", "A", "entry")
+        board._data["file_blobs"] = _Untouchable()
+
+        listing = board.list_generated_files()
+        assert set(listing) == {"a.py"}
+        entry = listing["a.py"]
+        assert "content" not in entry
+        assert (entry["hash"], entry["lines"], entry["bytes"]) == (_digest("print(1)\n"), 1, 9)
+    finally:
+        board._data["file_blobs"] = {}
+        board.close()
+
+
+def test_legacy_value_records_are_migrated_on_load(tmp_path):
+    wal_dir = tmp_path / "wal"
+    wal_dir.mkdir()
+    legacy = [
+        {"op": "value", "category": "generated_files", "key": "a.py",
+         "value": {"content": "old\n", "agent": "A", "description": "d", "timestamp": "t1"}},
+        {"op": "value", "category": "generated_files", "key": "b.py",
+         "value": {"content": "old\n", "agent": "B", "description": "", "timestamp": "t2"}},
+        {"op": "value", "category": "generated_files", "key": "a.py",
+         "value": {"content": "new\n", "agent": "A", "description": "d", "timestamp": "t3"}},
+    ]
+    with open(os.path.join(wal_dir, WAL_SEGMENT_FORMAT.format(0)), "w", encoding="utf-8") as f:
+        for record in legacy:
+            f.write(json.dumps(record) + "\n")
+
+    board = Blackboard.load(str(wal_dir), max_file_versions=1)
+    try:
+        files = board.list_generated_files()
+        assert all("content" not in entry for entry in files.values())
+        assert files["a.py"]["version"] == 2
+        assert board.get_file_content("a.py") == "new\n"
+        assert board.get_file_content("b.py") == "old\n"
+        # a.py の古い版は刈り込まれたが、b.py が同じ内容を参照している
+        assert board._blob_refs == {_digest("old\n"): 1, _digest("new\n"): 1}
+        assert board.get_summary()["total_files"] == 2
+    finally:
+        board.close()
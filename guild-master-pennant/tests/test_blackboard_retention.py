@@ -0,0 +1,104 @@
+"""
+Blackboard の保持ポリシーとアーカイブ読み出しのテスト
+"""
+
+import json
+import os
+import time
+
+import pytest
+
+from blackboard import Blackboard
+
+
+def _post(board, count, recipient="B"):
+    for i in range(count):
+        board.post_message("A", recipient, f"m{i}")
+
+
+def test_max_messages_evicts_oldest_to_archive(tmp_path):
+    board = Blackboard(max_messages=5, archive_dir=str(tmp_path))
+    try:
+        _post(board, 12)
+        retained = board.get_messages()
+        assert [m["id"] for m in retained] == list(range(7, 12))
+
+        with open(tmp_path / "messages.jsonl", encoding="utf-8") as f:
+            archived = [json.loads(line) for line in f]
+        assert [m["id"] for m in archived] == list(range(7))
+    finally:
+        board.close()
+
+
+def test_since_id_reads_through_the_archive(tmp_path):
+    board = Blackboard(max_messages=3, archive_dir=str(tmp_path))
+    try:
+        for i in range(10):
+            board.post_message("A", "all" if i % 3 == 0 else ("B" if i % 2 else "C"), f"m{i}")
+
+        everything = board.get_messages(since_id=-1)
+        assert [m["id"] for m in everything] == list(range(10))
+        assert [m["content"] for m in everything] == [f"m{i}" for i in range(10)]
+
+        # 受信者のフィルタはアーカイブ分にも掛かり、"all" 宛ても含む
+        for_b = board.get_messages(recipient="B", since_id=1)
+        expected = [i for i in range(2, 10) if i % 3 == 0 or i % 2]
+        assert [m["id"] for m in for_b] == expected
+    finally:
+        board.close()
+
+
+def test_without_archive_dir_evicted_messages_are_dropped():
+    board = Blackboard(max_messages=2)
+    try:
+        _post(board, 5)
+        assert [m["id"] for m in board.get_messages(since_id=-1)] == [3, 4]
+        # 集計は取り除いたメッセージも含めた累計
+        assert board.get_summary()["messages_by_sender"] == {"A": 5}
+    finally:
+        board.close()
+
+
+def test_max_message_age_evicts_old_messages(tmp_path):
+    board = Blackboard(max_message_age=0.05, archive_dir=str(tmp_path))
+    try:
+        _post(board, 3)
+        time.sleep(0.1)
+        board.post_message("A", "B", "fresh")
+        assert [m["content"] for m in board.get_messages()] == ["fresh"]
+        assert len(board.get_messages(since_id=-1)) == 4
+    finally:
+        board.close()
+
+
+def test_max_decisions_archives_decisions(tmp_path):
+    board = Blackboard(max_decisions=2, archive_dir=str(tmp_path))
+    try:
+        for i in range(5):
+            board.add_decision("A", f"d{i}", "why")
+        assert [d["decision"] for d in board.get_decisions()] == ["d3", "d4"]
+        with open(tmp_path / "decisions.jsonl", encoding="utf-8") as f:
+            assert [json.loads(line)["decision"] for line in f] == ["d0", "d1", "d2"]
+    finally:
+        board.close()
+
+
+def test_invalid_retention_is_rejected():
+    with pytest.raises(ValueError):
+        Blackboard(max_messages=0)
+    with pytest.raises(ValueError):
+        Blackboard(max_message_age=0)
+
+
+def test_archive_is_truncated_for_a_new_board(tmp_path):
+    first = Blackboard(max_messages=1, archive_dir=str(tmp_path))
+    _post(first, 3)
+    first.close()
+    assert os.path.getsize(tmp_path / "messages.jsonl") > 0
+
+    second = Blackboard(max_messages=1, archive_dir=str(tmp_path))
+    try:
+        assert os.path.getsize(tmp_path / "messages.jsonl") == 0
+        assert second.get_messages(since_id=-1) == []
+    finally:
+        second.close()
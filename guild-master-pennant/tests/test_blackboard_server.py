@@ -0,0 +1,101 @@
+"""
+blackboard_server のテスト（値のバイナリ表現とリモート呼び出しの制限）
+"""
+
+import os
+import struct
+
+import pytest
+
+from blackboard import Blackboard
+from blackboard_server import (
+    MAX_DEPTH, BlackboardServer, RemoteBlackboard, RemoteError, decode_value, encode_value
+)
+
+
+@pytest.mark.parametrize("value", [
+    None, True, False, 0, -1, 2**63 - 1, -2**63, 2**80, -2**100, 1.5, float("inf"),
+    "", "冒険者", b"\x00\xff", [], {},
+    [1, "a", None, [2.5, {"k": b"v"}]],
+    {"nested": {"list": [1, 2, 3]}, 3: "int key", (1, 2): "tuple key"},
+])
+def test_codec_round_trip(value):
+    assert decode_value(encode_value(value)) == value
+
+
+def test_codec_tuple_becomes_list():
+    assert decode_value(encode_value((1, (2, 3)))) == [1, [2, 3]]
+
+
+def test_codec_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        encode_value(object())
+
+
+def test_decode_rejects_deep_nesting():
+    data = b"l\x00\x00\x00\x01" * (MAX_DEPTH + 10) + b"N"
+    with pytest.raises(ValueError):
+        decode_value(data)
+
+
+def test_decode_accepts_nesting_up_to_limit():
+    value = None
+    for _ in range(MAX_DEPTH):
+        value = [value]
+    assert decode_value(encode_value(value)) == value
+
+
+@pytest.mark.parametrize("data", [
+    b"s" + struct.pack("!I", 2**31) + b"abc",    # 文字列長がフレームより長い
+    b"l" + struct.pack("!I", 2**31),              # 要素数がフレームより多い
+    b"m" + struct.pack("!I", 2**31) + b"NN",
+    b"i\x00\x00",                                 # 途中で切れている
+    b"?",                                         # 未知のタグ
+    b"NN",                                        # 余分なバイト
+])
+def test_decode_rejects_malformed_values(data):
+    with pytest.raises(ValueError):
+        decode_value(data)
+
+
+@pytest.fixture
+def server():
+    board = Blackboard()
+    with BlackboardServer(board) as srv:
+        yield srv
+    board.close()
+
+
+def test_remote_calls_round_trip(server):
+    with RemoteBlackboard(server.address) as remote:
+        remote.post_message("A", "B", "hello", "info", {"value": 1})
+        remote.set_value("k", [1, 2], "system_state")
+        assert remote.get_value("k", "system_state") == [1, 2]
+        message = remote.get_messages(recipient="B")[0]
+        assert (message["content"], message["metadata"]) == ("hello", {"value": 1})
+
+
+def test_remote_file_writing_methods_are_disabled(server, tmp_path):
+    target = tmp_path / "written.json"
+    with RemoteBlackboard(server.address) as remote:
+        with pytest.raises(RemoteError):
+            remote.export_to_json(str(target))
+        with pytest.raises(RemoteError):
+            remote.call("snapshot")
+    assert not target.exists()
+
+
+def test_remote_exports_are_confined_to_export_dir(tmp_path):
+    export_dir = tmp_path / "exports"
+    export_dir.mkdir()
+    board = Blackboard()
+    with BlackboardServer(board, export_dir=str(export_dir)) as srv:
+        with RemoteBlackboard(srv.address) as remote:
+            remote.export_to_json("board.json")
+            for bad in ("../escape.json", str(tmp_path / "abs.json"), "..", "sub/x.json"):
+                with pytest.raises(RemoteError):
+                    remote.export_to_json(bad)
+    board.close()
+    assert os.listdir(export_dir) == ["board.json"]
+    assert not (tmp_path / "escape.json").exists()
+    assert not (tmp_path / "abs.json").exists()
@@ -0,0 +1,86 @@
+"""
+Blackboard.get_summary の集計（変更ごとに更新するカウンター）と数え直しの一致のテスト
+"""
+
+from collections import Counter
+
+import pytest
+
+from blackboard import Blackboard
+
+
+def _recount(board):
+    """保持・アーカイブ済みのすべての内容から要約の集計を数え直す"""
+    messages = board.get_messages(since_id=-1)
+    tasks = board.get_all_tasks().values()
+    files = board.list_generated_files().values()
+    by_status = dict(Counter(task["status"] for task in tasks))
+    return {
+        "total_messages": len(messages),
+        "total_tasks": len(tasks),
+        "completed_tasks": by_status.get("completed", 0),
+        "failed_tasks": by_status.get("failed", 0),
+        "tasks_by_status": by_status,
+        "messages_by_type": dict(Counter(m["type"] for m in messages)),
+        "messages_by_sender": dict(Counter(m["sender"] for m in messages)),
+        "total_files": len(files),
+        "files_by_agent": dict(Counter(entry["agent"] for entry in files)),
+    }
+
+
+def _assert_consistent(board):
+    summary = board.get_summary()
+    assert {key: summary[key] for key in _recount(board)} == _recount(board)
+
+
+def _mutate(board, round_no):
+    for i in range(8):
+        board.post_message(f"agent{i % 3}", "all" if i % 4 == 0 else f"agent{(i + 1) % 3}",
+                           f"round {round_no} #{i}", ("info", "request", "result")[i % 3])
+    board.set_task_status("design", "in_progress", agent="agent0")
+    board.set_task_status("build", "pending")
+    board.set_task_status("test", "in_progress", agent="agent1")
+    board.set_task_status("design", "completed", agent="agent0")
+    board.set_task_status("test", "failed", agent="agent1")
+    board.set_task_status("build", "in_progress", agent="agent2")
+    board.add_generated_file("src/app.py", f"v{round_no}\n", "agent0")
+    # 別のエージェントによる再生成（エージェント別の集計が移る）
+    board.add_generated_file("src/app.py", f"v{round_no}b\n", "agent1")
+    board.add_generated_file("src/util.py", "same\n", "agent2")
+    board.add_generated_file("src/util.py", "same\n", "agent2")  # 同じ内容は記録しない
+
+
+@pytest.mark.parametrize("snapshot", [False, True])
+def test_counters_match_a_full_recount(tmp_path, snapshot):
+    options = dict(max_messages=5, archive_dir=str(tmp_path / "archive"))
+    wal_dir = str(tmp_path / "wal")
+    board = Blackboard(wal_dir=wal_dir, **options)
+    try:
+        _mutate(board, 1)
+        _assert_consistent(board)
+        assert board.get_summary()["retained_messages"] == 5  # 保持上限で追い出されている
+
+        board.clear()
+        assert board.get_summary()["tasks_by_status"] == {}
+        _assert_consistent(board)
+
+        _mutate(board, 2)
+        if snapshot:
+            board.snapshot()
+        _mutate(board, 3)
+        _assert_consistent(board)
+        expected = board.get_summary()
+    finally:
+        board.close()
+
+    restored = Blackboard.load(wal_dir, **options)
+    try:
+        _assert_consistent(restored)
+        summary = restored.get_summary()
+        assert {k: v for k, v in summary.items() if k != "created_at"} == \
+            {k: v for k, v in expected.items() if k != "created_at"}
+
+        _mutate(restored, 4)
+        _assert_consistent(restored)
+    finally:
+        restored.close()
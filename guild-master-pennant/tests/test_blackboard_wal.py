@@ -0,0 +1,136 @@
+"""
+Blackboard の先行書き込みログ (WAL) とスナップショットからの復元のテスト
+"""
+
+import os
+
+import pytest
+
+from blackboard import WAL_SNAPSHOT_FILE, Blackboard
+
+
+def _populate(board):
+    board.post_message("A", "B", "hello", "request", {"n": 1})
+    board.post_message("B", "all", "broadcast")
+    board.set_value("phase", "design")
+    board.set_task_status("build", "in_progress", agent="A", details="step 1")
+    board.add_generated_file("src/main.py", "print('v1')\n", "A", "entry point")
+    board.add_generated_file("src/main.py", "print('v2')\n", "A", "entry point")
+    board.add_decision("A", "use sqlite", "simple")
+
+
+def _state(board):
+    return {
+        "messages": board.get_messages(since_id=-1),
+        "phase": board.get_value("phase"),
+        "task": board.get_task_status("build"),
+        "content": board.get_file_content("src/main.py"),
+        "first_version": board.get_file_content("src/main.py", version=1),
+        "history": board.get_file_history("src/main.py"),
+        "decisions": board.get_decisions(),
+        "summary": {k: v for k, v in board.get_summary().items() if k != "created_at"},
+        "input_version": board.get_input_version(["tasks", ("messages", "B"), ("system_state", "phase")]),
+    }
+
+
+@pytest.mark.parametrize("snapshot", [False, True])
+def test_load_restores_the_same_state(tmp_path, snapshot):
+    wal_dir = str(tmp_path / "wal")
+    board = Blackboard(wal_dir=wal_dir)
+    _populate(board)
+    if snapshot:
+        board.snapshot()
+        assert os.path.exists(os.path.join(wal_dir, WAL_SNAPSHOT_FILE))
+        board.set_value("phase", "build")
+    expected = _state(board)
+    board.close()
+
+    restored = Blackboard.load(wal_dir)
+    try:
+        assert _state(restored) == expected
+    finally:
+        restored.close()
+
+
+def test_automatic_snapshots_keep_only_recent_segments(tmp_path):
+    wal_dir = str(tmp_path / "wal")
+    board = Blackboard(wal_dir=wal_dir, snapshot_interval=5)
+    for i in range(23):
+        board.set_value(f"k{i}", i)
+    board.close()
+
+    segments = Blackboard._list_segments(wal_dir)
+    assert len(segments) == 1
+    restored = Blackboard.load(wal_dir)
+    try:
+        assert [restored.get_value(f"k{i}") for i in range(23)] == list(range(23))
+    finally:
+        restored.close()
+
+
+def test_loaded_board_keeps_logging(tmp_path):
+    wal_dir = str(tmp_path / "wal")
+    board = Blackboard(wal_dir=wal_dir)
+    board.post_message("A", "B", "first")
+    board.close()
+
+    resumed = Blackboard.load(wal_dir)
+    resumed.post_message("A", "B", "second")
+    resumed.close()
+
+    again = Blackboard.load(wal_dir)
+    try:
+        messages = again.get_messages(since_id=-1)
+        assert [m["content"] for m in messages] == ["first", "second"]
+        assert [m["id"] for m in messages] == [0, 1]
+    finally:
+        again.close()
+
+
+def test_torn_final_record_is_ignored(tmp_path):
+    wal_dir = str(tmp_path / "wal")
+    board = Blackboard(wal_dir=wal_dir)
+    board.set_value("a", 1)
+    board.set_value("b", 2)
+    board.close()
+
+    segment = board._segment_path(Blackboard._list_segments(wal_dir)[-1])
+    with open(segment, "ab") as f:
+        f.write(b'{"op": "value", "categ')
+
+    restored = Blackboard.load(wal_dir)
+    try:
+        assert restored.get_value("a") == 1
+        assert restored.get_value("b") == 2
+    finally:
+        restored.close()
+
+
+def test_clear_is_replayed(tmp_path):
+    wal_dir = str(tmp_path / "wal")
+    board = Blackboard(wal_dir=wal_dir)
+    board.set_value("a", 1)
+    board.clear()
+    board.set_value("b", 2)
+    board.close()
+
+    restored = Blackboard.load(wal_dir)
+    try:
+        assert restored.get_value("a") is None
+        assert restored.get_value("b") == 2
+    finally:
+        restored.close()
+
+
+def test_new_board_discards_existing_log(tmp_path):
+    wal_dir = str(tmp_path / "wal")
+    board = Blackboard(wal_dir=wal_dir)
+    board.set_value("a", 1)
+    board.close()
+
+    Blackboard(wal_dir=wal_dir).close()
+    restored = Blackboard.load(wal_dir)
+    try:
+        assert restored.get_value("a") is None
+    finally:
+        restored.close()
@@ -0,0 +1,123 @@
+"""
+cycle_executor のテスト（依存関係の順序・循環の検出・例外による停止）
+"""
+
+import threading
+import time
+
+import pytest
+
+from cycle_executor import build_dependency_graph, critical_path, run_cycle
+
+
+class _Recorder:
+    """エージェントの開始・終了の順序を記録"""
+
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    def add(self, kind, name):
+        with self._lock:
+            self.events.append((kind, name))
+
+    def index(self, kind, name):
+        return self.events.index((kind, name))
+
+
+class _StubAgent:
+    def __init__(self, name, recorder, delay=0.0, fail=False):
+        self.name = name
+        self.recorder = recorder
+        self.delay = delay
+        self.fail = fail
+
+    def start(self):
+        pass
+
+    def run_once(self):
+        self.recorder.add("start", self.name)
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} failed")
+        self.recorder.add("end", self.name)
+
+
+def _agent(class_name, recorder, **options):
+    """依存関係をクラス名で指定するため、名前つきのスタブクラスのエージェントを作る"""
+    return type(class_name, (_StubAgent,), {})(class_name, recorder, **options)
+
+
+DEPENDENCIES = {
+    "Base": [],
+    "Left": ["Base"],
+    "Right": ["Base"],
+    "Join": ["Left", "Right"],
+}
+
+
+def test_dependents_never_start_before_prerequisites_finish():
+    recorder = _Recorder()
+    agents = [_agent(name, recorder, delay=0.02) for name in ("Join", "Right", "Left", "Base")]
+
+    timings = run_cycle(agents, DEPENDENCIES)
+
+    assert set(timings) == {"Base", "Left", "Right", "Join"}
+    for name, requires in DEPENDENCIES.items():
+        for dep in requires:
+            assert recorder.index("end", dep) < recorder.index("start", name), (dep, name)
+    assert critical_path(agents, timings) == max(t["end"] for t in timings.values())
+
+
+def test_independent_agents_run_concurrently():
+    recorder = _Recorder()
+    agents = [_agent(name, recorder, delay=0.1) for name in ("Base", "Left", "Right")]
+    run_cycle(agents, DEPENDENCIES)
+    # Left と Right は Base の後に並行して始まる
+    starts = [event for event in recorder.events if event[0] == "start"]
+    assert recorder.events.index(starts[2]) < recorder.index("end", "Left")
+    assert recorder.events.index(starts[2]) < recorder.index("end", "Right")
+
+
+def test_dependency_graph_ignores_unknown_classes():
+    recorder = _Recorder()
+    agents = [_agent("Left", recorder), _agent("Other", recorder)]
+    assert build_dependency_graph(agents, DEPENDENCIES) == [[], []]
+
+
+def test_cyclic_dependencies_raise():
+    recorder = _Recorder()
+    agents = [_agent(name, recorder) for name in ("A", "B", "C")]
+    with pytest.raises(ValueError, match="Cyclic"):
+        build_dependency_graph(agents, {"A": ["C"], "B": ["A"], "C": ["B"]})
+    with pytest.raises(ValueError):
+        run_cycle(agents, {"A": ["C"], "B": ["A"], "C": ["B"]})
+    assert recorder.events == []
+
+
+def test_failure_stops_new_submissions_and_propagates():
+    recorder = _Recorder()
+    agents = [
+        _agent("Base", recorder),
+        _agent("Left", recorder, fail=True),
+        _agent("Right", recorder, delay=0.1),
+        _agent("Join", recorder),
+    ]
+
+    # Join は Right だけに依存するので、停止しなければ Right の後に始まる
+    with pytest.raises(RuntimeError, match="Left failed"):
+        run_cycle(agents, dict(DEPENDENCIES, Join=["Right"]))
+
+    # 実行中だった Right は最後まで待つが、その後の Join は始めない
+    assert ("end", "Right") in recorder.events
+    assert ("start", "Join") not in recorder.events
+
+
+def test_skipped_agents_release_their_dependents():
+    recorder = _Recorder()
+    agents = [_agent(name, recorder) for name in ("Base", "Left", "Right", "Join")]
+
+    timings = run_cycle(agents, DEPENDENCIES, should_run=lambda agent: agent.name != "Left")
+
+    assert set(timings) == {"Base", "Right", "Join"}
+    assert ("start", "Left") not in recorder.events
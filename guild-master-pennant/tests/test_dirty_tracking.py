@@ -0,0 +1,152 @@
+"""
+入力バージョンによる再実行の省略のテスト
+"""
+
+from blackboard import Blackboard
+from cycle_executor import run_cycle
+
+
+class _Agent:
+    """run_once の回数を数えるだけのエージェント"""
+
+    def __init__(self, name, reads):
+        self.name = name
+        self.reads = reads
+        self.runs = 0
+
+    def start(self):
+        pass
+
+    def run_once(self):
+        self.runs += 1
+
+
+def _cycle(board, agents, last_versions):
+    """Orchestrator.run_single_cycle と同じ判定で1サイクル実行"""
+    def should_run(agent):
+        version = board.get_input_version(agent.reads)
+        if last_versions.get(agent.name) == version:
+            return False
+        last_versions[agent.name] = version
+        return True
+    run_cycle(agents, dependencies={}, should_run=should_run)
+
+
+def test_unchanged_inputs_are_skipped():
+    board = Blackboard()
+    combat = _Agent("Combat", [("messages", "Combat"), ("system_state", "balance")])
+    party = _Agent("Party", ["tasks"])
+    versions = {}
+    try:
+        _cycle(board, [combat, party], versions)
+        _cycle(board, [combat, party], versions)
+        assert (combat.runs, party.runs) == (1, 1)
+
+        board.set_value("balance", 2, "system_state")
+        _cycle(board, [combat, party], versions)
+        assert (combat.runs, party.runs) == (2, 1)
+
+        board.set_value("unrelated", 1, "system_state")
+        _cycle(board, [combat, party], versions)
+        assert (combat.runs, party.runs) == (2, 1)
+    finally:
+        board.close()
+
+
+def test_inbox_input_includes_broadcasts():
+    board = Blackboard()
+    try:
+        reads = [("messages", "Combat")]
+        before = board.get_input_version(reads)
+        board.post_message("Orchestrator", "all", "start")
+        after_broadcast = board.get_input_version(reads)
+        assert after_broadcast > before
+
+        board.post_message("Party", "Dungeon", "direct to someone else")
+        assert board.get_input_version(reads) == after_broadcast
+
+        board.post_message("Party", "Combat", "direct")
+        assert board.get_input_version(reads) > after_broadcast
+    finally:
+        board.close()
+
+
+def test_broadcast_wakes_agent_reading_its_inbox():
+    board = Blackboard()
+    agent = _Agent("Combat", [("messages", "Combat")])
+    versions = {}
+    try:
+        _cycle(board, [agent], versions)
+        board.post_message("Orchestrator", "all", "new round")
+        _cycle(board, [agent], versions)
+        assert agent.runs == 2
+    finally:
+        board.close()
+
+
+def test_identical_generated_file_is_not_a_change():
+    board = Blackboard()
+    try:
+        assert board.add_generated_file("a.gd", "extends Node", "Skill", "skill system")
+        version = board.get_input_version(["generated_files"])
+        assert not board.add_generated_file("a.gd", "extends Node", "Skill", "skill system")
+        assert board.get_input_version(["generated_files"]) == version
+        assert board.add_generated_file("a.gd", "extends Node2D", "Skill", "skill system")
+        assert board.get_input_version(["generated_files"]) > version
+    finally:
+        board.close()
+
+
+def test_versions_stay_monotonic_across_clear():
+    board = Blackboard()
+    try:
+        board.set_value("k", 1, "tasks")
+        board.set_value("k", 2, "tasks")
+        before = board.get_input_version(["tasks"])
+        inbox = board.get_input_version([("messages", "Combat")])
+
+        board.clear()
+        assert board.get_input_version(["tasks"]) > before
+        assert board.get_input_version([("tasks", "k")]) == 0
+
+        board.set_value("x", 1, "system_state")
+        board.set_value("k", 3, "tasks")
+        assert board.get_input_version(["tasks"]) > before
+        assert board.get_input_version([("messages", "Combat")]) == inbox
+    finally:
+        board.close()
+
+
+def test_clear_reruns_agents_that_read_cleared_data():
+    board = Blackboard()
+    reader = _Agent("Party", ["tasks", ("messages", "Party")])
+    versions = {}
+    try:
+        board.set_value("k", 1, "tasks")
+        board.post_message("Orchestrator", "all", "start")
+        _cycle(board, [reader], versions)
+        board.clear()
+        _cycle(board, [reader], versions)
+        assert reader.runs == 2
+        _cycle(board, [reader], versions)
+        assert reader.runs == 2
+    finally:
+        board.close()
+
+
+def test_clear_versions_survive_wal_replay(tmp_path):
+    wal_dir = str(tmp_path / "wal")
+    board = Blackboard(wal_dir=wal_dir)
+    board.set_value("k", 1, "tasks")
+    board.post_message("A", "B", "hello")
+    board.clear()
+    board.set_value("x", 1, "system_state")
+    reads = ["tasks", ("messages", "B"), ("system_state", "x")]
+    expected = [board.get_input_version([item]) for item in reads]
+    board.close()
+
+    restored = Blackboard.load(wal_dir)
+    try:
+        assert [restored.get_input_version([item]) for item in reads] == expected
+    finally:
+        restored.close()
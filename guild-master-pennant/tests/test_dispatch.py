@@ -0,0 +1,117 @@
+"""
+dispatch のバックプレッシャーと flush のテスト
+"""
+
+import threading
+import time
+
+from blackboard import Blackboard
+from dispatch import MessageDispatcher
+
+
+def _message(i, recipient="slow", sender="A", message_type="info"):
+    return {"id": i, "recipient": recipient, "sender": sender, "type": message_type}
+
+
+def test_block_throttles_the_sender_and_bounds_the_queue():
+    release = threading.Event()
+    delivered = []
+    board = Blackboard(subscriber_queue_size=2, backpressure="block")
+    try:
+        board.subscribe("slow", lambda m: (release.wait(5), delivered.append(m["id"])))
+        done = threading.Event()
+
+        def produce():
+            for i in range(10):
+                board.post_message("A", "slow", str(i))
+            done.set()
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        time.sleep(0.2)
+        # 1件は配信中、キューは上限（+待っている投稿1件）まで
+        assert not done.is_set()
+        assert board.get_subscriber_stats()[0]["pending"] <= 3
+        release.set()
+        producer.join(5)
+        assert done.is_set()
+        assert board.flush_subscribers(5)
+        assert delivered == list(range(10))
+        assert board.get_subscriber_stats()[0]["throttled"] > 0
+    finally:
+        release.set()
+        board.close()
+
+
+def test_slow_subscriber_does_not_stall_others():
+    release = threading.Event()
+    fast = []
+    dispatcher = MessageDispatcher(workers=2, queue_size=1, backpressure="block")
+    try:
+        dispatcher.subscribe("slow", lambda m: release.wait(5))
+        dispatcher.subscribe("fast", lambda m: fast.append(m["id"]))
+        for i in range(3):
+            dispatcher.publish(_message(i, "slow"))
+        for i in range(5):
+            dispatcher.publish(_message(i, "fast"))
+        deadline = time.monotonic() + 2
+        while len(fast) < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert fast == list(range(5))
+    finally:
+        release.set()
+        dispatcher.close()
+
+
+def test_callback_posting_to_its_own_full_queue_does_not_deadlock():
+    board = Blackboard(subscriber_queue_size=1, backpressure="block")
+    received = []
+
+    def echo(message):
+        received.append(message["content"])
+        if len(received) < 20:
+            board.post_message("echo", "echo", "again")
+
+    try:
+        board.subscribe("echo", echo)
+        board.post_message("A", "echo", "start")
+        deadline = time.monotonic() + 5
+        while len(received) < 20 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(received) == 20
+        assert board.flush_subscribers(5)
+    finally:
+        board.close()
+
+
+def test_drop_and_coalesce_never_block():
+    release = threading.Event()
+    dispatcher = MessageDispatcher(workers=1, queue_size=2)
+    try:
+        drop = dispatcher.subscribe("d", lambda m: release.wait(5), backpressure="drop")
+        coalesce = dispatcher.subscribe("c", lambda m: None, backpressure="coalesce")
+        for i in range(10):
+            assert dispatcher.publish(_message(i, "d")) == []
+            assert dispatcher.publish(_message(i, "c")) == []
+        assert drop.dropped >= 7
+        release.set()
+        assert dispatcher.flush(5)
+        assert coalesce.delivered + coalesce.coalesced == 10
+    finally:
+        release.set()
+        dispatcher.close()
+
+
+def test_flush_waits_for_delivery_and_times_out():
+    release = threading.Event()
+    dispatcher = MessageDispatcher(workers=1)
+    try:
+        dispatcher.subscribe("r", lambda m: release.wait(5))
+        dispatcher.publish(_message(1, "r"))
+        assert not dispatcher.flush(0.1)
+        release.set()
+        assert dispatcher.flush(5)
+        assert dispatcher.pending_count() == 0
+    finally:
+        release.set()
+        dispatcher.close()
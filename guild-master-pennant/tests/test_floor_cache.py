@@ -0,0 +1,72 @@
+"""
+floor_cache のテスト（キャッシュ有無での分布の一致と LRU）
+"""
+
+import random
+
+import pytest
+
+from floor_cache import FloorOutcome, FloorOutcomeCache, check_cache_equivalence
+from simulation import create_party, simulate_dungeon
+
+
+@pytest.mark.parametrize("party", [
+    ["Warrior", "Mage", "Mage", "Priest"],
+    ["Mage", "Mage", "Mage", "Priest"],
+])
+def test_cached_distribution_is_within_tolerance(party):
+    result = check_cache_equivalence(party, runs=1000, seed=3, tolerance=0.1,
+                                     survival_tolerance=0.1)
+    assert result["within_tolerance"], (result["mean_diff"], result["max_survival_diff"])
+    assert result["cache_stats"]["hits"] > 0
+
+
+def test_survival_difference_outside_tolerance_fails():
+    result = check_cache_equivalence(["Warrior", "Mage", "Mage", "Priest"], runs=200, seed=3,
+                                     tolerance=float("inf"), survival_tolerance=-1.0)
+    assert not result["within_tolerance"]
+
+
+def test_sample_waits_for_enough_outcomes():
+    cache = FloorOutcomeCache(samples_per_key=2)
+    key = ("ctx", 1, (10,))
+    outcome = FloorOutcome(True, (3,), (False,))
+
+    assert cache.sample(key) is None
+    cache.record(key, outcome)
+    assert cache.sample(key) is None
+    cache.record(key, outcome)
+    assert cache.sample(key, random.Random(0)) == outcome
+    assert cache.get_stats()["hits"] == 1
+    assert cache.get_stats()["misses"] == 2
+
+
+def test_least_recently_used_key_is_evicted():
+    cache = FloorOutcomeCache(max_entries=2, samples_per_key=1)
+    outcome = FloorOutcome(True, (0,), (False,))
+    for floor in (1, 2):
+        cache.record(("ctx", floor, ()), outcome)
+    assert cache.sample(("ctx", 1, ())) == outcome  # 1 を最近使ったことにする
+    cache.record(("ctx", 3, ()), outcome)
+
+    assert cache.get_stats()["evictions"] == 1
+    assert cache.sample(("ctx", 2, ())) is None
+    assert cache.sample(("ctx", 1, ())) == outcome
+
+
+def test_apply_keeps_survivors_alive_and_marks_deaths():
+    party = create_party(["Warrior", "Mage"])
+    FloorOutcomeCache.apply(FloorOutcome(True, (party[0].max_hp * 2, 5), (False, True)), party)
+    assert party[0].is_alive and party[0].current_hp == 1
+    assert not party[1].is_alive and party[1].current_hp == 0
+
+
+def test_floors_above_max_floor_are_not_cached():
+    cache = FloorOutcomeCache(max_floor=2)
+    assert cache.applies_to(2)
+    assert not cache.applies_to(3)
+
+
+def test_recorder_cannot_be_combined_with_cache():
+    with pytest.raises(ValueError):
+        simulate_dungeon(["Warrior"], seed=0, floor_cache=FloorOutcomeCache(), recorder=object())
@@ -0,0 +1,23 @@
+"""
+game_data のテスト（balance.json との一致）
+"""
+
+from game_data import DATA, DEFAULT_JOB_STATS, JOB_STATS
+from simulation import MockAdventurer
+
+
+def test_unknown_job_uses_default_job():
+    default = DATA["default_job"]
+    assert DEFAULT_JOB_STATS == (default["max_hp"], default["attack"], default["defense"],
+                                 default["magic"], default["speed"])
+    adventurer = MockAdventurer("Bard1", "Bard")
+    assert (adventurer.max_hp, adventurer.attack, adventurer.defense,
+            adventurer.magic, adventurer.speed) == tuple(DEFAULT_JOB_STATS)
+    assert DEFAULT_JOB_STATS != JOB_STATS["Warrior"]
+
+
+def test_known_jobs_use_their_own_stats():
+    for job, stats in JOB_STATS.items():
+        adventurer = MockAdventurer(job, job)
+        assert adventurer.max_hp == stats.max_hp
+        assert adventurer.speed == stats.speed
@@ -0,0 +1,47 @@
+"""
+markov_solver のテスト（状態数の見積もりとモンテカルロへの切り替え）
+"""
+
+import markov_solver
+from markov_solver import BattleModel, solve_combat, solve_dungeon
+from simulation import create_enemies, create_party
+
+PARTY = ["Warrior", "Mage", "Priest", "Archer"]
+
+
+def test_first_floor_is_solved_exactly_within_the_estimate(monkeypatch):
+    peak = [0]
+    advance_turn = BattleModel.advance_turn
+
+    def tracking(self, current):
+        following = advance_turn(self, current)
+        peak[0] = max(peak[0], len(following))
+        return following
+
+    monkeypatch.setattr(BattleModel, "advance_turn", tracking)
+    party = create_party(PARTY)
+    enemies = create_enemies(1)
+    model = BattleModel(party, enemies)
+    estimate = model.estimate_states({model.initial_state(party, enemies): 1.0})
+
+    result = solve_combat(party, enemies)
+    assert result["method"] == "exact"
+    assert abs(result["victory"] + result["defeat"] + result["timeout"] - 1.0) < 1e-9
+    assert peak[0] <= estimate <= markov_solver.DEFAULT_MAX_STATES
+
+
+def test_floors_over_the_estimate_are_not_enumerated(monkeypatch):
+    solved = []
+    solve = BattleModel.solve
+
+    def recording(self, initial, max_turns=100):
+        solved.append(self.estimate_states(initial))
+        return solve(self, initial, max_turns)
+
+    monkeypatch.setattr(BattleModel, "solve", recording)
+    result = solve_dungeon(PARTY, max_floors=3, fallback_runs=100, seed=1)
+
+    assert result["method"] == "hybrid"
+    assert result["exact_floors"] == len(solved) == 1
+    assert all(estimate <= markov_solver.DEFAULT_MAX_STATES for estimate in solved)
+    assert len(result["survival"]) == 3
@@ -0,0 +1,114 @@
+"""
+metrics のテスト（パーセンタイル・スループットの窓・コルーチンの計測・JSON の書き出し）
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from blackboard import Blackboard
+from metrics import (
+    DEFAULT_METRICS_PATH,
+    Metrics,
+    RateCounter,
+    RollingHistogram,
+    pop_metrics_option,
+    write_snapshot
+)
+
+
+def test_histogram_percentiles_use_the_recent_window():
+    histogram = RollingHistogram(window=100)
+    for value in range(1, 101):
+        histogram.observe(value)
+    assert histogram.summary() == {"count": 100, "mean": 50.5, "p50": 51, "p90": 91,
+                                   "p99": 100, "max": 100}
+
+    # 窓から外れた標本はパーセンタイルに使わないが、件数・平均・最大は累計
+    for _ in range(100):
+        histogram.observe(1)
+    summary = histogram.summary(scale=1000)
+    assert (summary["p50"], summary["p99"]) == (1000, 1000)
+    assert summary["count"] == 200
+    assert summary["mean"] == pytest.approx(25.75 * 1000)
+    assert summary["max"] == 100 * 1000
+
+
+def test_empty_histogram_summary_is_zero():
+    assert RollingHistogram().summary() == {"count": 0, "mean": 0.0, "p50": 0.0,
+                                            "p90": 0.0, "p99": 0.0, "max": 0.0}
+
+
+def test_rate_counter_averages_the_last_window_seconds():
+    counter = RateCounter(window=10)
+    counter.increment(5, now=100.0)
+    counter.increment(3, now=100.9)    # 同じ秒のバケットにまとめる
+    counter.increment(2, now=105.0)
+    assert counter.summary(now=105.5) == {"total": 10, "per_second": 1.0}
+
+    # 100秒のバケットは窓から外れる
+    assert counter.summary(now=110.0) == {"total": 10, "per_second": 0.2}
+    counter.increment(4, now=120.0)
+    assert counter.summary(now=120.0) == {"total": 14, "per_second": 0.4}
+    assert len(counter._buckets) == 1
+
+
+def test_timed_records_coroutines_after_they_finish():
+    metrics = Metrics()
+
+    async def think(delay):
+        await asyncio.sleep(delay)
+        return "done"
+
+    timed = metrics.timed("agent.think", think)
+    assert asyncio.iscoroutinefunction(timed)
+    assert asyncio.run(timed(0.05)) == "done"
+
+    summary = metrics.snapshot()["timings_ms"]["agent.think"]
+    assert summary["count"] == 1
+    assert summary["max"] >= 40   # await の時間も含む
+
+
+def test_timed_records_failures():
+    metrics = Metrics()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        metrics.timed("fail", fail)()
+    assert metrics.snapshot()["timings_ms"]["fail"]["count"] == 1
+
+
+@pytest.mark.parametrize("args, expected", [
+    (["--auto"], (["--auto"], None)),
+    (["--auto", "--metrics"], (["--auto"], DEFAULT_METRICS_PATH)),
+    (["--metrics", "--run", "5"], (["--run", "5"], DEFAULT_METRICS_PATH)),
+    (["--metrics", "out.json", "--auto"], (["--auto"], "out.json")),
+])
+def test_pop_metrics_option(args, expected):
+    assert pop_metrics_option(args) == expected
+
+
+def test_snapshot_with_blackboard_metrics_is_written_as_json(tmp_path):
+    metrics = Metrics()
+    board = Blackboard(metrics=metrics)
+    try:
+        board.post_message("A", "B", "hello")
+        board.set_value("phase", "design")
+        metrics.register_gauge("broken", lambda: 1 / 0)
+        snapshot = metrics.snapshot()
+        snapshot["locks"] = board.get_lock_stats()   # Orchestrator.get_metrics と同じ形
+
+        path = tmp_path / "metrics.json"
+        write_snapshot(snapshot, str(path))
+        written = json.loads(path.read_text(encoding="utf-8"))
+    finally:
+        board.close()
+
+    assert written["counters"]["blackboard.messages"]["total"] == 1
+    assert written["timings_ms"]["blackboard.post_message"]["count"] == 1
+    assert written["gauges"]["blackboard.retained_messages"] == 1
+    assert written["gauges"]["broken"].startswith("error:")
+    assert "messages" in written["locks"]
@@ -0,0 +1,93 @@
+"""
+replay のテスト（記録・読み込み・シードからの再現）
+"""
+
+import io
+
+import pytest
+
+from replay import (
+    ReplayFormatError, ReplayReader, ReplayWriter, record_combat, record_run, replay_combat,
+    replay_run, verify_replay
+)
+from simulation import (
+    LOG_FULL, LOG_NONE, CombatSimulator, create_enemies, create_party, derive_seed, make_rng,
+    simulate_dungeon_batch
+)
+from tactics import TacticsEngine
+
+PARTY = ["Warrior", "Mage", "Mage", "Priest"]
+
+
+def test_recorded_runs_and_combats_verify(tmp_path):
+    path = tmp_path / "runs.gmpr"
+    with ReplayWriter(path) as writer:
+        first = record_run(writer, PARTY, seed=11, max_floors=30, meta={"run": 0})
+        record_run(writer, PARTY, seed=12, max_floors=30, tactics=TacticsEngine())
+        record_combat(writer, create_party(PARTY), create_enemies(3), seed=5, floor=3)
+
+    stats = verify_replay(str(path))
+    assert stats["mismatches"] == 0
+    assert stats["runs"] == 2
+    assert stats["battles"] >= first["max_floor_reached"] + 2
+
+
+def test_verify_detects_a_recording_that_does_not_match_its_seed():
+    buffer = io.BytesIO()
+    writer = ReplayWriter(buffer)
+    party, enemies = create_party(PARTY), create_enemies(2)
+    # ヘッダーのシードと実際に使った乱数が違う戦闘
+    writer.begin_battle(2, party, enemies, seed=1)
+    result = CombatSimulator.simulate_combat(party, enemies, 100, LOG_NONE, make_rng(2),
+                                             recorder=writer)
+    writer.end_battle(result)
+    buffer.seek(0)
+
+    assert verify_replay(buffer)["mismatches"] == 1
+
+
+def test_turn_logs_match_the_full_log_of_a_replayed_combat():
+    buffer = io.BytesIO()
+    writer = ReplayWriter(buffer)
+    record_combat(writer, create_party(PARTY), create_enemies(4), seed=9, floor=4)
+    buffer.seek(0)
+
+    battle = next(iter(ReplayReader(buffer)))
+    full = replay_combat(battle, LOG_FULL)
+    recorded = list(battle.turn_logs())
+    assert recorded == [turn["log"] for turn in full["log"]]
+    assert battle.victory == full["victory"]
+    assert battle.turn_count == full["turns"]
+
+
+def test_batch_run_can_be_recorded_and_replayed():
+    batch = simulate_dungeon_batch(PARTY, runs=20, seed=3, max_floors=30,
+                                   select_runs=lambda floor: floor < 4)
+    assert batch["selected_runs"]
+    selected = batch["selected_runs"][0]
+    assert selected["seed"] == derive_seed(3, selected["run"])
+
+    buffer = io.BytesIO()
+    writer = ReplayWriter(buffer)
+    result = record_run(writer, PARTY, seed=selected["seed"], max_floors=30)
+    assert result["max_floor_reached"] == selected["floor"]
+    buffer.seek(0)
+
+    battles = list(ReplayReader(buffer))
+    assert battles[-1].floor == selected["floor"] + 1
+    assert replay_run(battles[0].run)["max_floor_reached"] == selected["floor"]
+
+
+def test_unread_turns_are_skipped_when_moving_on():
+    buffer = io.BytesIO()
+    writer = ReplayWriter(buffer)
+    record_run(writer, PARTY, seed=21, max_floors=30)
+    buffer.seek(0)
+
+    floors = [battle.floor for battle in ReplayReader(buffer)]
+    assert floors == list(range(1, len(floors) + 1))
+
+
+def test_reader_rejects_other_files():
+    with pytest.raises(ReplayFormatError):
+        ReplayReader(io.BytesIO(b"JSON{}"))
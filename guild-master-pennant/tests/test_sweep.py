@@ -0,0 +1,101 @@
+"""
+sweep のチェックポイントのテスト
+"""
+
+import json
+
+import pytest
+
+import sweep
+from sweep import CheckpointError, load_checkpoint, run_sweep, sweep_config
+
+JOBS = ("Warrior", "Priest")
+OPTIONS = dict(runs=5, seed=3, max_floors=3, workers=1, jobs=JOBS)
+
+
+def _lines(path):
+    return path.read_text(encoding="utf-8").splitlines()
+
+
+def test_checkpoint_records_config_header(tmp_path):
+    path = tmp_path / "sweep.jsonl"
+    results = run_sweep(checkpoint=str(path), **OPTIONS)
+    lines = _lines(path)
+    header = json.loads(lines[0])
+    assert header == {"type": "header",
+                      "config": sweep_config(5, 3, 3, "scalar", False)}
+    assert len(lines) == 1 + len(results)
+
+
+def test_resume_with_same_config_reuses_results(tmp_path, monkeypatch):
+    path = tmp_path / "sweep.jsonl"
+    first = run_sweep(checkpoint=str(path), **OPTIONS)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("completed formations must not be simulated again")
+    monkeypatch.setattr(sweep, "run_chunk", fail)
+    assert run_sweep(checkpoint=str(path), **OPTIONS) == first
+
+
+@pytest.mark.parametrize("change", [{"runs": 6}, {"seed": 4}, {"max_floors": 4},
+                                    {"replay_min_floor": 2}, {"replay_dir": None}])
+def test_resume_with_different_config_is_refused(tmp_path, change):
+    path = tmp_path / "sweep.jsonl"
+    options = dict(OPTIONS, replay_dir=str(tmp_path / "replays"))
+    run_sweep(checkpoint=str(path), **options)
+    with pytest.raises(CheckpointError):
+        run_sweep(checkpoint=str(path), **dict(options, **change))
+
+
+def test_resume_without_replays_is_refused_when_replays_are_requested(tmp_path):
+    path = tmp_path / "sweep.jsonl"
+    run_sweep(checkpoint=str(path), **OPTIONS)
+    with pytest.raises(CheckpointError):
+        run_sweep(checkpoint=str(path), replay_dir=str(tmp_path / "replays"), **OPTIONS)
+
+
+@pytest.mark.parametrize("change", [{"engine": "vectorized", "use_tactics": True},
+                                    {"engine": "vectorized", "replay_dir": "replays"},
+                                    {"engine": "auto"}])
+def test_unsupported_options_are_refused_before_starting(tmp_path, monkeypatch, change):
+    path = tmp_path / "sweep.jsonl"
+    if "replay_dir" in change:
+        change = dict(change, replay_dir=str(tmp_path / change["replay_dir"]))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("no worker pool may be started for invalid options")
+    monkeypatch.setattr(sweep, "ProcessPoolExecutor", fail)
+    with pytest.raises(ValueError):
+        run_sweep(checkpoint=str(path), **dict(OPTIONS, **change))
+    assert not path.exists()
+    assert not (tmp_path / "replays").exists()
+
+
+def test_checkpoint_without_header_is_refused(tmp_path):
+    path = tmp_path / "sweep.jsonl"
+    path.write_text(json.dumps({"key": "Warrior", "mean": 1.0}) + "\n", encoding="utf-8")
+    with pytest.raises(CheckpointError):
+        load_checkpoint(str(path))
+
+
+def test_torn_final_line_is_ignored_and_truncated(tmp_path):
+    path = tmp_path / "sweep.jsonl"
+    expected = run_sweep(checkpoint=str(path), **OPTIONS)
+    lines = _lines(path)
+    # 最後の2件を消し、書き込み途中で切れた行を残す
+    path.write_text("\n".join(lines[:-2]) + "\n" + lines[-2][:10], encoding="utf-8")
+    assert len(load_checkpoint(str(path))) == len(lines) - 3
+
+    assert run_sweep(checkpoint=str(path), **OPTIONS) == expected
+    for line in _lines(path):
+        json.loads(line)
+
+
+def test_corrupt_line_before_the_end_raises(tmp_path):
+    path = tmp_path / "sweep.jsonl"
+    run_sweep(checkpoint=str(path), **OPTIONS)
+    lines = _lines(path)
+    lines[1] = lines[1][:10]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    with pytest.raises(CheckpointError):
+        load_checkpoint(str(path))
@@ -0,0 +1,63 @@
+"""
+tactics のテスト（ゲーム本体の SkillSystem / CombatAction との一致）
+"""
+
+import random
+
+from simulation import CombatSimulator, create_enemies, create_party
+from tactics import TacticsEngine, get_skill
+
+
+def test_all_scope_attack_skill_hits_only_the_selected_target():
+    engine = TacticsEngine()
+    party = create_party(["Archer"])
+    enemies = create_enemies(3)
+    assert len(enemies) >= 2
+    before = [e.current_hp for e in enemies]
+
+    events = engine.execute_skill(party[0], get_skill("乱れ撃ち"), enemies[1], party, enemies,
+                                  random.Random(0))
+    assert [e.target for e in events] == [enemies[1]]
+    assert [e.current_hp for i, e in enumerate(enemies) if i != 1] == \
+        [hp for i, hp in enumerate(before) if i != 1]
+
+
+def test_all_allies_heal_heals_only_the_selected_target():
+    engine = TacticsEngine()
+    party = create_party(["Priest", "Warrior", "Mage"])
+    for adventurer in party:
+        adventurer.current_hp = 1
+    events = engine.execute_skill(party[0], get_skill("全体回復"), party[1], party, [],
+                                  random.Random(0))
+    assert [e.target for e in events] == [party[1]]
+    assert party[2].current_hp == 1
+
+
+def test_magic_damage_uses_integer_division_for_defense():
+    class Unit:
+        magic = 30
+        defense = 10
+
+    class FixedRoll:
+        def random(self):
+            return 0.5      # 倍率 1.0
+
+    # GDScript: 30 - 10 / 3 (整数除算) = 27
+    assert TacticsEngine.magic_damage(Unit(), Unit(), 1.0, FixedRoll()) == 27
+
+
+def test_physical_damage_uses_integer_division_for_defense():
+    class Unit:
+        def get_effective_attack(self):
+            return 30
+
+        def get_effective_defense(self):
+            return 11
+
+    class FixedRoll:
+        def random(self):
+            return 0.5      # 倍率 1.0
+
+    # GDScript: 30 - 11 / 2 (整数除算) = 25（浮動小数なら 24.5 → 24）
+    assert TacticsEngine().physical_damage(Unit(), Unit(), 1.0, FixedRoll()) == 25
+    assert CombatSimulator.calculate_damage(Unit(), Unit(), FixedRoll()) == 25
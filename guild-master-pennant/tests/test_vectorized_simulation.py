@@ -0,0 +1,66 @@
+"""
+vectorized_simulation のテスト（スカラー版との統計的な一致）
+"""
+
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from simulation import simulate_dungeon_batch  # noqa: E402
+from vectorized_simulation import simulate_dungeon_vectorized  # noqa: E402
+
+RUNS = 1000
+MAX_FLOORS = 30
+
+
+@pytest.mark.parametrize("party", [
+    # 到達階層にばらつきがある構成（決定的に同じ階層で止まる構成では比較にならない）
+    ["Warrior", "Warrior", "Priest", "Priest"],
+    ["Warrior", "Mage", "Mage", "Priest"],
+    ["Mage", "Mage", "Mage", "Priest"],
+])
+def test_vectorized_matches_scalar_distribution(party):
+    scalar = simulate_dungeon_batch(party, runs=RUNS, seed=1, max_floors=MAX_FLOORS,
+                                    engine="scalar")
+    assert scalar["stdev"] > 0
+    vectorized = simulate_dungeon_vectorized(party, runs=RUNS, seed=2, max_floors=MAX_FLOORS)
+
+    # 平均到達階層: 独立な2標本の標準誤差の5倍以内
+    standard_error = math.sqrt((scalar["stdev"] ** 2 + vectorized["stdev"] ** 2) / RUNS)
+    assert abs(scalar["mean"] - vectorized["mean"]) <= 5 * standard_error + 1e-9
+
+    # 階層別生存率: 二項分布の標準誤差の5倍以内
+    for a, b in zip(scalar["survival"], vectorized["survival"]):
+        p = (a + b) / 2
+        assert abs(a - b) <= 5 * math.sqrt(2 * p * (1 - p) / RUNS) + 1e-9
+
+
+def test_vectorized_is_reproducible_with_seed():
+    party = ["Warrior", "Mage", "Mage", "Priest"]
+    first = simulate_dungeon_vectorized(party, runs=200, seed=7, max_floors=MAX_FLOORS)
+    second = simulate_dungeon_vectorized(party, runs=200, seed=7, max_floors=MAX_FLOORS)
+    assert first["histogram"] == second["histogram"]
+
+
+def test_vectorized_rejects_zero_runs():
+    with pytest.raises(ValueError):
+        simulate_dungeon_vectorized(["Warrior"], runs=0)
+
+
+def test_batch_uses_the_vectorized_engine_by_default():
+    party = ["Warrior", "Mage", "Mage", "Priest"]
+    batch = simulate_dungeon_batch(party, runs=200, seed=7, max_floors=MAX_FLOORS)
+    vectorized = simulate_dungeon_vectorized(party, runs=200, seed=7, max_floors=MAX_FLOORS)
+    assert batch["engine"] == "vectorized"
+    assert batch["histogram"] == vectorized["histogram"]
+
+
+def test_batch_falls_back_to_scalar_for_scalar_only_options():
+    batch = simulate_dungeon_batch(["Warrior", "Mage"], runs=5, seed=1, max_floors=5,
+                                   select_runs=lambda floor: False)
+    assert batch["engine"] == "scalar"
+    with pytest.raises(ValueError):
+        simulate_dungeon_batch(["Warrior"], runs=5, seed=1, engine="vectorized",
+                               select_runs=lambda floor: False)
@@ -0,0 +1,247 @@
+"""
+Vectorized Simulation - NumPy による一括戦闘シミュレーション
+
+simulation.CombatSimulator と同じ戦闘ルールで、N 個の戦闘を配列演算で同時に進める。
+バランス調整用の大量試行向け。NumPy が必要（任意依存）。
+"""
+
+from typing import List, Dict, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy は任意依存
+    np = None
+
+from simulation import (
+    MockAdventurer,
+    MockEnemy,
+    create_party,
+    create_enemies,
+    summarize_floor_distribution
+)
+
+
+def _require_numpy() -> None:
+    """NumPy が利用可能か確認"""
+    if np is None:
+        raise ImportError("vectorized_simulation requires numpy (pip install numpy)")
+
+
+class VectorizedCombatSimulator:
+    """
+    同じ編成の戦闘を N 個並列に進める戦闘シミュレーター
+
+    HP は (ユニット数, N) の配列で持ち、ユニットごとの行を連続にする（列は [パーティ..., 敵...] の順）。
+    ユニット数は高々8なので、ターゲット選択とダメージ適用はユニットの行ごとのマスク演算で行い、
+    (N, ユニット数) の配列への fancy index・argmax・cumsum を使わない。
+    攻撃力・防御力・被弾率・行動順は全戦闘で共通の定数として事前計算する。
+    """
+
+    def __init__(self, party: List[MockAdventurer], enemies: List[MockEnemy],
+                 rng: Optional["np.random.Generator"] = None):
+        _require_numpy()
+
+        self.party_size = len(party)
+        self.enemy_size = len(enemies)
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        units = list(party) + list(enemies)
+        self.attack = [float(u.get_effective_attack()) for u in units]
+        self.defense = [float(u.get_effective_defense()) for u in units]
+        self.hit_weights = [p.get_hit_rate() for p in party]
+        self.enemy_max_hp = np.array([e.max_hp for e in enemies], dtype=np.int64)
+
+        # 行動順（速度順、同速は元の並び順 = simulate_turn の安定ソートと同じ）
+        speeds = [u.speed for u in units]
+        self.order = sorted(range(len(units)), key=lambda i: speeds[i], reverse=True)
+
+    def _apply_hits(self, attacker: int, target: int, hp: "np.ndarray", alive: "np.ndarray",
+                    hit: "np.ndarray", rolls: "np.ndarray") -> None:
+        """
+        calculate_damage + take_damage をまとめて計算し、hit の戦闘だけ target の HP を減らす
+
+        Args:
+            attacker: 攻撃側のユニット番号
+            target: 防御側のユニット番号
+            hp: target の HP の行（その場で更新）
+            alive: target の生存フラグの行（その場で更新）
+            hit: 攻撃が target に当たる戦闘
+            rolls: ダメージ乱数の倍率 (0.9 + 0.2 * u)
+        """
+        defense = self.defense[target]
+        damage = np.trunc((self.attack[attacker] - defense // 2) * rolls)
+        np.maximum(damage, 1, out=damage)
+        damage -= defense
+        np.maximum(damage, 1, out=damage)
+        damage *= hit
+        hp -= damage
+        np.maximum(hp, 0, out=hp)
+        np.greater(hp, 0, out=alive)
+
+    def simulate_combat(self, party_hp: "np.ndarray", enemy_hp: Optional["np.ndarray"] = None,
+                        max_turns: int = 100) -> Dict:
+        """
+        戦闘を一括シミュレート
+
+        Args:
+            party_hp: パーティの現在HP (N, パーティ人数)。戦闘後のHPで上書きされる
+            enemy_hp: 敵の現在HP (N, 敵数)。None の場合は最大HP
+            max_turns: 最大ターン数
+
+        Returns:
+            {"victory": (N,) int8 [1=勝利, 0=敗北, -1=時間切れ],
+             "turns": (N,) int64, "party_hp": (N, P), "enemy_hp": (N, E)}
+        """
+        battles = party_hp.shape[0]
+        if enemy_hp is None:
+            enemy_hp = np.broadcast_to(self.enemy_max_hp, (battles, self.enemy_size))
+
+        p = self.party_size
+        units = p + self.enemy_size
+        # HP は float64 で持つ（整数の範囲では厳密で、ダメージ計算のたびに型変換しない）
+        hp = np.concatenate([party_hp, enemy_hp], axis=1).T.astype(np.float64)
+
+        victory = np.full(battles, -1, dtype=np.int8)
+        turns = np.full(battles, max_turns, dtype=np.int64)
+
+        # 決着していない戦闘だけを詰めて処理する
+        live = np.arange(battles)
+        live_hp = hp
+
+        for turn in range(1, max_turns + 1):
+            alive = live_hp > 0
+            party_wiped = ~alive[:p].any(axis=0)
+            enemies_wiped = ~alive[p:].any(axis=0) & ~party_wiped
+            decided = party_wiped | enemies_wiped
+            if decided.any():
+                hp[:, live] = live_hp
+                victory[live[party_wiped]] = 0
+                victory[live[enemies_wiped]] = 1
+                turns[live[decided]] = turn
+                keep = ~decided
+                live, live_hp, alive = live[keep], live_hp[:, keep], alive[:, keep]
+            size = live.size
+            if size == 0:
+                break
+
+            # 各行動のダメージ乱数とターゲット乱数をまとめて生成
+            damage_rolls = self.rng.random((len(self.order), size))
+            damage_rolls *= 0.2
+            damage_rolls += 0.9
+            target_rolls = self.rng.random((len(self.order), size))
+
+            for slot, unit in enumerate(self.order):
+                rolls = damage_rolls[slot]
+                # まだ攻撃先が決まっていない戦闘（行動できるのは生存している場合だけ）
+                pending = alive[unit].copy()
+
+                if unit < p:
+                    # 味方: 最初に生存している敵を攻撃
+                    for target in range(p, units):
+                        hit = pending & alive[target]
+                        if hit.any():
+                            pending ^= hit
+                            self._apply_hits(unit, target, live_hp[target], alive[target], hit, rolls)
+                    continue
+
+                # 敵: 被弾率の累積が乱数を超えた最初の味方（select_target_by_hit_rate と同じ）
+                total = np.zeros(size)
+                for target in range(p):
+                    total += self.hit_weights[target] * alive[target]
+                threshold = target_rolls[slot] * total
+                cumulative = np.zeros(size)
+                for target in range(p):
+                    cumulative += self.hit_weights[target] * alive[target]
+                    hit = pending & alive[target] & (cumulative >= threshold)
+                    if hit.any():
+                        pending ^= hit
+                        self._apply_hits(unit, target, live_hp[target], alive[target], hit, rolls)
+
+                # 丸め誤差でどこにも当たらなかった場合は先頭の生存者（スカラー版の targets[0]）
+                pending &= total > 0
+                if pending.any():
+                    for target in range(p):
+                        hit = pending & alive[target]
+                        if hit.any():
+                            pending ^= hit
+                            self._apply_hits(unit, target, live_hp[target], alive[target], hit, rolls)
+
+        # 時間切れの戦闘の最終HPを書き戻す
+        hp[:, live] = live_hp
+
+        party_hp[...] = hp[:p].T
+        return {
+            "victory": victory,
+            "turns": turns,
+            "party_hp": party_hp,
+            "enemy_hp": hp[p:].T.astype(np.int64)
+        }
+
+
+def simulate_combat_vectorized(party: List[MockAdventurer], enemies: List[MockEnemy],
+                               battles: int, max_turns: int = 100,
+                               seed: Optional[int] = None) -> Dict:
+    """
+    同じ初期状態の戦闘を battles 回並列にシミュレート
+
+    Args:
+        party: 冒険者リスト（現在HPを初期状態として使用）
+        enemies: 敵リスト
+        battles: 戦闘数
+        max_turns: 最大ターン数
+        seed: 乱数シード
+
+    Returns:
+        VectorizedCombatSimulator.simulate_combat の結果
+    """
+    _require_numpy()
+    simulator = VectorizedCombatSimulator(party, enemies, np.random.default_rng(seed))
+    party_hp = np.tile(np.array([a.current_hp for a in party], dtype=np.int64), (battles, 1))
+    enemy_hp = np.tile(np.array([e.current_hp for e in enemies], dtype=np.int64), (battles, 1))
+    return simulator.simulate_combat(party_hp, enemy_hp, max_turns)
+
+
+def simulate_dungeon_vectorized(party_composition: List[str], runs: int = 10000,
+                                seed: Optional[int] = None, max_floors: int = 50) -> Dict:
+    """
+    ダンジョン踏破を runs 回並列にシミュレート
+
+    全試行を同じ階層で足並みをそろえて進め、全滅した試行は以降の階層から除外する。
+
+    Args:
+        party_composition: パーティ構成（職業名のリスト）
+        runs: 試行回数
+        seed: 乱数シード
+        max_floors: 最大階層数
+
+    Returns:
+        simulation.simulate_dungeon_batch と同じ形式の分布統計
+    """
+    _require_numpy()
+    if runs < 1:
+        raise ValueError("runs must be >= 1")
+
+    rng = np.random.default_rng(seed)
+    party = create_party(party_composition)
+    party_hp = np.tile(np.array([a.max_hp for a in party], dtype=np.int64), (runs, 1))
+    floors = np.zeros(runs, dtype=np.int64)
+    running = np.arange(runs)
+
+    for floor in range(1, max_floors + 1):
+        if running.size == 0:
+            break
+
+        simulator = VectorizedCombatSimulator(party, create_enemies(floor), rng)
+        hp = party_hp[running]
+        result = simulator.simulate_combat(hp)
+        party_hp[running] = hp
+
+        # 勝利した試行のみ次の階層へ（時間切れは全滅扱い）
+        won = result["victory"] == 1
+        floors[running[won]] = floor
+        running = running[won]
+
+    stats = summarize_floor_distribution(floors.tolist(), max_floors)
+    stats["party_composition"] = list(party_composition)
+    stats["seed"] = seed
+    return stats